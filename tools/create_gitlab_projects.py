@@ -3,16 +3,14 @@
 import sys
 from argparse import Namespace
 
-from sel_tools.config import REPO_DIR
+from sel_tools.config import JOURNAL_DIR, REPO_DIR
 from sel_tools.file_export.solutions_check import check_code_for_solutions_code
-from sel_tools.gitlab_api.create_issue import EVALUATION_DASHBOARD_TASK, create_issues
-from sel_tools.gitlab_api.create_repo import create_repos
+from sel_tools.gitlab_api.create_issue import EVALUATION_DASHBOARD_TASK
+from sel_tools.gitlab_api.create_repo import CreateReposSettings, create_repos
 from sel_tools.gitlab_api.instance import create_gitlab_instance
 from sel_tools.utils.args import ArgumentParserFactory
-from sel_tools.utils.student_config import (
-    read_student_repo_info_from_config_file,
-    store_student_repo_info_to_config_file,
-)
+from sel_tools.utils.journal import Journal
+from sel_tools.utils.student_config import store_student_repo_info_to_config_file
 
 
 def parse_arguments(arguments: list[str]) -> Namespace:
@@ -25,6 +23,7 @@ def parse_arguments(arguments: list[str]) -> Namespace:
     factory.add_number_of_repos()
     factory.add_gitlab_token()
     factory.add_publish_solutions()
+    factory.add_api_jobs()
 
     return factory.parser.parse_args(arguments[1:])
 
@@ -37,15 +36,17 @@ def main() -> None:
         arguments.source_path,
         arguments.repo_base_name,
         arguments.group_id,
-        arguments.number_of_repos,
-        create_gitlab_instance(arguments.gitlab_token),
-    )
-    config_path = store_student_repo_info_to_config_file(arguments.repo_info_dir, group_name, student_repos)
-    create_issues(
-        [EVALUATION_DASHBOARD_TASK],
-        read_student_repo_info_from_config_file(config_path),
         create_gitlab_instance(arguments.gitlab_token),
+        CreateReposSettings(
+            arguments.number_of_repos,
+            arguments.api_jobs,
+            Journal(JOURNAL_DIR / f"create_repos_{arguments.group_id}_{arguments.repo_base_name}.jsonl"),
+            (EVALUATION_DASHBOARD_TASK,),
+        ),
     )
+    store_student_repo_info_to_config_file(arguments.repo_info_dir, group_name, student_repos)
+    if len(student_repos) < arguments.number_of_repos:
+        sys.exit("Rerun the command to resume creating the missing repos.")
 
 
 if __name__ == "__main__":
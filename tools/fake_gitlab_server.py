@@ -0,0 +1,46 @@
+"""Run a local fake GitLab server for offline runs and benchmarks of the tools."""
+
+import json
+import sys
+import time
+from argparse import Namespace
+
+from sel_tools.gitlab_api.fake_server import FakeGitlabServer, RequestThrottle
+from sel_tools.utils import args
+
+
+def parse_arguments(arguments: list[str]) -> Namespace:
+    """Parse CLI arguments."""
+    factory = args.ArgumentParserFactory.default_parser(__doc__)
+    factory.add_repos_dir()
+    factory.add_port()
+    factory.add_latency()
+    factory.add_rate_limit()
+    factory.add_rate_limit_period()
+    factory.add_users_file()
+
+    return factory.parser.parse_args(arguments[1:])
+
+
+def main() -> None:
+    """Main."""
+    arguments = parse_arguments(sys.argv)
+    server = FakeGitlabServer(
+        arguments.repos_dir,
+        RequestThrottle(arguments.latency, arguments.rate_limit, arguments.rate_limit_period),
+        arguments.port,
+    )
+    if arguments.users is not None:
+        for user in json.loads(arguments.users.read_text()):
+            server.add_user(user["username"], user["email"])
+    with server:
+        print(f"Fake GitLab server running, use it with: export GITLAB_SERVER_URL={server.url}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,26 +2,41 @@
 
 import sys
 from argparse import ArgumentDefaultsHelpFormatter, Namespace
+from dataclasses import replace
 
-from sel_tools.code_evaluation.evaluate_code import evaluate_code
+from sel_tools.code_evaluation.cache import EVALUATION_CACHE_FOLDER, EvaluationResultCache
+from sel_tools.code_evaluation.evaluate_code import EvaluationSettings, evaluate_code
+from sel_tools.code_evaluation.jobs.cpp import BuildBackend, DefaultBuildBackend
 from sel_tools.code_evaluation.jobs.factory import EvaluationJobFactory
-from sel_tools.code_evaluation.report import write_evaluation_report_for_student_comments, write_evaluation_reports
-from sel_tools.diff_creation.create_diff import create_diff
+from sel_tools.code_evaluation.report import (
+    write_evaluation_report_for_student_comments,
+    write_evaluation_reports,
+    write_timing_summary,
+)
+from sel_tools.diff_creation.create_diff import DiffSettings, create_diff
 from sel_tools.diff_creation.report import write_diff_reports, write_report_for_inactive_student_repos
 from sel_tools.file_export.export_item import export_items
 from sel_tools.file_parsing.slide_parser import get_tasks_from_slides
-from sel_tools.gitlab_api.add_user import add_users
+from sel_tools.gitlab_api.add_user import AddUsersSettings, UserIdCache, add_users
+from sel_tools.gitlab_api.attachments import UploadCache
+from sel_tools.gitlab_api.bulk_action import BulkActionSettings, create_action_journal
 from sel_tools.gitlab_api.comment_issue import comment_issues
 from sel_tools.gitlab_api.create_commit import commit_changes, upload_files
 from sel_tools.gitlab_api.create_issue import create_issues
-from sel_tools.gitlab_api.fetch_repo import fetch_repos
+from sel_tools.gitlab_api.fetch_repo import REFERENCE_REPO_FOLDER, fetch_repos
 from sel_tools.gitlab_api.instance import create_gitlab_instance
 from sel_tools.utils.args import ArgumentParserFactory
 from sel_tools.utils.comment import Comment
+from sel_tools.utils.repo import CloneOptions
 from sel_tools.utils.student_config import read_student_repo_info_from_config_file
 from sel_tools.utils.task import configure_tasks
 
 
+def create_clone_options(args: Namespace) -> CloneOptions:
+    """Create the clone options from the fetch arguments."""
+    return CloneOptions(args.workspace / REFERENCE_REPO_FOLDER if args.reference else None, args.blob_filter)
+
+
 def edit_create_issues(args: Namespace) -> None:
     """Default action for create_issues subcommand."""
     tasks = get_tasks_from_slides(args.issue_md_slides)
@@ -30,6 +45,13 @@ def edit_create_issues(args: Namespace) -> None:
         tasks,
         read_student_repo_info_from_config_file(args.student_repo_info_file),
         create_gitlab_instance(args.gitlab_token),
+        BulkActionSettings(
+            args.upload_jobs,
+            UploadCache.for_student_repo_info_file(args.student_repo_info_file),
+            create_action_journal(
+                "create_issues", [str(args.student_repo_info_file.resolve()), repr(tasks)], args.ignore_journal
+            ),
+        ),
     )
 
 
@@ -40,6 +62,13 @@ def edit_comment_issue(args: Namespace) -> None:
         comment,
         read_student_repo_info_from_config_file(args.student_repo_info_file),
         create_gitlab_instance(args.gitlab_token),
+        BulkActionSettings(
+            args.upload_jobs,
+            UploadCache.for_student_repo_info_file(args.student_repo_info_file),
+            create_action_journal(
+                "comment_issue", [str(args.student_repo_info_file.resolve()), repr(comment)], args.ignore_journal
+            ),
+        ),
     )
 
 
@@ -49,26 +78,41 @@ def edit_fetch_code(args: Namespace) -> None:
         args.workspace,
         read_student_repo_info_from_config_file(args.student_repo_info_file),
         create_gitlab_instance(args.gitlab_token),
+        args.fetch_jobs,
+        create_clone_options(args),
     )
 
 
 def edit_evaluate_code(args: Namespace) -> None:
     """Default action for evaluate_code subcommand."""
+    clone_options = create_clone_options(args)
+    if args.shallow:
+        clone_options = replace(clone_options, shallow_since=args.date_last_homework or args.evaluation_date)
     gitlab_projects = fetch_repos(
         args.workspace,
         read_student_repo_info_from_config_file(args.student_repo_info_file),
         create_gitlab_instance(args.gitlab_token),
+        args.fetch_jobs,
+        clone_options,
     )
     factory = EvaluationJobFactory.load_factory_from_file(args.job_factory)
-    evaluation_reports = evaluate_code(factory, gitlab_projects, args.homework_number, args.evaluation_date)
+    DefaultBuildBackend.configure(BuildBackend(args.ninja, args.build_jobs, args.ccache_dir, args.dependency_mirror))
+    settings = EvaluationSettings(
+        args.jobs,
+        None if args.no_cache else EvaluationResultCache(args.workspace / EVALUATION_CACHE_FOLDER),
+        args.worktrees,
+    )
+    evaluation_reports = evaluate_code(factory, gitlab_projects, args.homework_number, args.evaluation_date, settings)
     write_evaluation_reports(evaluation_reports, f"homework-{args.homework_number}-report")
     write_evaluation_report_for_student_comments(evaluation_reports, args.workspace)
+    write_timing_summary(evaluation_reports, args.workspace)
     diff_reports = create_diff(
         [project.local_path for project in gitlab_projects],
         args.date_last_homework,
         args.evaluation_date,
+        DiffSettings(args.diffstat_only, args.patch_threshold, frozenset(args.patch_commits)),
     )
-    write_diff_reports(diff_reports, f"homework-{args.homework_number}-diff")
+    write_diff_reports(diff_reports, f"homework-{args.homework_number}-diff", args.jobs)
     write_report_for_inactive_student_repos(diff_reports, args.workspace)
 
 
@@ -78,6 +122,14 @@ def edit_upload_files(args: Namespace) -> None:
         args.source_path,
         read_student_repo_info_from_config_file(args.student_repo_info_file),
         create_gitlab_instance(args.gitlab_token),
+        BulkActionSettings(
+            args.upload_jobs,
+            journal=create_action_journal(
+                "upload_files",
+                [str(args.student_repo_info_file.resolve()), str(args.source_path.resolve())],
+                args.ignore_journal,
+            ),
+        ),
     )
 
 
@@ -87,6 +139,8 @@ def edit_commit_changes(args: Namespace) -> None:
         args.workspace,
         read_student_repo_info_from_config_file(args.student_repo_info_file),
         create_gitlab_instance(args.gitlab_token),
+        args.fetch_jobs,
+        create_clone_options(args),
     )
     student_repos = [project.local_path for project in gitlab_projects]
     export_items(args.source_path, student_repos, args.keep_solutions)
@@ -99,12 +153,13 @@ def edit_add_users(args: Namespace) -> None:
         read_student_repo_info_from_config_file(args.student_repo_info_file),
         args.student_group_info_file,
         create_gitlab_instance(args.gitlab_token),
+        AddUsersSettings(args.api_jobs, UserIdCache(), args.dry_run),
     )
 
 
-def parse_arguments(arguments: list[str]) -> Namespace:
+def parse_arguments(arguments: list[str]) -> Namespace:  # noqa: PLR0915
     """Parse CLI arguments."""
-    # pylint: disable=too-many-locals
+    # pylint: disable=too-many-locals,too-many-statements
 
     parser = ArgumentParserFactory.default_parser(__doc__).parser
     subparsers = parser.add_subparsers(title="actions", dest="actions", help="sub-command help", required=True)
@@ -119,6 +174,8 @@ def parse_arguments(arguments: list[str]) -> Namespace:
     create_issue_factory.add_issue_md_slide()
     create_issue_factory.add_homework_number()
     create_issue_factory.add_due_date()
+    create_issue_factory.add_upload_jobs()
+    create_issue_factory.add_ignore_journal()
     parser_issues = subparsers.add_parser(
         "create_issues",
         parents=[create_issue_factory.parser],
@@ -133,6 +190,8 @@ def parse_arguments(arguments: list[str]) -> Namespace:
     comment_issue_factory.add_issue_number()
     comment_issue_factory.add_message("Message as string or path to an `.md` file with the message")
     comment_issue_factory.add_state_event()
+    comment_issue_factory.add_upload_jobs()
+    comment_issue_factory.add_ignore_journal()
     parser_comment = subparsers.add_parser(
         "comment_issue",
         parents=[comment_issue_factory.parser],
@@ -145,6 +204,9 @@ def parse_arguments(arguments: list[str]) -> Namespace:
     # Fetch code parser
     fetch_code_factory = factory.copy()
     fetch_code_factory.add_workspace()
+    fetch_code_factory.add_fetch_jobs()
+    fetch_code_factory.add_reference()
+    fetch_code_factory.add_blob_filter()
     parser_fetch = subparsers.add_parser(
         "fetch_code",
         parents=[fetch_code_factory.parser],
@@ -159,8 +221,22 @@ def parse_arguments(arguments: list[str]) -> Namespace:
     evaluate_code_factory.add_homework_number()
     evaluate_code_factory.add_job_factory_path()
     evaluate_code_factory.add_workspace()
+    evaluate_code_factory.add_fetch_jobs()
+    evaluate_code_factory.add_reference()
+    evaluate_code_factory.add_blob_filter()
+    evaluate_code_factory.add_shallow()
     evaluate_code_factory.add_date_sine_last_homework()
     evaluate_code_factory.add_evaluation_date()
+    evaluate_code_factory.add_diffstat_only()
+    evaluate_code_factory.add_patch_threshold()
+    evaluate_code_factory.add_patch_commits()
+    evaluate_code_factory.add_jobs()
+    evaluate_code_factory.add_no_cache()
+    evaluate_code_factory.add_ninja()
+    evaluate_code_factory.add_build_jobs()
+    evaluate_code_factory.add_ccache_dir()
+    evaluate_code_factory.add_dependency_mirror()
+    evaluate_code_factory.add_worktrees()
     parser_evaluate = subparsers.add_parser(
         "evaluate_code",
         parents=[evaluate_code_factory.parser],
@@ -173,6 +249,8 @@ def parse_arguments(arguments: list[str]) -> Namespace:
     # Upload files parser
     upload_files_factory = factory.copy()
     upload_files_factory.add_source_folder(None)
+    upload_files_factory.add_upload_jobs()
+    upload_files_factory.add_ignore_journal()
     parser_upload_files = subparsers.add_parser(
         "upload_files",
         parents=[upload_files_factory.parser],
@@ -187,6 +265,9 @@ def parse_arguments(arguments: list[str]) -> Namespace:
     commit_changes_factory.add_source_folder(None)
     commit_changes_factory.add_message("Commit message used for all repos")
     commit_changes_factory.add_workspace()
+    commit_changes_factory.add_fetch_jobs()
+    commit_changes_factory.add_reference()
+    commit_changes_factory.add_blob_filter()
     commit_changes_factory.add_keep_solutions()
     parser_commit_changes = subparsers.add_parser(
         "commit_changes",
@@ -200,6 +281,8 @@ def parse_arguments(arguments: list[str]) -> Namespace:
     # Add users parser
     add_users_factory = factory.copy()
     add_users_factory.add_student_group_info_file()
+    add_users_factory.add_api_jobs()
+    add_users_factory.add_dry_run()
     parser_add_users = subparsers.add_parser(
         "add_users",
         parents=[add_users_factory.parser],
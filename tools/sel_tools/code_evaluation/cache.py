@@ -0,0 +1,111 @@
+"""Persistent cache for evaluation results of previous runs."""
+
+import hashlib
+import json
+import os
+import subprocess
+import time
+from dataclasses import asdict
+from functools import cache
+from pathlib import Path
+
+import git
+
+from sel_tools.code_evaluation.report import EvaluationResult, JobMetrics
+
+EVALUATION_CACHE_FOLDER = ".evaluation_cache"
+MAX_CACHE_AGE_SECONDS = 30 * 24 * 60 * 60
+MAX_CACHE_SIZE_BYTES = 100 * 1024 * 1024
+
+
+@cache
+def get_tool_version(tool: str) -> str:
+    """Get the first line of the version output of a tool."""
+    try:
+        output = subprocess.run([tool, "--version"], capture_output=True, check=False, text=True).stdout
+    except OSError:
+        return "not installed"
+    return output.splitlines()[0] if output else "unknown"
+
+
+class EvaluationResultCache:
+    """Cache evaluation results on disk.
+
+    Results are keyed by the HEAD commit of the repository, the job with its
+    parameters, and the versions of the tools the job uses. The results are
+    stored unweighted, so jobs differing only in their weight share the entries.
+    Repositories with uncommitted changes are never cached since their HEAD
+    doesn't describe them.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_age_seconds: float = MAX_CACHE_AGE_SECONDS,
+        max_size_bytes: int = MAX_CACHE_SIZE_BYTES,
+    ) -> None:
+        self.__cache_dir = cache_dir
+        self.__max_age_seconds = max_age_seconds
+        self.__max_size_bytes = max_size_bytes
+
+    @staticmethod
+    def create_key(repo_path: Path, job_identity: str, tools: tuple[str, ...]) -> str | None:
+        try:
+            repo = git.Repo(repo_path)
+            if repo.is_dirty(untracked_files=False):
+                return None
+            head_sha = repo.head.commit.hexsha
+        except (git.InvalidGitRepositoryError, git.NoSuchPathError, ValueError):
+            return None
+        key_data = {
+            "head": head_sha,
+            "job": job_identity,
+            "tools": {tool: get_tool_version(tool) for tool in tools},
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str) -> list[EvaluationResult] | None:
+        entry = self.__entry_path(key)
+        try:
+            # The jobs didn't run, so the metrics of the original run are replaced
+            results = [
+                EvaluationResult(**{**result, "metrics": JobMetrics(cached=True)})
+                for result in json.loads(entry.read_text())
+            ]
+        except (OSError, ValueError, TypeError):
+            return None
+        os.utime(entry)  # Mark as recently used for the eviction
+        return results
+
+    def put(self, key: str, results: list[EvaluationResult]) -> None:
+        self.__cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self.__entry_path(key)
+        # Write to a temporary file first since parallel evaluations share the cache
+        temporary_entry = entry.with_suffix(f".{os.getpid()}.tmp")
+        temporary_entry.write_text(json.dumps([asdict(result) for result in results]))
+        temporary_entry.replace(entry)
+
+    def evict(self) -> None:
+        """Remove entries not used for longer than the max age and the oldest ones above the max size."""
+        if not self.__cache_dir.is_dir():
+            return
+        now = time.time()
+        entries = sorted(
+            ((entry, entry.stat()) for entry in self.__cache_dir.glob("*.json")),
+            key=lambda entry_with_stat: entry_with_stat[1].st_mtime,
+        )
+        remaining_entries = []
+        for entry, stat in entries:
+            if now - stat.st_mtime > self.__max_age_seconds:
+                entry.unlink()
+            else:
+                remaining_entries.append((entry, stat))
+        cache_size = sum(stat.st_size for _, stat in remaining_entries)
+        for entry, stat in remaining_entries:
+            if cache_size <= self.__max_size_bytes:
+                break
+            entry.unlink()
+            cache_size -= stat.st_size
+
+    def __entry_path(self, key: str) -> Path:
+        return self.__cache_dir / f"{key}.json"
@@ -1,50 +1,196 @@
 """Homework code evaluation module."""
 
 import copy
-import itertools
+import functools
+import inspect
+import shutil
+import sys
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from datetime import date
+from pathlib import Path
 
 import git
 from tqdm import tqdm
 
-from sel_tools.code_evaluation.jobs.common import EvaluationJob
+from sel_tools.code_evaluation.cache import EvaluationResultCache
+from sel_tools.code_evaluation.jobs.common import EvaluationJob, EvaluationJobGraph
+from sel_tools.code_evaluation.jobs.cpp import HW_BUILD_FOLDER
 from sel_tools.code_evaluation.jobs.factory import EvaluationJobFactory
-from sel_tools.code_evaluation.report import EvaluationReport
+from sel_tools.code_evaluation.report import EvaluationReport, EvaluationResult
+from sel_tools.utils.commit_index import COMMIT_INDEX
 from sel_tools.utils.repo import GitlabProject
 
+FAILED_EVALUATION_NAME = "Evaluation Error"
+WORKTREE_FOLDER = ".worktrees"
+
+
+@dataclass(frozen=True)
+class EvaluationSettings:
+    """Settings how the evaluation is executed.
+
+    With more than one worker, the repositories are evaluated in parallel processes.
+    Job results of unchanged repositories are taken from the cache if given.
+    With worktrees, the jobs run in a git worktree of each repository instead of
+    its clone, which keeps the build folder across evaluations.
+    """
+
+    max_workers: int = 1
+    cache: EvaluationResultCache | None = None
+    worktrees: bool = False
+
+
+DEFAULT_EVALUATION_SETTINGS = EvaluationSettings()
+
 
 def evaluate_code(
     eval_job_factory: type[EvaluationJobFactory],
     gitlab_projects: list[GitlabProject],
     homework_number: int,
     evaluation_date: date | None,
+    settings: EvaluationSettings = DEFAULT_EVALUATION_SETTINGS,
 ) -> list[EvaluationReport]:
-    """Evaluate code for given repositories and homework number."""
+    """Evaluate code for given repositories and homework number.
+
+    The reports are always returned in the order of the given projects.
+    """
     evaluation_jobs = eval_job_factory.create(gitlab_projects, homework_number)
+    if settings.cache is not None:
+        settings.cache.evict()
+    description = f"Evaluating Homework {homework_number}"
+    if settings.max_workers <= 1:
+        return [
+            evaluate_project(evaluation_jobs, gitlab_project, homework_number, evaluation_date, settings)
+            for gitlab_project in tqdm(gitlab_projects, desc=description)
+        ]
+
+    create_executor = functools.partial(
+        ProcessPoolExecutor,
+        initializer=load_factory_module,
+        initargs=(eval_job_factory.__module__, Path(inspect.getfile(eval_job_factory))),
+    )
+    evaluate = functools.partial(
+        evaluate_project,
+        evaluation_jobs,
+        homework_number=homework_number,
+        evaluation_date=evaluation_date,
+        settings=settings,
+    )
+    with tqdm(total=len(gitlab_projects), desc=description) as progress:
+        with create_executor(max_workers=settings.max_workers) as executor:
+            futures = [executor.submit(evaluate, gitlab_project=gitlab_project) for gitlab_project in gitlab_projects]
+            for future in as_completed(futures):
+                progress.update(not is_broken(future))
+        # A killed worker breaks the pool for all unfinished projects, so they are evaluated again one by one
+        with ThreadPoolExecutor(max_workers=settings.max_workers) as isolated_executor:
+            isolated_futures = {
+                index: isolated_executor.submit(
+                    evaluate_isolated, create_executor, evaluate, gitlab_projects[index], homework_number
+                )
+                for index, future in enumerate(futures)
+                if is_broken(future)
+            }
+            for _ in as_completed(isolated_futures.values()):
+                progress.update()
+    futures = [isolated_futures.get(index, future) for index, future in enumerate(futures)]
     return [
-        CodeEvaluator(evaluation_jobs, gitlab_project, homework_number).evaluate(evaluation_date)
-        for gitlab_project in tqdm(gitlab_projects, desc=f"Evaluating Homework {homework_number}")
+        get_report_from_future(future, gitlab_project, homework_number)
+        for future, gitlab_project in zip(futures, gitlab_projects, strict=True)
     ]
 
 
+def evaluate_project(
+    jobs: list[EvaluationJob],
+    gitlab_project: GitlabProject,
+    homework_number: int,
+    evaluation_date: date | None,
+    settings: EvaluationSettings,
+) -> EvaluationReport:
+    """Evaluate a single project, a crash only fails the report of this project."""
+    try:
+        return CodeEvaluator(jobs, gitlab_project, homework_number, settings).evaluate(evaluation_date)
+    except Exception as error:  # noqa: BLE001 # pylint: disable=broad-exception-caught
+        return create_failed_report(gitlab_project, homework_number, error)
+
+
+def is_broken(future: Future[EvaluationReport]) -> bool:
+    """Check if the evaluation did not finish because a worker process of its pool died."""
+    return isinstance(future.exception(), BrokenProcessPool)
+
+
+def evaluate_isolated(
+    create_executor: Callable[..., ProcessPoolExecutor],
+    evaluate: Callable[..., EvaluationReport],
+    gitlab_project: GitlabProject,
+    homework_number: int,
+) -> EvaluationReport:
+    """Evaluate a project in a worker process of its own, so that its crash does not fail other projects."""
+    with create_executor(max_workers=1) as executor:
+        future = executor.submit(evaluate, gitlab_project=gitlab_project)
+    return get_report_from_future(future, gitlab_project, homework_number)
+
+
+def get_report_from_future(
+    future: Future[EvaluationReport], gitlab_project: GitlabProject, homework_number: int
+) -> EvaluationReport:
+    """Get the report of a finished evaluation, also if the worker process died."""
+    error = future.exception()
+    return future.result() if error is None else create_failed_report(gitlab_project, homework_number, error)
+
+
+def create_failed_report(gitlab_project: GitlabProject, homework_number: int, error: BaseException) -> EvaluationReport:
+    """Create a report for an evaluation that crashed."""
+    print(f"\nEvaluation of {gitlab_project.local_path} failed: {error!r}")
+    return EvaluationReport(
+        gitlab_project,
+        homework_number,
+        [EvaluationResult(FAILED_EVALUATION_NAME, 0, 0, f"{FAILED_EVALUATION_NAME}: {error!r}")],
+    )
+
+
+def load_factory_module(module_name: str, module_path: Path) -> None:
+    """Make the factory module importable in worker processes to unpickle its jobs."""
+    if module_name not in sys.modules:
+        EvaluationJobFactory.load_factory_from_file(module_path)
+
+
 class CodeEvaluator:
     """Code evaluator class."""
 
-    def __init__(self, jobs: list[EvaluationJob], gitlab_project: GitlabProject, homework_number: int) -> None:
+    def __init__(
+        self,
+        jobs: list[EvaluationJob],
+        gitlab_project: GitlabProject,
+        homework_number: int,
+        settings: EvaluationSettings = DEFAULT_EVALUATION_SETTINGS,
+    ) -> None:
         # Perform a deepcopy to avoid artifact of old job runs
-        self.__jobs = copy.deepcopy(jobs)
+        self.__job_graph = EvaluationJobGraph(copy.deepcopy(jobs))
         self.__gitlab_project = gitlab_project
         self.__homework_number = homework_number
+        self.__cache = settings.cache
+        self.__worktrees = settings.worktrees
         self.__repo = git.Repo(gitlab_project.local_path)
 
+    @property
+    def worktree_path(self) -> Path:
+        local_path = self.__gitlab_project.local_path
+        return local_path.parent / WORKTREE_FOLDER / local_path.name
+
     def evaluate(self, evaluation_date: date | None) -> EvaluationReport:
-        self.__clean_repo()
-        if evaluation_date is not None:
-            self.__checkout_last_commit_before_eval_date(evaluation_date)
+        if self.__worktrees:
+            repo_path = self.__checkout_worktree(evaluation_date)
+        else:
+            repo_path = self.__gitlab_project.local_path
+            self.__clean_repo()
+            if evaluation_date is not None:
+                self.__checkout_last_commit_before_eval_date(evaluation_date)
         return EvaluationReport(
             self.__gitlab_project,
             self.__homework_number,
-            list(itertools.chain(*[job.run(self.__gitlab_project.local_path) for job in self.__jobs])),
+            self.__job_graph.run(repo_path, self.__cache),
         )
 
     def __clean_repo(self) -> None:
@@ -52,7 +198,35 @@ class CodeEvaluator:
         self.__repo.git.clean("-xdf")
 
     def __checkout_last_commit_before_eval_date(self, evaluation_date: date) -> None:
-        commits_before_eval_date = list(self.__repo.iter_commits(before=evaluation_date))
-        if commits_before_eval_date:
-            self.__repo.git.checkout(commits_before_eval_date[0])
+        if (hexsha := COMMIT_INDEX.last_commit_before(self.__repo, evaluation_date)) is not None:
+            self.__repo.git.checkout(hexsha)
             self.__clean_repo()
+
+    def __checkout_worktree(self, evaluation_date: date | None) -> Path:
+        """Check out the evaluated commit in the worktree and return its path.
+
+        The worktree is reused by every evaluation of the repository, so only the
+        files changed between the evaluated commits are touched and the build
+        folder, which is kept by the clean up, builds incrementally.
+        """
+        hexsha = COMMIT_INDEX.last_commit_before(self.__repo, evaluation_date) or self.__repo.head.commit.hexsha
+        worktree_path = self.worktree_path
+        if self.__is_registered_worktree(worktree_path):
+            worktree = git.Repo(worktree_path)
+            worktree.git.checkout("--force", "--detach", hexsha)
+        else:
+            # Leftovers of a worktree of a former clone of the repository
+            shutil.rmtree(worktree_path, ignore_errors=True)
+            self.__repo.git.worktree("prune")
+            self.__repo.git.worktree("add", "--force", "--detach", str(worktree_path), hexsha)
+            worktree = git.Repo(worktree_path)
+        worktree.git.clean("-xdf", "-e", f"/{HW_BUILD_FOLDER}")
+        return worktree_path
+
+    def __is_registered_worktree(self, worktree_path: Path) -> bool:
+        registered_paths = [
+            Path(line.removeprefix("worktree ")).resolve()
+            for line in self.__repo.git.worktree("list", "--porcelain").splitlines()
+            if line.startswith("worktree ")
+        ]
+        return worktree_path.exists() and worktree_path.resolve() in registered_paths
@@ -1,11 +1,105 @@
 """Common evaluation job interface and utilities."""
 
 import itertools
+import os
+import resource
 import subprocess
+import threading
+import time
 from abc import ABCMeta, abstractmethod
+from collections.abc import Hashable, Iterator
+from contextlib import contextmanager
+from dataclasses import replace
 from pathlib import Path
+from types import TracebackType
+from typing import Self
 
-from sel_tools.code_evaluation.report import EvaluationResult
+from sel_tools.code_evaluation.cache import EvaluationResultCache
+from sel_tools.code_evaluation.report import EvaluationResult, JobMetrics
+
+
+class ActiveRecorders(threading.local):
+    """Recorders active in the current thread, initialized empty for every thread."""
+
+    def __init__(self) -> None:
+        self.recorders: list[JobMetricsRecorder] = []
+
+
+class JobMetricsRecorder:
+    """Record the wall time of a job and the resources of the processes it runs.
+
+    Recorders nest, e.g. for jobs running other jobs, and every process is
+    recorded by all active recorders of the thread.
+    """
+
+    __active = ActiveRecorders()
+
+    def __init__(self) -> None:
+        self.__start = 0.0
+        self.__wall_time = 0.0
+        self.__cpu_time = 0.0
+        self.__peak_rss_kib = 0
+        self.__exit_codes: list[int] = []
+        self.__ccache_hits = 0
+        self.__ccache_compilations = 0
+
+    @property
+    def metrics(self) -> JobMetrics:
+        return JobMetrics(
+            round(self.__wall_time, 3),
+            round(self.__cpu_time, 3),
+            self.__peak_rss_kib,
+            tuple(self.__exit_codes),
+            ccache_hits=self.__ccache_hits,
+            ccache_compilations=self.__ccache_compilations,
+        )
+
+    def __enter__(self) -> Self:
+        self.__start = time.perf_counter()
+        JobMetricsRecorder.active_recorders().append(self)
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        JobMetricsRecorder.active_recorders().remove(self)
+        self.__wall_time = time.perf_counter() - self.__start
+
+    @staticmethod
+    def active_recorders() -> list["JobMetricsRecorder"]:
+        return JobMetricsRecorder.__active.recorders
+
+    @staticmethod
+    @contextmanager
+    def suspended() -> Iterator[None]:
+        """Record nothing meanwhile, e.g. for set up shared by all repositories."""
+        recorders = JobMetricsRecorder.active_recorders()
+        suspended_recorders = recorders.copy()
+        recorders.clear()
+        try:
+            yield
+        finally:
+            recorders.extend(suspended_recorders)
+
+    @staticmethod
+    def record_process(exit_code: int, usage: resource.struct_rusage) -> None:
+        for recorder in JobMetricsRecorder.active_recorders():
+            recorder.add_process(exit_code, usage)
+
+    @staticmethod
+    def record_ccache_hit_rate(hits: int, compilations: int) -> None:
+        for recorder in JobMetricsRecorder.active_recorders():
+            recorder.add_ccache_hit_rate(hits, compilations)
+
+    def add_ccache_hit_rate(self, hits: int, compilations: int) -> None:
+        self.__ccache_hits += hits
+        self.__ccache_compilations += compilations
+
+    def add_process(self, exit_code: int, usage: resource.struct_rusage) -> None:
+        self.__cpu_time += usage.ru_utime + usage.ru_stime
+        # Linux reports the maximum resident set size in KiB
+        self.__peak_rss_kib = max(self.__peak_rss_kib, usage.ru_maxrss)
+        self.__exit_codes.append(exit_code)
 
 
 class EvaluationJob:
@@ -16,20 +110,27 @@ class EvaluationJob:
 
     __metaclass__ = ABCMeta
 
+    # Jobs depending on anything else than the repository content must not be cached
+    cacheable: bool = True
+    # Tools whose versions invalidate cached results
+    tools: tuple[str, ...] = ()
+
     def __init__(self, weight: int = 1) -> None:
         self.__weight: int = weight
         self._comment: str = ""
 
-    def run(self, repo_path: Path) -> list[EvaluationResult]:
-        deps_results = [job.run(repo_path) for job in self.dependencies]
+    def run(self, repo_path: Path, cache: EvaluationResultCache | None = None) -> list[EvaluationResult]:
+        return EvaluationJobGraph([self]).run(repo_path, cache)
+
+    def run_unweighted(self, repo_path: Path) -> EvaluationResult:
+        """Run the job without its dependencies and return its result as if its weight was one."""
         print(f"\nRunning {self.name} on {repo_path}")
-        job_result_score = min(self._run(repo_path), self.max_run_score)
-        return [
-            *list(itertools.chain(*deps_results)),
-            EvaluationResult(
-                self.name, self.__weight * job_result_score, self.max_run_score * self.__weight, self.comment
-            ),
-        ]
+        with JobMetricsRecorder() as recorder:
+            job_result_score = min(self._run(repo_path), self.max_run_score)
+        return EvaluationResult(self.name, job_result_score, self.max_run_score, self.comment, recorder.metrics)
+
+    def weigh(self, result: EvaluationResult) -> EvaluationResult:
+        return replace(result, score=result.score * self.__weight, max_score=result.max_score * self.__weight)
 
     @property
     @abstractmethod
@@ -49,19 +150,127 @@ class EvaluationJob:
     def dependencies(self) -> list["EvaluationJob"]:
         return []
 
+    @property
+    def parameters(self) -> tuple[Hashable, ...]:
+        """Options the job was created with that change its result, without the weight.
+
+        Children with options override this. Live API objects must be left out
+        since their representation differs between processes and runs.
+        """
+        return ()
+
+    @property
+    def identity(self) -> str:
+        """Identify jobs of the same class created with the same parameters."""
+        job_class = type(self)
+        return f"{job_class.__module__}.{job_class.__qualname__}{self.parameters!r}"
+
     @abstractmethod
     def _run(self, repo_path: Path) -> int:
         msg = "Don't call me, I'm abstract."
         raise NotImplementedError(msg)
 
 
+class EvaluationJobGraph:
+    """Dependency graph of evaluation jobs.
+
+    Equivalent jobs, i.e. jobs of the same class with the same parameters, share
+    one node, even if their weights differ. Each node runs only once per
+    repository and its unweighted results are fed to all of its dependents,
+    which weigh them with the weights of the jobs requesting them.
+    """
+
+    def __init__(self, jobs: list[EvaluationJob]) -> None:
+        self.__jobs: dict[str, EvaluationJob] = {}
+        self.__dependencies: dict[str, list[tuple[str, EvaluationJob]]] = {}
+        self.__root_nodes = [(self.__add_node(job, set()), job) for job in jobs]
+
+    @property
+    def nodes(self) -> list[str]:
+        return list(self.__jobs)
+
+    def run(self, repo_path: Path, cache: EvaluationResultCache | None = None) -> list[EvaluationResult]:
+        executed_nodes: dict[str, list[EvaluationResult]] = {}
+        return [
+            requesting_job.weigh(result)
+            for node, job in self.__root_nodes
+            for requesting_job, result in zip(
+                self.__requesting_jobs(node, job),
+                self.__run_node(node, repo_path, executed_nodes, cache),
+                strict=True,
+            )
+        ]
+
+    def __add_node(self, job: EvaluationJob, dependent_nodes: set[str]) -> str:
+        node = job.identity
+        if node in dependent_nodes:
+            msg = f"Cyclic dependency of evaluation job {job.name}"
+            raise ValueError(msg)
+        if node not in self.__jobs:
+            self.__jobs[node] = job
+            self.__dependencies[node] = [
+                (self.__add_node(dependency, dependent_nodes | {node}), dependency) for dependency in job.dependencies
+            ]
+        return node
+
+    def __requesting_jobs(self, node: str, job: EvaluationJob) -> list[EvaluationJob]:
+        """Jobs whose weights apply to the results of the node requested by the job, in the order of the results."""
+        return [
+            *itertools.chain(
+                *[
+                    self.__requesting_jobs(dependency, requesting_job)
+                    for dependency, requesting_job in self.__dependencies[node]
+                ]
+            ),
+            job,
+        ]
+
+    def __run_node(
+        self,
+        node: str,
+        repo_path: Path,
+        executed_nodes: dict[str, list[EvaluationResult]],
+        cache: EvaluationResultCache | None,
+    ) -> list[EvaluationResult]:
+        if node in executed_nodes:
+            return executed_nodes[node]
+
+        job = self.__jobs[node]
+        cache_key = cache.create_key(repo_path, node, job.tools) if cache is not None and job.cacheable else None
+        if (
+            cache is not None
+            and cache_key is not None
+            and (cached_results := cache.get(cache_key)) is not None
+            and len(cached_results) == len(self.__requesting_jobs(node, job))
+        ):
+            print(f"\nUsing cached results of {job.name} on {repo_path}")
+            return cached_results
+
+        # Dependencies are not taken from the cache since this job relies on their side effects, e.g. the build folder
+        deps_results = [
+            self.__run_node(dependency, repo_path, executed_nodes, None) for dependency, _ in self.__dependencies[node]
+        ]
+        executed_nodes[node] = [*itertools.chain(*deps_results), job.run_unweighted(repo_path)]
+        if cache is not None and cache_key is not None:
+            cache.put(cache_key, executed_nodes[node])
+        return executed_nodes[node]
+
+
+def run_process(command: str, cwd: Path, capture_output: bool = False) -> tuple[int, str]:
+    """Run shell command, record its resources for the running job and return its exit code and output."""
+    with subprocess.Popen(command, shell=True, cwd=cwd, stdout=subprocess.PIPE if capture_output else None) as process:
+        output = process.stdout.read() if process.stdout is not None else b""
+        # Unlike Popen.wait, wait4 returns the resources used by the shell and all its children
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    JobMetricsRecorder.record_process(process.returncode, usage)
+    return process.returncode, output.decode("utf-8")
+
+
 def run_shell_command(command: str, cwd: Path) -> int:
     """Run shell command and return a score, not the exit code."""
-    try:
-        subprocess.check_call(command, shell=True, cwd=cwd)
-    except subprocess.CalledProcessError:
-        return 0
-    return 1
+    exit_code, _ = run_process(command, cwd)
+    return int(exit_code == 0)
 
 
 def run_shell_command_with_output(command: str, cwd: Path) -> tuple[int, str]:
@@ -69,8 +278,5 @@ def run_shell_command_with_output(command: str, cwd: Path) -> tuple[int, str]:
 
     Return a score, not the exit code.
     """
-    try:
-        data = subprocess.check_output(command, shell=True, cwd=cwd)
-    except subprocess.CalledProcessError as ex:
-        return 0, ex.output.decode("utf-8")
-    return 1, data.decode("utf-8")
+    exit_code, output = run_process(command, cwd, capture_output=True)
+    return int(exit_code == 0), output
@@ -1,41 +1,184 @@
 """Cpp code evaluation jobs."""
 
+import fcntl
+import hashlib
 import re
+import shlex
+from collections.abc import Hashable
+from dataclasses import dataclass
 from pathlib import Path
 
 import git
 
 from sel_tools.code_evaluation.jobs.common import (
     EvaluationJob,
+    JobMetricsRecorder,
     run_shell_command,
     run_shell_command_with_output,
 )
 from sel_tools.config import REPO_DIR
 from sel_tools.file_export.copy_item import copy_item
-from sel_tools.utils.files import CMAKELISTS_FILE_NAME, FileTree, FileVisitor, is_cpp
+from sel_tools.utils.files import CMAKELISTS_FILE_NAME, GIT_FOLDER, FileTree, FileVisitor, FileWalker, is_cpp
 
 CMAKE_MODULE_PATH = REPO_DIR / "cmake"
 HW_BUILD_FOLDER = "hw_build"
+CCACHE_STATS_LOG = "ccache_stats.log"
+DEPENDENCY_MIRROR_LOCK = ".lock"
+DEPENDENCY_MIRROR_COMPLETE = ".complete"
+DEPENDENCY_MIRROR_BUILD_FOLDER = "populate_build"
+DEPENDENCY_DECLARATION = "FetchContent_Declare"
+
+
+@dataclass(frozen=True)
+class BuildBackend:
+    """Build backend of the C++ jobs.
+
+    Builds with Ninja instead of Make if requested and with parallel jobs, by
+    default with the parallelism of the build tool, i.e. serial for Make. If a
+    ccache folder is given, compilers are launched via ccache with this folder
+    as cache shared by all student repositories. If a dependency mirror is
+    given, the FetchContent dependencies are taken from there instead of being
+    downloaded by every build. All jobs of one evaluation should use the same
+    backend since they share the build folder.
+    """
+
+    ninja: bool = False
+    parallel_jobs: int | None = None
+    ccache_dir: Path | None = None
+    dependency_mirror: Path | None = None
+
+    def cmake_options(self, cmake_options: str) -> str:
+        options = [cmake_options]
+        if self.ninja:
+            options.append("-G Ninja")
+        if self.ccache_dir is not None:
+            options.extend(["-DCMAKE_C_COMPILER_LAUNCHER=ccache", "-DCMAKE_CXX_COMPILER_LAUNCHER=ccache"])
+        if self.dependency_mirror is not None:
+            options.extend(
+                f"-DFETCHCONTENT_SOURCE_DIR_{source_dir.name.removesuffix('-src').upper()}={source_dir.resolve()}"
+                for source_dir in sorted(self.dependency_mirror.glob("*-src"))
+            )
+            options.append("-DFETCHCONTENT_UPDATES_DISCONNECTED=ON")
+        return " ".join(option for option in options if option)
+
+    def build_command(self, repo_path: Path) -> str:
+        build_tool = "ninja" if self.ninja else "make"
+        command = build_tool if self.parallel_jobs is None else f"{build_tool} -j{self.parallel_jobs}"
+        return f"{self.ccache_environment(repo_path)} {command}" if self.ccache_dir is not None else command
+
+    def test_command(self) -> str:
+        return "ninja test" if self.ninja else "make test"
+
+    def ccache_environment(self, repo_path: Path) -> str:
+        # The base dir rewrites absolute paths, so that hits are shared between student repositories
+        stats_log = (repo_path / HW_BUILD_FOLDER / CCACHE_STATS_LOG).resolve()
+        return (
+            f"CCACHE_DIR={shlex.quote(str(self.ccache_dir))} CCACHE_BASEDIR={shlex.quote(str(repo_path.resolve()))} "
+            f"CCACHE_NOHASHDIR=true CCACHE_STATSLOG={shlex.quote(str(stats_log))}"
+        )
+
+    @staticmethod
+    def parse_ccache_hit_rate(stats_log: Path) -> tuple[int, int] | None:
+        """Return the number of cache hits and of cached compilations from a ccache stats log."""
+        if not stats_log.exists():
+            return None
+        results = stats_log.read_text().splitlines()
+        hits = sum(result in {"direct_cache_hit", "preprocessed_cache_hit"} for result in results)
+        misses = sum(result == "cache_miss" for result in results)
+        return hits, hits + misses
+
+
+class DefaultBuildBackend:
+    """Backend of the C++ jobs created without an explicit one.
+
+    It is configured from the command line before the factory creates the jobs,
+    so the backend can be chosen without changing the factory.
+    """
+
+    __build_backend = BuildBackend()
+
+    @staticmethod
+    def current() -> BuildBackend:
+        return DefaultBuildBackend.__build_backend
+
+    @staticmethod
+    def configure(build_backend: BuildBackend) -> None:
+        DefaultBuildBackend.__build_backend = build_backend
+
+
+def resolve_build_backend(build_backend: BuildBackend | None) -> BuildBackend:
+    """Return the given backend or the configured default backend."""
+    return DefaultBuildBackend.current() if build_backend is None else build_backend
+
+
+def hash_dependency_declarations(source_dir: Path) -> str:
+    """Hash the cmake files of the source project which declare FetchContent dependencies."""
+    cmake_files = sorted([source_dir / CMAKELISTS_FILE_NAME, *(source_dir / CMAKE_MODULE_PATH.name).glob("*.cmake")])
+    sha256 = hashlib.sha256()
+    for cmake_file in cmake_files:
+        if cmake_file.is_file() and DEPENDENCY_DECLARATION in (content := cmake_file.read_text()):
+            sha256.update(f"{cmake_file.relative_to(source_dir)}\n{content}\n".encode())
+    return sha256.hexdigest()
+
+
+def populate_dependency_mirror(mirror_dir: Path, source_dir: Path = REPO_DIR) -> None:
+    """Download the FetchContent dependencies of the source project into the mirror unless already done.
+
+    The mirror is marked as complete with the hash of the dependency
+    declarations it was populated from, so it is populated again when they
+    change. It is only marked if the download succeeded, otherwise the next
+    build tries again. Its processes are not part of the metrics of the job
+    that happens to populate the mirror for all repositories.
+    """
+    mirror_dir.mkdir(parents=True, exist_ok=True)
+    complete_marker = mirror_dir / DEPENDENCY_MIRROR_COMPLETE
+    declarations_hash = hash_dependency_declarations(source_dir)
+    # Parallel evaluations wait for the first one populating the mirror
+    with (mirror_dir / DEPENDENCY_MIRROR_LOCK).open("w") as lock, JobMetricsRecorder.suspended():
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if complete_marker.exists() and complete_marker.read_text() == declarations_hash:
+            return
+        command = (
+            f"cmake -S {source_dir.resolve()} -B {DEPENDENCY_MIRROR_BUILD_FOLDER} "
+            f"-DFETCHCONTENT_BASE_DIR={mirror_dir.resolve()}"
+        )
+        if run_shell_command(command, mirror_dir) == 0:
+            msg = f"Populating the dependency mirror {mirror_dir} failed: {command}"
+            raise RuntimeError(msg)
+        complete_marker.write_text(declarations_hash)
 
 
 class CMakeBuildJob(EvaluationJob):
     """Job for compiling the project."""
 
     name = "CMake Build"
+    tools = ("cmake", "make", "c++")
 
-    def __init__(self, weight: int = 1, cmake_options: str = "") -> None:
+    def __init__(self, weight: int = 1, cmake_options: str = "", build_backend: BuildBackend | None = None) -> None:
         super().__init__(weight)
         self.__cmake_options = cmake_options
+        self.__build_backend = resolve_build_backend(build_backend)
+
+    @property
+    def parameters(self) -> tuple[Hashable, ...]:
+        return self.__cmake_options, self.__build_backend
 
     def _run(self, repo_path: Path) -> int:
         build_folder = repo_path / HW_BUILD_FOLDER
         build_folder.mkdir(parents=True, exist_ok=True)
-        if run_shell_command(f"cmake {self.__cmake_options} ..", build_folder) == 0:
+        ccache_stats_log = build_folder / CCACHE_STATS_LOG
+        ccache_stats_log.unlink(missing_ok=True)
+        if self.__build_backend.dependency_mirror is not None:
+            populate_dependency_mirror(self.__build_backend.dependency_mirror)
+        if run_shell_command(f"cmake {self.__build_backend.cmake_options(self.__cmake_options)} ..", build_folder) == 0:
             self._comment = f"CMake step failed with option {self.__cmake_options}: Make sure cmake .. passes."
             return 0
-        if run_shell_command("make", build_folder) == 0:
+        if run_shell_command(self.__build_backend.build_command(repo_path), build_folder) == 0:
             self._comment = "Make step failed: Make sure you build passes when calling make."
             return 0
+        if (ccache_hit_rate := BuildBackend.parse_ccache_hit_rate(ccache_stats_log)) is not None:
+            # Operator telemetry for the metrics, not feedback for the students
+            JobMetricsRecorder.record_ccache_hit_rate(*ccache_hit_rate)
         return 1
 
 
@@ -43,18 +186,24 @@ class MakeTestJob(EvaluationJob):
     """Job for running make test."""
 
     name = "Make Test"
+    tools = ("cmake", "make", "ctest", "c++")
 
-    def __init__(self, weight: int = 1, cmake_options: str = "") -> None:
+    def __init__(self, weight: int = 1, cmake_options: str = "", build_backend: BuildBackend | None = None) -> None:
         super().__init__(weight)
         self._cmake_options = cmake_options
+        self._build_backend = resolve_build_backend(build_backend)
+
+    @property
+    def parameters(self) -> tuple[Hashable, ...]:
+        return self._cmake_options, self._build_backend
 
     @property
     def dependencies(self) -> list[EvaluationJob]:
-        return [CMakeBuildJob(cmake_options=self._cmake_options)]
+        return [CMakeBuildJob(cmake_options=self._cmake_options, build_backend=self._build_backend)]
 
     def _run(self, repo_path: Path) -> int:
         build_folder = repo_path / HW_BUILD_FOLDER
-        score, output = run_shell_command_with_output("make test", build_folder)
+        score, output = run_shell_command_with_output(self._build_backend.test_command(), build_folder)
         if score != 0 and not output:
             self._comment = "No tests registered: Make sure you have tests registered in CMakeLists.txt."
             return 0
@@ -68,6 +217,7 @@ class ClangFormatTestJob(EvaluationJob):
     """Job for checking the code format."""
 
     name = "Clang Format Check"
+    tools = ("clang-format",)
 
     def _run(self, repo_path: Path) -> int:
         clang_format_file = repo_path / ".clang-format"
@@ -92,14 +242,20 @@ class CodeCoverageTestJob(EvaluationJob):
     """Job for checking the code coverage."""
 
     name = "Code Coverage"
+    tools = ("cmake", "make", "ctest", "c++", "gcovr")
 
     @property
     def dependencies(self) -> list[EvaluationJob]:
-        return [MakeTestJob(cmake_options="-DCMAKE_BUILD_TYPE=Debug")]
+        return [MakeTestJob(cmake_options="-DCMAKE_BUILD_TYPE=Debug", build_backend=self.__build_backend)]
 
-    def __init__(self, weight: int = 1, min_coverage: int = 75) -> None:
+    def __init__(self, weight: int = 1, min_coverage: int = 75, build_backend: BuildBackend | None = None) -> None:
         super().__init__(weight)
         self.__min_coverage = min_coverage
+        self.__build_backend = resolve_build_backend(build_backend)
+
+    @property
+    def parameters(self) -> tuple[Hashable, ...]:
+        return self.__min_coverage, self.__build_backend
 
     @staticmethod
     def parse_total_coverage(coverage_file: Path) -> int:
@@ -124,6 +280,15 @@ class ClangTidyTestJob(EvaluationJob):
     """Job for checking with clang tidy."""
 
     name = "Clang Tidy Check"
+    tools = ("cmake", "make", "c++", "clang-tidy")
+
+    def __init__(self, weight: int = 1, build_backend: BuildBackend | None = None) -> None:
+        super().__init__(weight)
+        self.__build_backend = resolve_build_backend(build_backend)
+
+    @property
+    def parameters(self) -> tuple[Hashable, ...]:
+        return (self.__build_backend,)
 
     def _run(self, repo_path: Path) -> int:
         clang_tidy_file = repo_path / ".clang-tidy"
@@ -149,7 +314,7 @@ class ClangTidyTestJob(EvaluationJob):
         content += f"list(APPEND CMAKE_MODULE_PATH ${{PROJECT_SOURCE_DIR}}/{hw_cmake_module_path.stem})\n"
         content += "include(ClangTidy)\n"
         cmake_lists.write_text(content)
-        score = CMakeBuildJob().run(repo_path)[-1].score
+        score = CMakeBuildJob(build_backend=self.__build_backend).run(repo_path)[-1].score
         git.Repo(repo_path).git.restore(".")  # Undo all changes
         return score
 
@@ -202,9 +367,9 @@ class CleanRepoJob(EvaluationJob):
     def _run(self, repo_path: Path) -> int:
         clean_repo_visitor = CleanRepoJob.CleanRepoVisitor()
         source_file_count_visitor = CleanRepoJob.SourceFilesCountVisitor(100)
-        file_tree = FileTree(repo_path)
-        file_tree.accept(clean_repo_visitor)
-        file_tree.accept(source_file_count_visitor)
+        FileTree(repo_path, FileWalker(ignore_folders=frozenset({GIT_FOLDER, HW_BUILD_FOLDER}))).accept_all(
+            [clean_repo_visitor, source_file_count_visitor]
+        )
         if not clean_repo_visitor.is_clean:
             self._comment = (
                 "We found build files committed to the repository. "
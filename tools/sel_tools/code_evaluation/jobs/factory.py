@@ -42,6 +42,8 @@ class EvaluationJobFactory:
             msg = f"No subclass of EvaluationJobFactory in {module_path}"
             raise ImportError(msg)
         module = importlib.util.module_from_spec(spec)
+        # Register the module so that its jobs can be pickled for parallel evaluation
+        sys.modules[spec.name] = module
         # To enable loading files with additionally required python files lying besides them
         with add_temporarily_to_pythonpath(module_path.parent):
             if isinstance(spec.loader, Loader):
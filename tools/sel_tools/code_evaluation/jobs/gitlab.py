@@ -1,5 +1,6 @@
 """Gitlab evaluation jobs."""
 
+from collections.abc import Hashable
 from pathlib import Path
 
 from sel_tools.code_evaluation.jobs.common import EvaluationJob
@@ -11,6 +12,7 @@ class CIStatusTestJob(EvaluationJob):
     """Job for checking the CI status."""
 
     name = "CI Status Check"
+    cacheable = False
 
     def __init__(
         self,
@@ -22,6 +24,11 @@ class CIStatusTestJob(EvaluationJob):
         self.__gitlab_projects = {project.local_path.stem: project.gitlab_project for project in gitlab_projects}
         self.__branch = branch
 
+    @property
+    def parameters(self) -> tuple[Hashable, ...]:
+        # The repositories instead of their gitlab projects, whose representations differ between runs
+        return tuple(sorted(self.__gitlab_projects)), self.__branch
+
     def _run(self, repo_path: Path) -> int:
         project = self.__gitlab_projects[repo_path.stem]
         pipelines = project.pipelines.list(ref=self.__branch)
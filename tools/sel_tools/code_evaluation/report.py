@@ -1,7 +1,9 @@
 """Code evaluation report."""
 
 import json
-from dataclasses import dataclass
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
@@ -42,6 +44,29 @@ Please note that not all of them are errors.
 {notes}
 """
 
+TIMING_SUMMARY_FILE = "evaluation_timing_summary.md"
+TIMING_PERCENTILES = (50, 90, 99)
+SLOWEST_REPOS_COUNT = 10
+
+TIMING_SUMMARY_TEMPLATE = """# Evaluation Timing Summary
+
+Evaluated {repo_count} repos in {wall_time:.1f}s job wall time and {cpu_time:.1f}s process CPU time.
+{cached_count} job results were taken from the cache.
+{ccache_hits} of {ccache_compilations} compilations were ccache hits.
+
+## Slowest Repos
+
+| Repo | Wall time [s] | CPU time [s] | Peak RSS [MiB] |
+| --- | --- | --- | --- |
+{repo_rows}
+
+## Slowest Jobs
+
+| Job | Runs | Total [s] | {percentile_headers} | Max [s] |
+| --- | --- | --- | {percentile_separators} | --- |
+{job_rows}
+"""
+
 COMMENTS_FOR_PROJECT_TEMPLATE = (
     ProjectCommentParser.PROJECT_COMMENT_IDENTIFIER_PREFIX
     + """ {project_id}
@@ -52,6 +77,24 @@ COMMENTS_FOR_PROJECT_TEMPLATE = (
 )
 
 
+@dataclass(frozen=True)
+class JobMetrics:
+    """Time and resources used by an evaluation job.
+
+    The CPU time and the peak resident set size in KiB are measured for the
+    processes started by the job. Builds with ccache count their cache hits.
+    Results taken from the cache are marked as cached and have no metrics.
+    """
+
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    peak_rss_kib: int = 0
+    exit_codes: tuple[int, ...] = ()
+    cached: bool = False
+    ccache_hits: int = 0
+    ccache_compilations: int = 0
+
+
 @dataclass(frozen=True)
 class EvaluationResult:
     """Evaluation result."""
@@ -60,6 +103,7 @@ class EvaluationResult:
     score: int
     max_score: int
     comment: str = ""
+    metrics: JobMetrics = field(default_factory=JobMetrics, compare=False)
 
 
 @dataclass
@@ -75,6 +119,11 @@ class EvaluationReport:
         self.max_score = sum(result.max_score for result in set(results))
         self.results = results
 
+    @property
+    def unique_results(self) -> list[EvaluationResult]:
+        """Results without the repetitions of dependencies shared by several jobs."""
+        return list({id(result): result for result in self.results}.values())
+
     def to_json(self) -> str:
         class JsonEncoder(json.JSONEncoder):
             """Evaluation report json encoder."""
@@ -125,3 +174,59 @@ def write_evaluation_report_for_student_comments(reports: list[EvaluationReport]
     workspace.joinpath("evaluation_report_comments_for_students.md").write_text(
         "\n".join(report.print_project_comments() for report in reports)
     )
+
+
+def write_timing_summary(reports: list[EvaluationReport], workspace: Path) -> None:
+    """Write a summary of the slowest repos and jobs of the evaluation."""
+    workspace.joinpath(TIMING_SUMMARY_FILE).write_text(create_timing_summary(reports))
+
+
+def create_timing_summary(reports: list[EvaluationReport]) -> str:
+    """Create a markdown summary of the job metrics of all reports."""
+    all_metrics = [result.metrics for report in reports for result in report.unique_results]
+    return TIMING_SUMMARY_TEMPLATE.format(
+        repo_count=len(reports),
+        wall_time=sum(metrics.wall_time for metrics in all_metrics),
+        cpu_time=sum(metrics.cpu_time for metrics in all_metrics),
+        cached_count=sum(metrics.cached for metrics in all_metrics),
+        ccache_hits=sum(metrics.ccache_hits for metrics in all_metrics),
+        ccache_compilations=sum(metrics.ccache_compilations for metrics in all_metrics),
+        repo_rows="\n".join(create_repo_timing_rows(reports)),
+        percentile_headers=" | ".join(f"P{percent} [s]" for percent in TIMING_PERCENTILES),
+        percentile_separators=" | ".join("---" for _ in TIMING_PERCENTILES),
+        job_rows="\n".join(create_job_timing_rows(reports)),
+    )
+
+
+def create_repo_timing_rows(reports: list[EvaluationReport]) -> list[str]:
+    """Create the table rows of the repos with the longest job wall time."""
+    rows = []
+    for report in reports:
+        all_metrics = [result.metrics for result in report.unique_results]
+        wall_time = sum(metrics.wall_time for metrics in all_metrics)
+        cpu_time = sum(metrics.cpu_time for metrics in all_metrics)
+        peak_rss_mib = max((metrics.peak_rss_kib for metrics in all_metrics), default=0) / 1024
+        rows.append((wall_time, f"| {report.repo_path} | {wall_time:.1f} | {cpu_time:.1f} | {peak_rss_mib:.1f} |"))
+    rows.sort(key=lambda row: row[0], reverse=True)
+    return [row for _, row in rows[:SLOWEST_REPOS_COUNT]]
+
+
+def create_job_timing_rows(reports: list[EvaluationReport]) -> list[str]:
+    """Create the table rows of all jobs sorted by their total wall time, cached results are left out."""
+    wall_times: dict[str, list[float]] = defaultdict(list)
+    for report in reports:
+        for result in report.unique_results:
+            if not result.metrics.cached:
+                wall_times[result.name].append(result.metrics.wall_time)
+    return [
+        f"| {name} | {len(job_wall_times)} | {sum(job_wall_times):.1f} | "
+        + " | ".join(f"{percentile(job_wall_times, percent):.1f}" for percent in TIMING_PERCENTILES)
+        + f" | {max(job_wall_times):.1f} |"
+        for name, job_wall_times in sorted(wall_times.items(), key=lambda item: sum(item[1]), reverse=True)
+    ]
+
+
+def percentile(values: list[float], percent: int) -> float:
+    """Return the nearest-rank percentile of the values."""
+    sorted_values = sorted(values)
+    return sorted_values[max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)]
@@ -1,10 +1,14 @@
 """SEL Tools config."""
 
+import os
 from pathlib import Path
 
 REPO_DIR = Path(__file__).resolve().parents[2]
+CACHE_DIR = REPO_DIR / ".cache"
+JOURNAL_DIR = CACHE_DIR / "journals"
 
 # Git & GitLab Config (this is all you need if you want to customize the config)
-GITLAB_SERVER_URL = "https://gitlab.lrz.de/"
+# Set GITLAB_SERVER_URL in the environment to use another server, e.g. the fake server for local runs
+GITLAB_SERVER_URL = os.environ.get("GITLAB_SERVER_URL", "https://gitlab.lrz.de/")
 RUNNER_ID = 3666
 GIT_MAIN_BRANCH = "master"
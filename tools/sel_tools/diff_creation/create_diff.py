@@ -1,5 +1,8 @@
 """Diff creation module."""
 
+import hashlib
+from collections.abc import Iterator
+from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
 
@@ -7,40 +10,112 @@ import git
 from git.objects.commit import Commit
 from tqdm import tqdm
 
-from sel_tools.diff_creation.report import Diff, DiffReport
+from sel_tools.diff_creation.report import Diff, DiffReport, DiffStat
+from sel_tools.utils.args import DEFAULT_PATCH_THRESHOLD
+from sel_tools.utils.commit_index import COMMIT_INDEX
+
+PATCH_STORE_FOLDER = Path("sel_tools") / "patches"
+# git log prints %x00 as the null byte starting every commit header
+COMMIT_FORMAT = "%x00%H"
+COMMIT_MARKER = "\x00"
+
+
+@dataclass(frozen=True)
+class DiffSettings:
+    """Settings for the patches created in addition to the diff statistics."""
+
+    diffstat_only: bool = False
+    patch_threshold: int = DEFAULT_PATCH_THRESHOLD
+    patch_commits: frozenset[str] = frozenset()
+
+    def includes_patch(self, hexsha: str, stat: DiffStat) -> bool:
+        """Return true if the patch is needed, otherwise false.
+
+        In diffstat only mode, only patches with at least patch_threshold changed
+        lines and patches of commits starting with one of patch_commits are needed.
+        """
+        return (
+            not self.diffstat_only
+            or stat.changed_lines >= self.patch_threshold
+            or any(hexsha.startswith(patch_commit) for patch_commit in self.patch_commits)
+        )
+
+
+DEFAULT_DIFF_SETTINGS = DiffSettings()
 
 
 def create_diff(
     repo_paths: list[Path],
     date_last_homework: date | None,
     evaluation_date: date | None,
+    settings: DiffSettings = DEFAULT_DIFF_SETTINGS,
 ) -> list[DiffReport]:
     """Create diff for given repositories since the last homework date."""
     return (
         []
         if date_last_homework is None
         else [
-            DiffCreator(repo_path, "build").create(date_last_homework, evaluation_date)
+            DiffCreator(repo_path, "build", settings).create(date_last_homework, evaluation_date)
             for repo_path in tqdm(repo_paths, desc=f"Create diff since {date_last_homework}")
         ]
     )
 
 
+class PatchStore:
+    """Patches persisted in the git folder of a repo to reuse them in later runs."""
+
+    def __init__(self, store_folder: Path) -> None:
+        self.__store_folder = store_folder
+
+    @staticmethod
+    def for_repo(repo: git.Repo) -> "PatchStore":
+        return PatchStore(Path(repo.git_dir) / PATCH_STORE_FOLDER)
+
+    def get(self, name: str) -> str | None:
+        patch_file = self.__patch_file(name)
+        return patch_file.read_text() if patch_file.is_file() else None
+
+    def put(self, name: str, patch: str) -> None:
+        self.__store_folder.mkdir(parents=True, exist_ok=True)
+        temporary_file = self.__patch_file(name).with_suffix(".tmp")
+        temporary_file.write_text(patch)
+        temporary_file.replace(self.__patch_file(name))
+
+    def __patch_file(self, name: str) -> Path:
+        return self.__store_folder / f"{name}.patch"
+
+
 class DiffCreator:
-    """Diff creator class."""
+    """Diff creator class.
 
-    def __init__(self, repo_path: Path, exclude: str | None = None) -> None:
+    The patches are stored in the git folder of the repo, so later runs only
+    compute the patches of new commits.
+    """
+
+    def __init__(
+        self, repo_path: Path, exclude: str | None = None, settings: DiffSettings = DEFAULT_DIFF_SETTINGS
+    ) -> None:
         self.__path = repo_path
         self.__repo = git.Repo(self.__path)
         self.__exclude = exclude
+        self.__settings = settings
+        self.__patch_store = PatchStore.for_repo(self.__repo)
 
     def create(self, date_last_homework: date, evaluation_date: date | None) -> DiffReport:
-        commits_since_last_homework = list(
-            self.__repo.iter_commits(since=date_last_homework, before=evaluation_date, no_merges=True)
+        # The diff ends at the commit the evaluation checked out
+        last_commit = COMMIT_INDEX.last_commit_before(self.__repo, evaluation_date)
+        commits_since_last_homework = (
+            list(
+                self.__repo.iter_commits(last_commit, since=date_last_homework, before=evaluation_date, no_merges=True)
+            )
+            if last_commit is not None
+            else []
         )
+        # Without evaluation date the total diff includes the uncommitted changes of the working tree
+        overall_diff_end = last_commit if evaluation_date is not None else None
         diffs = (
             [
-                self.__create_overall_diff(commits_since_last_homework[-1]),
+                self.__create_overall_diff(commits_since_last_homework[-1], overall_diff_end),
                 *self.__create_diff_per_commit(commits_since_last_homework),
             ]
             if commits_since_last_homework
@@ -48,27 +123,93 @@ class DiffCreator:
         )
         return DiffReport(self.__path, diffs)
 
-    def __create_overall_diff(self, commit: Commit) -> Diff:
-        patch = (
-            self.__repo.git.diff(commit.tree)
-            if self.__exclude is None
-            else self.__repo.git.diff(commit.tree, f":(exclude){self.__exclude}")
-        )
+    def __create_overall_diff(self, commit: Commit, end_commit: str | None) -> Diff:
+        """Create the diff from the commit to the end commit or, without end commit, to the working tree."""
+        diff_arguments: list = [commit.tree] if end_commit is None else [commit.tree, end_commit]
+        if self.__exclude is not None:
+            diff_arguments.append(f":(exclude){self.__exclude}")
+        stat = DiffStat.from_numstat(self.__repo.git.diff("--numstat", *diff_arguments).splitlines())
         return Diff(
             commit.hexsha,
             "total",
             str(commit.summary),
-            patch,
+            self.__create_overall_patch(commit, end_commit, diff_arguments)
+            if self.__settings.includes_patch(commit.hexsha, stat)
+            else None,
+            stat,
         )
 
+    def __create_overall_patch(self, commit: Commit, end_commit: str | None, diff_arguments: list) -> str:
+        # A diff against the working tree is only reused for a clean tree
+        name = None if end_commit is None and self.__repo.is_dirty() else self.__overall_patch_name(commit, end_commit)
+        patch = None if name is None else self.__patch_store.get(name)
+        if patch is None:
+            patch = self.__repo.git.diff(*diff_arguments)
+            if name is not None:
+                self.__patch_store.put(name, patch)
+        return patch
+
+    def __overall_patch_name(self, commit: Commit, end_commit: str | None) -> str:
+        key = f"{commit.hexsha} {end_commit or self.__repo.head.commit.hexsha} {self.__exclude}"
+        return f"total-{hashlib.sha256(key.encode()).hexdigest()}"
+
     def __create_diff_per_commit(self, commits: list[Commit]) -> list[Diff]:
+        commits = [commit for commit in commits if commit.parents]
+        stats = {
+            hexsha: DiffStat.from_numstat(lines)
+            for hexsha, lines in self.__iter_commit_logs("--numstat", [commit.hexsha for commit in commits])
+        }
+        patches = {
+            commit.hexsha: self.__patch_store.get(commit.hexsha)
+            for commit in commits
+            if self.__settings.includes_patch(commit.hexsha, stats[commit.hexsha])
+        }
+        missing_commits = [hexsha for hexsha, patch in patches.items() if patch is None]
+        for hexsha, lines in self.__iter_commit_logs("--patch", missing_commits):
+            patch = join_patch_lines(lines)
+            self.__patch_store.put(hexsha, patch)
+            patches[hexsha] = patch
         return [
             Diff(
                 commit.hexsha,
                 str(commit.author),
                 str(commit.summary),
-                self.__repo.git.diff(commit.parents[0].tree, commit.tree),
+                patches.get(commit.hexsha),
+                stats[commit.hexsha],
             )
             for commit in commits
-            if commit.parents
         ]
+
+    def __iter_commit_logs(self, log_option: str, hexshas: list[str]) -> Iterator[tuple[str, list[str]]]:
+        """Stream the log output of the commits against their first parents from a single git log call."""
+        if not hexshas:
+            return
+        process = self.__repo.git.log(
+            log_option,
+            "--no-walk",
+            "--no-color",
+            "--no-ext-diff",
+            f"--format={COMMIT_FORMAT}",
+            *hexshas,
+            as_process=True,
+        )
+        hexsha = None
+        lines: list[str] = []
+        for raw_line in process.stdout:
+            line = raw_line.decode(errors="replace")
+            if line.startswith(COMMIT_MARKER):
+                if hexsha is not None:
+                    yield hexsha, lines
+                hexsha = line.removeprefix(COMMIT_MARKER).strip()
+                lines = []
+            else:
+                lines.append(line)
+        process.wait()
+        if hexsha is not None:
+            yield hexsha, lines
+
+
+def join_patch_lines(lines: list[str]) -> str:
+    """Join the lines following a commit header of git log to the patch git diff prints."""
+    # git log separates the header from the patch by an empty line
+    return "".join(lines[1:] if lines and not lines[0].strip() else lines).rstrip("\n")
@@ -1,6 +1,9 @@
 """Git diff report."""
 
-from dataclasses import dataclass
+import hashlib
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import pandas as pd
@@ -20,14 +23,70 @@ The latter to make sure they are not evaluated again next time.
 """
 
 
+# Inserted lines, deleted lines and path
+NUMSTAT_COLUMNS = 3
+DIFF_STYLESHEET = "diff-style.css"
+HTML_CACHE_FOLDER = ".diff_html_cache"
+# Larger patches, e.g. of vendored libraries, are truncated to keep highlighting fast
+MAX_HIGHLIGHTED_PATCH_SIZE = 1024 * 1024
+DIFF_LEXER = DiffLexer()
+HTML_FORMATTER = HtmlFormatter(style="manni")
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<link rel="stylesheet" href="../%s">
+</head>
+<body>
+%s%s
+</body>
+</html>
+"""
+HTML_TRUNCATION_NOTE = "<p>Patch truncated after %d characters, see the patch file for the full diff.</p>"
+
+
+@dataclass(frozen=True)
+class DiffStat:
+    """Number of changed files and lines of a diff."""
+
+    files: int = 0
+    insertions: int = 0
+    deletions: int = 0
+    binary_files: int = 0
+
+    @property
+    def changed_lines(self) -> int:
+        return self.insertions + self.deletions
+
+    @staticmethod
+    def from_numstat(lines: list[str]) -> "DiffStat":
+        """Sum up the lines printed by git diff --numstat."""
+        files = insertions = deletions = binary_files = 0
+        for line in lines:
+            columns = line.split("\t", NUMSTAT_COLUMNS - 1)
+            if len(columns) != NUMSTAT_COLUMNS:
+                continue
+            files += 1
+            if columns[0] == "-":
+                binary_files += 1
+            else:
+                insertions += int(columns[0])
+                deletions += int(columns[1])
+        return DiffStat(files, insertions, deletions, binary_files)
+
+
 @dataclass
 class Diff:
-    """Git diff model."""
+    """Git diff model.
+
+    The patch is None if only the diff statistics were created.
+    """
 
     hexsha: str
     author: str
     message: str
-    patch: str
+    patch: str | None
+    stat: DiffStat = field(default_factory=DiffStat)
 
 
 @dataclass
@@ -49,36 +108,112 @@ class DiffReport:
                     "hexsha": diff.hexsha,
                     "author": diff.author,
                     "message": diff.message,
+                    "files": diff.stat.files,
+                    "insertions": diff.stat.insertions,
+                    "deletions": diff.stat.deletions,
+                    "binary_files": diff.stat.binary_files,
                 }
                 for diff in self.diffs
             ]
         )
 
     def write_diff_patches(self) -> None:
+        render_html_files(self.write_patch_files())
+
+    def write_patch_files(self) -> list[tuple[str, Path]]:
+        """Write the patch files and return the patches with the paths of their html files."""
+        patches = []
         for index, diff in enumerate(self.diffs):
+            if diff.patch is None:
+                continue
             base_path = self.repo_path / f"{index}-{diff.hexsha}"
-            try:
-                base_path.with_suffix(".patch").write_text(diff.patch, encoding="utf-8", errors="replace")
-                base_path.with_suffix(".html").write_text(
-                    self.highlight_diff(diff.patch), encoding="utf-8", errors="replace"
-                )
-            except UnicodeError:
-                print("UnicodeError: Fallback: clean the patch text by encoding/decoding to remove surrogates")
-                clean_patch = diff.patch.encode("utf-8", errors="replace").decode("utf-8", errors="replace")
-                base_path.with_suffix(".patch").write_text(clean_patch)
-                base_path.with_suffix(".html").write_text(self.highlight_diff(clean_patch))
+            # Replace surrogates of undecodable bytes in the patch
+            clean_patch = diff.patch.encode("utf-8", errors="replace").decode("utf-8")
+            base_path.with_suffix(".patch").write_text(clean_patch, encoding="utf-8")
+            patches.append((clean_patch, base_path.with_suffix(".html")))
+        return patches
 
     @staticmethod
     def highlight_diff(patch: str) -> str:
-        return str(highlight(patch, DiffLexer(), HtmlFormatter(full=True, style="manni")))
-
-
-def write_diff_reports(reports: list[DiffReport], report_base_name: str) -> None:
-    """Write diff reports to disk."""
+        return str(highlight(patch, DIFF_LEXER, HTML_FORMATTER))
+
+
+def render_html_files(patches: list[tuple[str, Path]], max_workers: int = 1) -> None:
+    """Write the highlighted html files of the patches.
+
+    Every patch is rendered once into the html cache of its workspace and up to
+    max_workers patches are rendered in parallel processes.
+    """
+    cache_files = [
+        html_file.parent.parent / HTML_CACHE_FOLDER / f"{hash_patch(patch)}.html" for patch, html_file in patches
+    ]
+    missing_patches = {
+        cache_file: patch
+        for (patch, _), cache_file in zip(patches, cache_files, strict=True)
+        if not cache_file.exists()
+    }
+    if max_workers == 1:
+        rendered_html = list(map(render_patch_html, missing_patches.values()))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            rendered_html = list(executor.map(render_patch_html, missing_patches.values(), chunksize=4))
+    for cache_file, html in zip(missing_patches, rendered_html, strict=True):
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(html, encoding="utf-8")
+    for workspace in {html_file.parent.parent for _, html_file in patches}:
+        write_stylesheet(workspace)
+    for (_, html_file), cache_file in zip(patches, cache_files, strict=True):
+        shutil.copyfile(cache_file, html_file)
+
+
+def render_patch_html(patch: str) -> str:
+    """Render the highlighted html page of a patch, truncating very large patches."""
+    if len(patch) <= MAX_HIGHLIGHTED_PATCH_SIZE:
+        return HTML_TEMPLATE % (DIFF_STYLESHEET, DiffReport.highlight_diff(patch), "")
+    return HTML_TEMPLATE % (
+        DIFF_STYLESHEET,
+        DiffReport.highlight_diff(patch[:MAX_HIGHLIGHTED_PATCH_SIZE]),
+        HTML_TRUNCATION_NOTE % MAX_HIGHLIGHTED_PATCH_SIZE,
+    )
+
+
+def write_stylesheet(workspace: Path) -> None:
+    """Write the stylesheet shared by all html files of the workspace unless it is up to date."""
+    stylesheet = workspace / DIFF_STYLESHEET
+    style = HTML_FORMATTER.get_style_defs(".highlight")
+    if not stylesheet.exists() or stylesheet.read_text() != style:
+        stylesheet.write_text(style)
+
+
+def prune_html_cache(patches: list[tuple[str, Path]]) -> None:
+    """Remove the cached html files of the workspaces that none of the patches uses anymore."""
+    used_cache_files = {
+        html_file.parent.parent / HTML_CACHE_FOLDER / f"{hash_patch(patch)}.html" for patch, html_file in patches
+    }
+    for workspace in {html_file.parent.parent for _, html_file in patches}:
+        for cache_file in (workspace / HTML_CACHE_FOLDER).glob("*.html"):
+            if cache_file not in used_cache_files:
+                cache_file.unlink()
+
+
+def hash_patch(patch: str) -> str:
+    """Hash the patch together with the settings affecting its html."""
+    return hashlib.sha256(f"{MAX_HIGHLIGHTED_PATCH_SIZE}\n{patch}".encode()).hexdigest()
+
+
+def write_diff_reports(reports: list[DiffReport], report_base_name: str, max_workers: int = 1) -> None:
+    """Write diff reports to disk.
+
+    The html files of all reports are rendered in up to max_workers parallel processes.
+    Cached html files not used by any of the reports are removed afterwards.
+    """
+    patches = []
     for report in reports:
         print(f"Writing diff report for {report.repo_path.name}")
         report.generate_overview_table().to_csv(report.repo_path.joinpath(report_base_name).with_suffix(".csv"))
-        report.write_diff_patches()
+        patches.extend(report.write_patch_files())
+    render_html_files(patches, max_workers)
+    prune_html_cache(patches)
 
 
 def write_report_for_inactive_student_repos(reports: list[DiffReport], workspace: Path) -> None:
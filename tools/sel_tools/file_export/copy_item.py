@@ -1,10 +1,16 @@
 """Copy file or folder with support for an ignore file."""
 
+import hashlib
+import json
 import shutil
+import stat
 from collections.abc import Callable
 from pathlib import Path
 
 from sel_tools.file_export.config import EXPORT_IGNORE
+from sel_tools.utils.files import GIT_FOLDER, FileWalker
+
+SYNC_MANIFEST_FILE = Path("sel_tools") / "export_manifest.json"
 
 
 def copy_item(source: Path, dest: Path) -> None:
@@ -44,3 +50,81 @@ def ignore_files(ignore_set: set[Path]) -> Callable:
         return [item for item in contents if Path(directory).joinpath(item).resolve() in ignore_set]
 
     return ignore_callable
+
+
+class SyncManifest:
+    """Hashes and file stats of the files synced into a repo by former exports.
+
+    A file whose size, modification time and mode are unchanged since it was
+    synced still has the recorded content, so it is not read again. The manifest is
+    kept in the git folder of the repo, without one every file is compared.
+    """
+
+    def __init__(self, manifest_file: Path | None) -> None:
+        self.__manifest_file = manifest_file
+        self.__entries: dict[str, list] = {}
+        if manifest_file is not None and manifest_file.is_file():
+            try:
+                self.__entries = json.loads(manifest_file.read_text())
+            except ValueError:
+                self.__entries = {}
+
+    @staticmethod
+    def for_repo(repo: Path) -> "SyncManifest":
+        git_dir = repo / GIT_FOLDER
+        return SyncManifest(git_dir / SYNC_MANIFEST_FILE if git_dir.is_dir() else None)
+
+    def is_synced(self, relative_path: str, file_hash: str, file: Path) -> bool:
+        entry = self.__entries.get(relative_path)
+        if entry is None or entry[0] != file_hash:
+            return False
+        file_stat = file.stat()
+        return entry[1:] == [file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_mode]
+
+    def record(self, relative_path: str, file_hash: str, file: Path) -> None:
+        file_stat = file.stat()
+        self.__entries[relative_path] = [file_hash, file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_mode]
+
+    def save(self) -> None:
+        if self.__manifest_file is None:
+            return
+        self.__manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        self.__manifest_file.write_text(json.dumps(self.__entries))
+
+
+def hash_files(folder: Path) -> dict[str, str]:
+    """Return the hashes of all files in folder by their relative path."""
+    return {
+        file.relative_to(folder).as_posix(): hash_file(file)
+        for file in FileWalker(ignore_folders=frozenset()).walk(folder)
+    }
+
+
+def hash_file(file: Path) -> str:
+    """Return the permission bits and the sha256 hex digest of the file content, e.g. to keep executables."""
+    with file.open("rb") as content:
+        return f"{stat.S_IMODE(file.stat().st_mode):o}:{hashlib.file_digest(content, 'sha256').hexdigest()}"
+
+
+def sync_item(source: Path, dest: Path, source_hashes: dict[str, str] | None = None) -> int:
+    """Copy only the files of folder 'source' missing or differing in dest and return their number.
+
+    Repos synced before only need to read the files that changed since then.
+    """
+    source_hashes = hash_files(source) if source_hashes is None else source_hashes
+    manifest = SyncManifest.for_repo(dest)
+    copied_files = 0
+    for relative_path, file_hash in source_hashes.items():
+        dest_file = dest / relative_path
+        if dest_file.is_file() and (
+            manifest.is_synced(relative_path, file_hash, dest_file) or hash_file(dest_file) == file_hash
+        ):
+            manifest.record(relative_path, file_hash, dest_file)
+            continue
+        dest_file.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source / relative_path, dest_file)
+        shutil.copymode(source / relative_path, dest_file)
+        manifest.record(relative_path, file_hash, dest_file)
+        copied_files += 1
+    manifest.save()
+    return copied_files
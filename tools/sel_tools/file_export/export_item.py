@@ -1,25 +1,42 @@
 """Copy files and folders and apply postprocessing on the targets."""
 
+import tempfile
 from pathlib import Path
 
-from sel_tools.file_export.copy_item import copy_item
+from sel_tools.file_export.copy_item import copy_item, hash_files, sync_item
 from sel_tools.file_export.file_content_remover import SolutionsRemoverVisitor
-from sel_tools.file_export.formatter import FormatterVisitor
-from sel_tools.utils.files import FileTree
+from sel_tools.file_export.formatter import FormattedHashes, FormatterVisitor
+from sel_tools.utils.files import FileTree, FileVisitor
+
+EXPORT_STAGING_PREFIX = ".export_staging_"
 
 
 def export_items(source: Path, repo_paths: list[Path], keep_solutions: bool) -> None:
-    """Export all files of source into every repo."""
-    for repo in repo_paths:
-        # TODO maybe we need to make the repo clean
-        copy_item(source, repo)
-        visit_exported_item(repo, keep_solutions)
+    """Export all files of source into every repo.
+
+    The export is done once into a staging folder, from which only the changed
+    files are copied into the repos. The staging folder is placed next to the
+    repos, so the formatters find the same style files in the parent folders,
+    e.g. the `.clang-format` of the course, as when formatting in the repos.
+    """
+    if not repo_paths:
+        return
+    with tempfile.TemporaryDirectory(prefix=EXPORT_STAGING_PREFIX, dir=repo_paths[0].parent) as staging_dir:
+        staging_item = Path(staging_dir) / "export"
+        if source.is_file():
+            staging_item.mkdir()
+            copy_item(source, staging_item / source.name)
+        else:
+            copy_item(source, staging_item)
+        visit_exported_item(staging_item, keep_solutions)
+        source_hashes = hash_files(staging_item)
+        for repo in repo_paths:
+            # TODO maybe we need to make the repo clean
+            sync_item(staging_item, repo, source_hashes)
 
 
 def visit_exported_item(output_dir: Path, keep_solutions: bool) -> None:
     """Apply visitors on the file tree copied."""
-    output_file_tree = FileTree(output_dir)
-    if not keep_solutions:
-        output_file_tree.accept(SolutionsRemoverVisitor())
-
-    output_file_tree.accept(FormatterVisitor())
+    visitors: list[FileVisitor] = [] if keep_solutions else [SolutionsRemoverVisitor()]
+    visitors.append(FormatterVisitor(FormattedHashes()))
+    FileTree(output_dir).accept_all(visitors)
@@ -1,33 +1,123 @@
 """Formatter module."""
 
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
 from pathlib import Path
 from shutil import which
 from subprocess import run
 
+from sel_tools.config import CACHE_DIR
 from sel_tools.utils.files import FileVisitor, is_cmake, is_cpp
 
+CLANG_FORMAT = "clang-format"
+CMAKE_FORMAT = "cmake-format"
+CLANG_FORMAT_STYLE_FILE = ".clang-format"
+FORMAT_BATCH_SIZE = 64
+FORMATTED_HASHES_FILE = CACHE_DIR / "formatted_hashes.txt"
+MAX_FORMATTED_HASHES = 100_000
+
+
+class FormattedHashes:
+    """Persistent hashes of file contents which are already formatted."""
+
+    def __init__(self, hashes_file: Path = FORMATTED_HASHES_FILE, max_hashes: int = MAX_FORMATTED_HASHES) -> None:
+        self.__hashes_file = hashes_file
+        self.__max_hashes = max_hashes
+        self.__hashes = dict.fromkeys(hashes_file.read_text().split()) if hashes_file.exists() else {}
+
+    def __contains__(self, content_hash: str) -> bool:
+        return content_hash in self.__hashes
+
+    def add(self, content_hash: str) -> None:
+        self.__hashes.pop(content_hash, None)
+        self.__hashes[content_hash] = None
+
+    def save(self) -> None:
+        self.__hashes_file.parent.mkdir(parents=True, exist_ok=True)
+        newest_hashes = list(self.__hashes)[-self.__max_hashes :]
+        self.__hashes_file.write_text("".join(f"{content_hash}\n" for content_hash in newest_hashes))
+
 
 class FormatterVisitor(FileVisitor):
-    """Format file.
+    """Format files.
 
     Auto-selects formatter depending on file suffix. Formats cpp and cmake,
-    ignores other file types
+    ignores other file types. Files are collected during the visit and
+    formatted in batches on a worker pool when finished. Files whose content
+    is known as formatted are skipped.
     """
 
+    def __init__(self, formatted_hashes: FormattedHashes | None = None, max_workers: int | None = None) -> None:
+        self.__formatted_hashes = formatted_hashes
+        self.__max_workers = max_workers
+        self.__files: dict[str, list[Path]] = {CLANG_FORMAT: [], CMAKE_FORMAT: []}
+
     def visit_file(self, file: Path) -> None:
         if is_cpp(file):
-            apply_clang_format(file)
+            self.__files[CLANG_FORMAT].append(file)
         elif is_cmake(file):
-            apply_cmake_format(file)
+            self.__files[CMAKE_FORMAT].append(file)
+
+    def finish(self) -> None:
+        files = {
+            formatter: [file for file in files if not self.__is_formatted(formatter, file)]
+            for formatter, files in self.__files.items()
+            if is_formatter_available(formatter)
+        }
+        batches = [
+            (formatter, formatter_files[index : index + FORMAT_BATCH_SIZE])
+            for formatter, formatter_files in files.items()
+            for index in range(0, len(formatter_files), FORMAT_BATCH_SIZE)
+        ]
+        with ThreadPoolExecutor(self.__max_workers) as executor:
+            list(executor.map(lambda batch: apply_format(*batch), batches))
+
+        if self.__formatted_hashes is not None and batches:
+            for formatter, formatted_files in files.items():
+                for file in formatted_files:
+                    self.__formatted_hashes.add(self.__content_hash(formatter, file))
+            self.__formatted_hashes.save()
+        self.__files = {CLANG_FORMAT: [], CMAKE_FORMAT: []}
+
+    def __is_formatted(self, formatter: str, file: Path) -> bool:
+        return self.__formatted_hashes is not None and self.__content_hash(formatter, file) in self.__formatted_hashes
+
+    def __content_hash(self, formatter: str, file: Path) -> str:
+        content_hash = hashlib.sha256(formatter.encode())
+        if formatter == CLANG_FORMAT and (style_file := find_clang_format_style_file(file)) is not None:
+            content_hash.update(style_file.read_bytes())
+        content_hash.update(file.read_bytes())
+        return content_hash.hexdigest()
+
+
+@cache
+def is_formatter_available(formatter: str) -> bool:
+    """Return true if the formatter is installed, otherwise false."""
+    return which(formatter) is not None
+
+
+def find_clang_format_style_file(file: Path) -> Path | None:
+    """Return the clang-format style file applying to the file if there is one."""
+    for folder in file.absolute().parents:
+        if (style_file := folder / CLANG_FORMAT_STYLE_FILE).is_file():
+            return style_file
+    return None
+
+
+def apply_format(formatter: str, files: list[Path]) -> None:
+    """Apply the formatter in place to files."""
+    if formatter == CLANG_FORMAT:
+        apply_clang_format(files)
+    else:
+        apply_cmake_format(files)
 
 
-def apply_clang_format(file: Path) -> None:
-    """Apply clang-format with default config in place to file."""
-    if which("clang-format"):
-        run(f"clang-format -i {file}", shell=True, check=True)
+def apply_clang_format(files: list[Path]) -> None:
+    """Apply clang-format with default config in place to files."""
+    run([CLANG_FORMAT, "-i", *map(str, files)], check=True)
 
 
-def apply_cmake_format(file: Path) -> None:
-    """Apply cmake-format with default config in place to file."""
-    if which("cmake-format"):
-        run(f"cmake-format -i {file}", shell=True, check=True)
+def apply_cmake_format(files: list[Path]) -> None:
+    """Apply cmake-format with default config in place to files."""
+    run([CMAKE_FORMAT, "-i", *map(str, files)], check=True)
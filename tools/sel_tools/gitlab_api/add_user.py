@@ -1,44 +1,150 @@
 """Add users to projects."""
 
+import json
+import threading
+from dataclasses import dataclass
 from pathlib import Path
 
 import gitlab
+from gitlab.v4.objects import Project, User
 
+from sel_tools.config import CACHE_DIR
 from sel_tools.file_parsing.student_group_parser import (
     Student,
     get_student_groups_from_file,
 )
+from sel_tools.gitlab_api.async_gitlab import DEFAULT_MAX_CONCURRENCY, AsyncGitlab
 
+USER_ID_CACHE_FILE = CACHE_DIR / "gitlab_user_ids.json"
 
-def add_users(student_repos: list[dict], student_group_file: Path, gitlab_instance: gitlab.Gitlab) -> None:
-    """Add all students to repositories."""
+
+class UserIdCache:
+    """Persistent cache of the gitlab user ids of email addresses per gitlab server, safe to use from threads."""
+
+    def __init__(self, cache_file: Path = USER_ID_CACHE_FILE) -> None:
+        self.__cache_file = cache_file
+        self.__user_ids: dict[str, dict[str, int]] = json.loads(cache_file.read_text()) if cache_file.exists() else {}
+        self.__lock = threading.Lock()
+
+    def get(self, server_url: str, mail_addr: str) -> int | None:
+        with self.__lock:
+            return self.__user_ids.get(server_url, {}).get(mail_addr.lower())
+
+    def put(self, server_url: str, mail_addr: str, user_id: int) -> None:
+        with self.__lock:
+            self.__user_ids.setdefault(server_url, {})[mail_addr.lower()] = user_id
+
+    def save(self) -> None:
+        with self.__lock:
+            content = json.dumps(self.__user_ids, sort_keys=True, indent=2)
+        self.__cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.__cache_file.write_text(content)
+
+
+@dataclass(frozen=True)
+class AddUsersSettings:
+    """Settings of adding the students to their repositories."""
+
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    user_id_cache: UserIdCache | None = None
+    dry_run: bool = False
+
+
+DEFAULT_ADD_USERS_SETTINGS = AddUsersSettings()
+
+
+def add_users(
+    student_repos: list[dict],
+    student_group_file: Path,
+    gitlab_instance: gitlab.Gitlab,
+    settings: AddUsersSettings = DEFAULT_ADD_USERS_SETTINGS,
+) -> None:
+    """Add all students to repositories who are not yet members."""
+    async_gitlab = AsyncGitlab(gitlab_instance, settings.max_concurrency)
     students = get_student_groups_from_file(student_group_file)
-    students_found = find_gitlab_users_of_students(gitlab_instance, students)
-    repo_from_group_id = {
-        int(repo["name"].split("_")[-1]): gitlab_instance.projects.get(repo["id"]) for repo in student_repos
-    }
-    add_students_to_repos(students_found, repo_from_group_id)
+    students_found = find_gitlab_users_of_students(gitlab_instance, students, settings.user_id_cache, async_gitlab)
+    repos = async_gitlab.map_sync(lambda repo: gitlab_instance.projects.get(repo["id"]), student_repos, idempotent=True)
+    member_ids = async_gitlab.map_sync(get_member_ids, repos, idempotent=True)
+    group_ids = [int(repo["name"].split("_")[-1]) for repo in student_repos]
+    repo_from_group_id = dict(zip(group_ids, repos, strict=True))
+    member_ids_from_group_id = dict(zip(group_ids, member_ids, strict=True))
+    add_students_to_repos(students_found, repo_from_group_id, member_ids_from_group_id, settings.dry_run, async_gitlab)
 
 
-def find_gitlab_users_of_students(gitlab_instance: gitlab.Gitlab, students: list[Student]) -> list[Student]:
-    """Return list of students with their Gitlab users."""
-    for student in students:
-        try:
-            student.gitlab_user = gitlab_instance.users.list(search=student.mail_addr)[0]
-        except IndexError:
-            student.gitlab_user = None
+def find_gitlab_users_of_students(
+    gitlab_instance: gitlab.Gitlab,
+    students: list[Student],
+    user_id_cache: UserIdCache | None = None,
+    async_gitlab: AsyncGitlab | None = None,
+) -> list[Student]:
+    """Return list of students with their Gitlab users.
+
+    Users are looked up concurrently unless their id is already cached.
+    """
+
+    def find_gitlab_user(student: Student) -> User | None:
+        if user_id_cache is not None and (user_id := user_id_cache.get(gitlab_instance.url, student.mail_addr)):
+            return gitlab_instance.users.get(user_id, lazy=True)
+        users = gitlab_instance.users.list(search=student.mail_addr)
+        if not users:
+            return None
+        if user_id_cache is not None:
+            user_id_cache.put(gitlab_instance.url, student.mail_addr, users[0].id)
+        return users[0]
+
+    async_gitlab = async_gitlab or AsyncGitlab(gitlab_instance, max_concurrency=1)
+    for student, gitlab_user in zip(
+        students, async_gitlab.map_sync(find_gitlab_user, students, idempotent=True), strict=True
+    ):
+        if gitlab_user is None:
             print(f"Student {student.name} with {student.mail_addr} not found!")
+        else:
+            student.gitlab_user = gitlab_user
+    if user_id_cache is not None:
+        user_id_cache.save()
     return [student for student in students if student.gitlab_user is not None]
 
 
-def add_students_to_repos(students: list[Student], repo_from_group_id: dict) -> None:
-    """Add students to repositories."""
-    print(f"Adding {len(students)} to their projects!")
+def get_member_ids(gitlab_project: Project) -> set[int]:
+    """Return the ids of all users with access to the project, including inherited members."""
+    return {member.id for member in gitlab_project.members_all.list(get_all=True)}
+
+
+def add_students_to_repos(
+    students: list[Student],
+    repo_from_group_id: dict,
+    member_ids_from_group_id: dict[int, set[int]] | None = None,
+    dry_run: bool = False,
+    async_gitlab: AsyncGitlab | None = None,
+) -> None:
+    """Add students to repositories unless they are members already."""
+    member_ids_from_group_id = member_ids_from_group_id or {}
+    new_members = []
     for student in students:
         repo = repo_from_group_id[student.group_id]
+        if student.gitlab_user.id in member_ids_from_group_id.get(student.group_id, set()):
+            continue
+        new_members.append((student, repo))
+    print(f"{len(students) - len(new_members)} of {len(students)} students are already members of their projects.")
+
+    if dry_run:
+        print(f"Would add {len(new_members)} students to their projects:")
+        for student, repo in new_members:
+            print(f"- {student.name} ({student.mail_addr}) to {repo.name}")
+        return
+
+    def add_student_to_repo(new_member: tuple[Student, Project]) -> None:
+        student, repo = new_member
         repo.members.create(
             {
                 "user_id": student.gitlab_user.id,
                 "access_level": gitlab.const.DEVELOPER_ACCESS,
             }
         )
+
+    print(f"Adding {len(new_members)} to their projects!")
+    if async_gitlab is None:
+        for new_member in new_members:
+            add_student_to_repo(new_member)
+    else:
+        async_gitlab.map_sync(add_student_to_repo, new_members)
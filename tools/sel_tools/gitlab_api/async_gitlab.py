@@ -0,0 +1,159 @@
+"""Asyncio facade for concurrent calls to a gitlab instance."""
+
+import asyncio
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterable
+from typing import Any, TypeVar
+
+import gitlab
+import requests
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 30.0
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class RateLimiter:
+    """Shared pause of all requests while the gitlab rate limit is exhausted.
+
+    Registered as response hook of the requests session, it reads the
+    Retry-After and RateLimit-* headers of every response. It is pickled
+    without its lock along with the session, e.g. for the gitlab projects
+    sent to the worker processes of a parallel evaluation.
+    """
+
+    def __init__(self) -> None:
+        self.__resume_time = 0.0
+        self.__lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, Any]:
+        with self.__lock:
+            return {"resume_time": self.__resume_time}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__resume_time = state["resume_time"]
+        self.__lock = threading.Lock()
+
+    @property
+    def delay(self) -> float:
+        with self.__lock:
+            return max(0.0, self.__resume_time - time.time())
+
+    def update(self, response: requests.Response, *_: Any, **__: Any) -> None:
+        headers = response.headers
+        if "Retry-After" in headers and response.status_code == requests.codes.too_many_requests:
+            resume_time = time.time() + float(headers["Retry-After"])
+        elif headers.get("RateLimit-Remaining") == "0" and "RateLimit-Reset" in headers:
+            resume_time = float(headers["RateLimit-Reset"])
+        else:
+            return
+        with self.__lock:
+            self.__resume_time = max(self.__resume_time, resume_time)
+
+
+class SessionRateLimiters:
+    """Rate limiters by requests session, registered once as response hook of their session."""
+
+    def __init__(self) -> None:
+        self.__rate_limiters: weakref.WeakKeyDictionary[requests.Session, RateLimiter] = weakref.WeakKeyDictionary()
+        self.__lock = threading.Lock()
+
+    def get(self, session: requests.Session) -> RateLimiter:
+        with self.__lock:
+            if (rate_limiter := self.__rate_limiters.get(session)) is None:
+                rate_limiter = SessionRateLimiters.find_registered(session) or RateLimiter()
+                if rate_limiter.update not in session.hooks["response"]:
+                    session.hooks["response"].append(rate_limiter.update)
+                self.__rate_limiters[session] = rate_limiter
+            return rate_limiter
+
+    @staticmethod
+    def find_registered(session: requests.Session) -> RateLimiter | None:
+        """Find the rate limiter an unpickled session was registered with before it was pickled."""
+        for hook in session.hooks["response"]:
+            if isinstance(rate_limiter := getattr(hook, "__self__", None), RateLimiter):
+                return rate_limiter
+        return None
+
+
+SESSION_RATE_LIMITERS = SessionRateLimiters()
+
+
+class AsyncGitlab:
+    """Run blocking python-gitlab calls concurrently on threads.
+
+    At most max_concurrency calls run at once over the pooled session of the
+    gitlab instance. Calls wait while the rate limit of the session is
+    exhausted and are retried with exponential backoff when rate limited.
+    Idempotent calls are also retried on connection and server errors, since
+    only then a repeated request cannot duplicate a change already applied.
+    """
+
+    def __init__(
+        self,
+        gitlab_instance: gitlab.Gitlab,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        self.__gitlab_instance = gitlab_instance
+        self.__max_concurrency = max_concurrency
+        self.__max_retries = max_retries
+        self.__rate_limiter = SESSION_RATE_LIMITERS.get(gitlab_instance.session)
+
+    @property
+    def gitlab(self) -> gitlab.Gitlab:
+        return self.__gitlab_instance
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return self.__rate_limiter
+
+    async def call(self, function: Callable[..., T], *args: Any, idempotent: bool = False, **kwargs: Any) -> T:
+        """Call the blocking function on a thread with retries."""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self.__rate_limiter.delay)
+            try:
+                return await asyncio.to_thread(function, *args, **kwargs)
+            except (requests.ConnectionError, gitlab.GitlabHttpError) as error:
+                if attempt >= self.__max_retries or not is_retryable(error, idempotent):
+                    raise
+            await asyncio.sleep(backoff_seconds(attempt))
+            attempt += 1
+
+    async def map(self, function: Callable[[Any], T], items: Iterable[Any], idempotent: bool = False) -> list[T]:
+        """Call the function for all items concurrently and return the results in order."""
+        semaphore = asyncio.Semaphore(self.__max_concurrency)
+
+        async def limited_call(item: Any) -> T:
+            async with semaphore:
+                return await self.call(function, item, idempotent=idempotent)
+
+        return await asyncio.gather(*(limited_call(item) for item in items))
+
+    def map_sync(self, function: Callable[[Any], T], items: Iterable[Any], idempotent: bool = False) -> list[T]:
+        """Call the function for all items concurrently from synchronous code."""
+        return asyncio.run(self.map(function, items, idempotent))
+
+
+def is_retryable(error: Exception, idempotent: bool) -> bool:
+    """Return true if the request failed temporarily and can be repeated safely, otherwise false.
+
+    Rate limited requests were rejected unprocessed and are always retryable.
+    """
+    if isinstance(error, gitlab.GitlabHttpError):
+        if error.response_code == requests.codes.too_many_requests:
+            return True
+        return idempotent and error.response_code in RETRYABLE_STATUS_CODES
+    return idempotent and isinstance(error, requests.ConnectionError)
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Return the exponentially growing waiting time before retrying."""
+    return float(min(BACKOFF_BASE_SECONDS * 2**attempt, MAX_BACKOFF_SECONDS))
@@ -1,15 +1,65 @@
 """Upload attachments to gitlab."""
 
+import hashlib
+import json
+import os
+import threading
 from pathlib import Path
 
 from gitlab.v4.objects import Project
 
 from sel_tools.config import REPO_DIR
 
+UPLOAD_CACHE_SUFFIX = ".uploads.json"
 
-def upload_attachments(attachments: list[Path], gitlab_project: Project) -> list:
-    """Upload attachments to gitlab and return the URL."""
-    return [gitlab_project.upload(attachment.name, filepath=attachment) for attachment in attachments]
+
+class UploadCache:
+    """Persistent cache of the files uploaded to gitlab projects.
+
+    Maps the project id and the content hash of an attachment to the upload
+    returned by gitlab, so the same file is uploaded only once per project.
+    """
+
+    def __init__(self, cache_file: Path) -> None:
+        self.__cache_file = cache_file
+        self.__uploads: dict[str, dict[str, dict]] = json.loads(cache_file.read_text()) if cache_file.exists() else {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def for_student_repo_info_file(student_repo_info_file: Path) -> "UploadCache":
+        return UploadCache(student_repo_info_file.with_suffix(UPLOAD_CACHE_SUFFIX))
+
+    @staticmethod
+    def create_key(attachment: Path) -> str:
+        return f"{hashlib.sha256(attachment.read_bytes()).hexdigest()}/{attachment.name}"
+
+    def get(self, project_id: int, key: str) -> dict | None:
+        with self.__lock:
+            return self.__uploads.get(str(project_id), {}).get(key)
+
+    def put(self, project_id: int, key: str, uploaded_file: dict) -> None:
+        with self.__lock:
+            self.__uploads.setdefault(str(project_id), {})[key] = uploaded_file
+            temporary_file = self.__cache_file.with_name(f".{self.__cache_file.name}.{os.getpid()}.tmp")
+            temporary_file.write_text(json.dumps(self.__uploads, sort_keys=True, indent=2))
+            temporary_file.replace(self.__cache_file)
+
+
+def upload_attachments(attachments: list[Path], gitlab_project: Project, cache: UploadCache | None = None) -> list:
+    """Upload attachments to gitlab unless cached and return the URL."""
+    return [upload_attachment(attachment, gitlab_project, cache) for attachment in attachments]
+
+
+def upload_attachment(attachment: Path, gitlab_project: Project, cache: UploadCache | None) -> dict:
+    """Upload attachment to gitlab unless cached and return the URL."""
+    if cache is None:
+        return dict(gitlab_project.upload(attachment.name, filepath=str(attachment)))
+    key = UploadCache.create_key(attachment)
+    if (uploaded_file := cache.get(gitlab_project.id, key)) is not None:
+        return uploaded_file
+    uploaded_file = dict(gitlab_project.upload(attachment.name, filepath=str(attachment)))
+    cache.put(gitlab_project.id, key, uploaded_file)
+    return uploaded_file
 
 
 def replace_file_paths_with_urls(description: str, uploaded_files: list, attachments: list[Path]) -> str:
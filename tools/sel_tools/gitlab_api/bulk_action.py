@@ -0,0 +1,33 @@
+"""Settings and journals for actions on all student repos."""
+
+import hashlib
+from dataclasses import dataclass
+
+from sel_tools.config import JOURNAL_DIR
+from sel_tools.gitlab_api.attachments import UploadCache
+from sel_tools.utils.journal import Journal
+
+
+@dataclass(frozen=True)
+class BulkActionSettings:
+    """Settings for actions on all student repos."""
+
+    max_workers: int = 1
+    upload_cache: UploadCache | None = None
+    journal: Journal | None = None
+
+
+DEFAULT_BULK_ACTION_SETTINGS = BulkActionSettings()
+
+
+def create_invocation_id(action: str, inputs: list[str]) -> str:
+    """Create an id that is identical for invocations of an action with the same inputs."""
+    return hashlib.sha256("\n".join([action, *inputs]).encode()).hexdigest()[:16]
+
+
+def create_action_journal(action: str, inputs: list[str], ignore_journal: bool = False) -> Journal:
+    """Create the journal of an action invocation to resume a previous run with the same inputs."""
+    journal_file = JOURNAL_DIR / f"{action}_{create_invocation_id(action, inputs)}.jsonl"
+    if ignore_journal:
+        journal_file.unlink(missing_ok=True)
+    return Journal(journal_file)
@@ -1,32 +1,62 @@
 """Comment to gitlab issues."""
 
+from concurrent.futures import ThreadPoolExecutor
+
 import gitlab
 from gitlab.v4.objects import Project
 from tqdm import tqdm
 
 from sel_tools.gitlab_api.attachments import (
+    UploadCache,
     replace_file_paths_with_urls,
     upload_attachments,
 )
+from sel_tools.gitlab_api.bulk_action import DEFAULT_BULK_ACTION_SETTINGS, BulkActionSettings
 from sel_tools.utils.comment import Comment, ProjectCommentParser
+from sel_tools.utils.journal import Journal
+
 
+def comment_issues(
+    comment: Comment,
+    student_repos: list[dict],
+    gitlab_instance: gitlab.Gitlab,
+    settings: BulkActionSettings = DEFAULT_BULK_ACTION_SETTINGS,
+) -> None:
+    """Comment to all issues from comment to student repos.
 
-def comment_issues(comment: Comment, student_repos: list[dict], gitlab_instance: gitlab.Gitlab) -> None:
-    """Comment to all issues from comment to student repos."""
+    Up to max_workers student repos are commented concurrently. Repos commented
+    according to the journal of a previous run are skipped.
+    """
     project_comment_parser = ProjectCommentParser(comment, [student_repo["id"] for student_repo in student_repos])
-    for student_repo in tqdm(
-        student_repos,
-        desc="Commenting same message to all issues"
-        if project_comment_parser.is_same_comment_for_all_projects
-        else "Commenting specific message to individual projects",
-    ):
+    journal = settings.journal or Journal()
+
+    def comment_student_repo(student_repo: dict) -> None:
+        key = str(student_repo["id"])
+        if journal.is_done(key, "comment"):
+            return
         student_homework_project = gitlab_instance.projects.get(student_repo["id"])
-        create_comment(project_comment_parser.get_comment_for_project(student_repo["id"]), student_homework_project)
+        create_comment(
+            project_comment_parser.get_comment_for_project(student_repo["id"]),
+            student_homework_project,
+            settings.upload_cache,
+        )
+        journal.record(key, "comment")
+
+    with ThreadPoolExecutor(max_workers=settings.max_workers) as executor:
+        list(
+            tqdm(
+                executor.map(comment_student_repo, student_repos),
+                total=len(student_repos),
+                desc="Commenting same message to all issues"
+                if project_comment_parser.is_same_comment_for_all_projects
+                else "Commenting specific message to individual projects",
+            )
+        )
 
 
-def create_comment(comment: Comment, gitlab_project: Project) -> None:
+def create_comment(comment: Comment, gitlab_project: Project, upload_cache: UploadCache | None = None) -> None:
     """Create issue for gitlab project from task."""
-    uploaded_files = upload_attachments(comment.attachments, gitlab_project)
+    uploaded_files = upload_attachments(comment.attachments, gitlab_project, upload_cache)
     comment.message = replace_file_paths_with_urls(comment.message, uploaded_files, comment.attachments)
 
     issue = gitlab_project.issues.get(comment.issue_id)
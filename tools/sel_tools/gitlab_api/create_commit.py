@@ -1,6 +1,11 @@
 """Create Gitlab commit."""
 
-from functools import lru_cache
+import base64
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import git
@@ -8,9 +13,15 @@ import gitlab
 from gitlab.v4.objects import Project
 from tqdm import tqdm
 
+from sel_tools.gitlab_api.bulk_action import DEFAULT_BULK_ACTION_SETTINGS, BulkActionSettings
 from sel_tools.utils.files import FileTree, FileVisitor
+from sel_tools.utils.journal import Journal
 from sel_tools.utils.student_config import get_branch_from_student_config
 
+# Stay well below the request size limits of GitLab and proxies in front of it
+MAX_COMMIT_PAYLOAD_SIZE = 8 * 1024 * 1024
+MAX_CACHED_TREES = 8
+
 
 def commit_changes(repo_paths: list[Path], message: str) -> None:
     """Commit and push changes to all repos."""
@@ -21,49 +32,172 @@ def commit_changes(repo_paths: list[Path], message: str) -> None:
         repo.git.push()
 
 
-def upload_files(source_folder: Path, student_repos: list[dict], gitlab_instance: gitlab.Gitlab) -> None:
+def upload_files(
+    source_folder: Path,
+    student_repos: list[dict],
+    gitlab_instance: gitlab.Gitlab,
+    settings: BulkActionSettings = DEFAULT_BULK_ACTION_SETTINGS,
+) -> None:
     """Upload new files from source folder via commit to the repository.
 
+    Up to max_workers repositories are committed to concurrently. Repositories
+    and commits of split uploads created according to the journal of a
+    previous run are skipped.
     For doing more than just adding new files refer to `commit_changes`
     """
-    for student_repo in tqdm(student_repos, desc="Uploading files"):
+    journal = settings.journal or Journal()
+    # The files are the same for all repositories, only the branch differs
+    action_chunks = chunk_commit_actions(COMMIT_ACTIONS_CACHE.get_actions(source_folder), MAX_COMMIT_PAYLOAD_SIZE)
+
+    def upload_files_to_student_repo(student_repo: dict) -> None:
+        key = str(student_repo["id"])
+        if journal.is_done(key, "commit"):
+            return
         student_homework_project = gitlab_instance.projects.get(student_repo["id"])
-        create_commit(
-            source_folder,
-            f"Add {source_folder.name}",
-            get_branch_from_student_config(student_repo),
-            student_homework_project,
+        commits_data = create_commits_data(
+            action_chunks, f"Add {source_folder.name}", get_branch_from_student_config(student_repo)
+        )
+        create_journaled_commits(commits_data, student_homework_project, journal, key)
+        journal.record(key, "commit")
+
+    with ThreadPoolExecutor(max_workers=settings.max_workers) as executor:
+        list(
+            tqdm(
+                executor.map(upload_files_to_student_repo, student_repos),
+                total=len(student_repos),
+                desc="Uploading files",
+            )
         )
 
 
-def create_commit(source_folder: Path, message: str, branch: str, gitlab_project: Project) -> None:
-    """Create commit in gitlab project from source folder with message."""
-    gitlab_project.commits.create(create_gitlab_commit_data_with_all_files_from(source_folder, message, branch))
+def create_commit(
+    source_folder: Path,
+    message: str,
+    branch: str,
+    gitlab_project: Project,
+    max_payload_size: int = MAX_COMMIT_PAYLOAD_SIZE,
+) -> None:
+    """Create commit in gitlab project from source folder with message.
+
+    Folders exceeding the payload size are committed in multiple commits.
+    """
+    for commit_data in create_gitlab_commit_data_with_all_files_from(source_folder, message, branch, max_payload_size):
+        gitlab_project.commits.create(commit_data)
 
 
-@lru_cache
-def create_gitlab_commit_data_with_all_files_from(folder: Path, message: str, branch: str) -> dict:
-    """Create gitlab commit with all files from folder.
+def create_journaled_commits(commits_data: list[dict], gitlab_project: Project, journal: Journal, key: str) -> None:
+    """Create the commits in gitlab project unless journaled under the key as created by a previous run.
 
-    Folder is assumed to be root of the repo committing to
+    Every created commit is journaled, so a resumed upload split into multiple
+    commits does not create the files of the commits before again.
     """
-    file_tree = FileTree(folder)
-    initial_file_commit_actions_visitor = InitialFileCommitActionsVisitor(folder)
-    file_tree.accept(initial_file_commit_actions_visitor)
+    for index, commit_data in enumerate(commits_data, start=1):
+        step = f"commit_{index}_of_{len(commits_data)}"
+        if journal.is_done(key, step):
+            continue
+        gitlab_project.commits.create(commit_data)
+        journal.record(key, step)
+
+
+def create_gitlab_commit_data_with_all_files_from(
+    folder: Path, message: str, branch: str, max_payload_size: int = MAX_COMMIT_PAYLOAD_SIZE
+) -> list[dict]:
+    """Create gitlab commits with all files from folder.
 
-    return (
+    Folder is assumed to be root of the repo committing to. The actions are split
+    into multiple commits if they exceed the payload size.
+    """
+    action_chunks = chunk_commit_actions(COMMIT_ACTIONS_CACHE.get_actions(folder), max_payload_size)
+    return create_commits_data(action_chunks, message, branch)
+
+
+def create_commits_data(action_chunks: list[list[dict]], message: str, branch: str) -> list[dict]:
+    """Create gitlab commits on the branch, one for each chunk of commit actions."""
+    return [
         {
             "branch": branch,
-            "commit_message": message,
-            "actions": initial_file_commit_actions_visitor.actions,
+            "commit_message": message if len(action_chunks) == 1 else f"{message} ({index}/{len(action_chunks)})",
+            "actions": actions,
         }
-        if initial_file_commit_actions_visitor.actions
-        else {}
-    )
+        for index, actions in enumerate(action_chunks, start=1)
+    ]
+
+
+def chunk_commit_actions(actions: list[dict], max_payload_size: int) -> list[list[dict]]:
+    """Split the commit actions into chunks with a payload below the size.
+
+    An action exceeding the size on its own gets a chunk of its own.
+    """
+    chunks: list[list[dict]] = []
+    chunk_size = 0
+    for action in actions:
+        action_size = len(json.dumps(action))
+        if not chunks or chunk_size + action_size > max_payload_size:
+            chunks.append([])
+            chunk_size = 0
+        chunks[-1].append(action)
+        chunk_size += action_size
+    return chunks
+
+
+def hash_tree(folder: Path) -> str:
+    """Hash the paths and contents of all files in the folder."""
+    tree_hash_visitor = TreeHashVisitor(folder)
+    FileTree(folder).accept(tree_hash_visitor)
+    return tree_hash_visitor.hexdigest()
+
+
+class CommitActionsCache:
+    """Bounded cache of the commit actions of folders keyed by their tree hash."""
+
+    def __init__(self, max_trees: int) -> None:
+        self.__max_trees = max_trees
+        self.__actions: OrderedDict[str, list[dict]] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get_actions(self, folder: Path) -> list[dict]:
+        tree_hash = hash_tree(folder)
+        with self.__lock:
+            if tree_hash in self.__actions:
+                self.__actions.move_to_end(tree_hash)
+                return self.__actions[tree_hash]
+        initial_file_commit_actions_visitor = InitialFileCommitActionsVisitor(folder)
+        FileTree(folder).accept(initial_file_commit_actions_visitor)
+        with self.__lock:
+            self.__actions[tree_hash] = initial_file_commit_actions_visitor.actions
+            while len(self.__actions) > self.__max_trees:
+                self.__actions.popitem(last=False)
+        return initial_file_commit_actions_visitor.actions
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__actions.clear()
+
+
+COMMIT_ACTIONS_CACHE = CommitActionsCache(MAX_CACHED_TREES)
+
+
+class TreeHashVisitor(FileVisitor):
+    """Hash the relative paths and contents of the visited files."""
+
+    def __init__(self, root_folder: Path) -> None:
+        self.__root_folder = root_folder
+        self.__hash = hashlib.sha256()
+
+    def visit_file(self, file: Path) -> None:
+        self.__hash.update(file.relative_to(self.__root_folder).as_posix().encode() + b"\0")
+        with file.open("rb") as file_stream:
+            self.__hash.update(hashlib.file_digest(file_stream, "sha256").digest())
+
+    def hexdigest(self) -> str:
+        return self.__hash.hexdigest()
 
 
 class InitialFileCommitActionsVisitor(FileVisitor):
-    """Create gitlab commit action for new file."""
+    """Create gitlab commit action for new file.
+
+    Files that are no valid utf-8 text are base64 encoded.
+    """
 
     def __init__(self, root_folder: Path) -> None:
         self.actions: list[dict] = []
@@ -71,10 +205,21 @@ class InitialFileCommitActionsVisitor(FileVisitor):
 
     def visit_file(self, file: Path) -> None:
         path_in_new_repo = file.relative_to(self.__root_folder)
-        self.actions.append(
-            {
-                "action": "create",
-                "file_path": str(path_in_new_repo),
-                "content": file.read_text(),
-            }
-        )
+        content = file.read_bytes()
+        try:
+            self.actions.append(
+                {
+                    "action": "create",
+                    "file_path": str(path_in_new_repo),
+                    "content": content.decode(),
+                }
+            )
+        except UnicodeDecodeError:
+            self.actions.append(
+                {
+                    "action": "create",
+                    "file_path": str(path_in_new_repo),
+                    "content": base64.b64encode(content).decode(),
+                    "encoding": "base64",
+                }
+            )
@@ -1,5 +1,6 @@
 """Create gitlab issues from tasks."""
 
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 
 import gitlab
@@ -7,9 +8,12 @@ from gitlab.v4.objects import Project
 from tqdm import tqdm
 
 from sel_tools.gitlab_api.attachments import (
+    UploadCache,
     replace_file_paths_with_urls,
     upload_attachments,
 )
+from sel_tools.gitlab_api.bulk_action import DEFAULT_BULK_ACTION_SETTINGS, BulkActionSettings
+from sel_tools.utils.journal import Journal
 from sel_tools.utils.task import Task
 
 EVALUATION_DASHBOARD_TASK = Task(
@@ -28,17 +32,45 @@ Make sure you tag us via `@username`.""",
 )
 
 
-def create_issues(tasks: list[Task], student_repos: list[dict], gitlab_instance: gitlab.Gitlab) -> None:
-    """Create gitlab issues from tasks for all student repos."""
-    for student_repo in tqdm(student_repos, desc="Creating issues in student repos"):
+def create_issues(
+    tasks: list[Task],
+    student_repos: list[dict],
+    gitlab_instance: gitlab.Gitlab,
+    settings: BulkActionSettings = DEFAULT_BULK_ACTION_SETTINGS,
+) -> None:
+    """Create gitlab issues from tasks for all student repos.
+
+    Up to max_workers student repos are processed concurrently, the issues of
+    each repo are created in the order of the tasks. Issues recorded in the
+    journal by a previous run are not created again.
+    """
+    journal = settings.journal or Journal()
+
+    def create_issues_for_student_repo(student_repo: dict) -> None:
+        key = str(student_repo["id"])
+        missing_tasks = [
+            (index, task) for index, task in enumerate(tasks) if not journal.is_done(key, f"issue_{index}")
+        ]
+        if not missing_tasks:
+            return
         student_homework_project = gitlab_instance.projects.get(student_repo["id"])
-        for task in tasks:
-            create_issue(deepcopy(task), student_homework_project)
+        for index, task in missing_tasks:
+            create_issue(deepcopy(task), student_homework_project, settings.upload_cache)
+            journal.record(key, f"issue_{index}")
+
+    with ThreadPoolExecutor(max_workers=settings.max_workers) as executor:
+        list(
+            tqdm(
+                executor.map(create_issues_for_student_repo, student_repos),
+                total=len(student_repos),
+                desc="Creating issues in student repos",
+            )
+        )
 
 
-def create_issue(task: Task, gitlab_project: Project) -> None:
+def create_issue(task: Task, gitlab_project: Project, upload_cache: UploadCache | None = None) -> None:
     """Create issue for gitlab project from task."""
-    uploaded_files = upload_attachments(task.attachments, gitlab_project)
+    uploaded_files = upload_attachments(task.attachments, gitlab_project, upload_cache)
     task.description = replace_file_paths_with_urls(task.description, uploaded_files, task.attachments)
 
     gitlab_project.issues.create(get_issue_dict(task))
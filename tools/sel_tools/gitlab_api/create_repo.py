@@ -1,40 +1,139 @@
 """Create gitlab repos with contents of source folder."""
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from copy import deepcopy
+from dataclasses import dataclass
 from pathlib import Path
 
 import gitlab
-from gitlab.v4.objects import Project, ProjectProtectedBranch
+from gitlab.v4.objects import Group, Project, ProjectProtectedBranch
 from tqdm import tqdm
 
 from sel_tools.config import GIT_MAIN_BRANCH, REPO_DIR, RUNNER_ID
-from sel_tools.gitlab_api.create_commit import create_commit
+from sel_tools.gitlab_api.create_commit import create_gitlab_commit_data_with_all_files_from, create_journaled_commits
+from sel_tools.gitlab_api.create_issue import create_issue
+from sel_tools.utils.journal import Journal
+from sel_tools.utils.task import Task
 
 AVATAR_PATH = REPO_DIR / "assets" / "repo-avatar.png"
+CREATE_ERRORS = (gitlab.GitlabError, OSError)
+
+
+@dataclass(frozen=True)
+class CreateReposSettings:
+    """Settings for creating the gitlab repos."""
+
+    number_of_repos: int = 1
+    max_workers: int = 1
+    journal: Journal | None = None
+    initial_issues: tuple[Task, ...] = ()
+
+
+DEFAULT_CREATE_REPOS_SETTINGS = CreateReposSettings()
+
+
+@dataclass(frozen=True)
+class RepoProvisioner:
+    """Create and configure a single student repo step by step.
+
+    Every completed step is recorded in the journal, so a rerun after a partial
+    failure skips the completed steps instead of creating duplicates.
+    """
+
+    source_folder: Path
+    repo_base_name: str
+    group: Group
+    gitlab_instance: gitlab.Gitlab
+    journal: Journal
+    initial_issues: tuple[Task, ...] = ()
+
+    def provision(self, repo_number: int) -> dict:
+        """Run the missing provisioning steps and return the student repo info."""
+        repo_settings = get_repo_settings(self.group.id, self.repo_base_name, repo_number)
+        key = f"{self.group.id}/{repo_settings['name']}"
+        project = self.__get_or_create_project(key, repo_settings)
+        if not self.journal.is_done(key, "runner"):
+            register_runner(project)
+            self.journal.record(key, "runner")
+        if not self.journal.is_done(key, "avatar"):
+            upload_avatar(project)
+            self.journal.record(key, "avatar")
+        if not self.journal.is_done(key, "branch"):
+            self.journal.record(key, "branch", configure_main_branch(project).name)
+        branch = self.journal.steps(key)["branch"]
+        if not self.journal.is_done(key, "commit"):
+            commits_data = create_gitlab_commit_data_with_all_files_from(self.source_folder, "Initial commit", branch)
+            create_journaled_commits(commits_data, project, self.journal, key)
+            self.journal.record(key, "commit")
+        for index, task in enumerate(self.initial_issues):
+            if not self.journal.is_done(key, f"issue_{index}"):
+                create_issue(deepcopy(task), project)
+                self.journal.record(key, f"issue_{index}")
+        return {"name": repo_settings["name"], "id": project.id, "branch": branch}
+
+    def __get_or_create_project(self, key: str, repo_settings: dict) -> Project:
+        steps = self.journal.steps(key)
+        if "project" in steps:
+            return self.gitlab_instance.projects.get(steps["project"], lazy=True)
+        project = None
+        if "project_requested" in steps:
+            # The previous run may have been interrupted after the project was created
+            try:
+                project = self.gitlab_instance.projects.get(f"{self.group.full_path}/{repo_settings['name']}")
+            except gitlab.GitlabGetError:
+                project = None
+        if project is None:
+            self.journal.record(key, "project_requested")
+            project = self.gitlab_instance.projects.create(repo_settings)
+        self.journal.record(key, "project", project.id)
+        return project
 
 
 def create_repos(
     source_folder: Path,
     repo_base_name: str,
     group_id: int,
-    number_of_repos: int,
     gitlab_instance: gitlab.Gitlab,
+    settings: CreateReposSettings = DEFAULT_CREATE_REPOS_SETTINGS,
 ) -> tuple[list[dict], str]:
-    """Create gitlab repos with contents of source folder."""
-    student_repos = []
-    for repo_number in tqdm(range(1, number_of_repos + 1), desc="Creating Student Repos"):
-        project = gitlab_instance.projects.create(get_repo_settings(group_id, repo_base_name, repo_number))
-        configure_project(project)
-        main_branch = configure_main_branch(project)
-        create_commit(source_folder, "Initial commit", main_branch.name, project)
-        student_repos.append({"name": project.name, "id": project.id, "branch": main_branch.name})
+    """Create gitlab repos with contents of source folder.
 
+    Up to max_workers repositories are provisioned concurrently. Repositories that
+    fail are reported in a summary and left out of the returned student repos.
+    """
     group = gitlab_instance.groups.get(group_id)
-    return student_repos, group.path
+    provisioner = RepoProvisioner(
+        source_folder,
+        repo_base_name,
+        group,
+        gitlab_instance,
+        settings.journal or Journal(),
+        settings.initial_issues,
+    )
+    student_repos: dict[int, dict] = {}
+    failures: dict[str, Exception] = {}
+    with ThreadPoolExecutor(max_workers=settings.max_workers) as executor:
+        futures = {
+            executor.submit(provisioner.provision, repo_number): repo_number
+            for repo_number in range(1, settings.number_of_repos + 1)
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Creating Student Repos"):
+            repo_number = futures[future]
+            try:
+                student_repos[repo_number] = future.result()
+            except CREATE_ERRORS as error:
+                failures[f"{repo_base_name}_{repo_number}"] = error
+    print_create_failures(failures, settings.number_of_repos)
+    return [student_repos[repo_number] for repo_number in sorted(student_repos)], group.path
 
 
-def configure_project(gitlab_project: Project) -> None:
-    """Configure gitlab project."""
+def register_runner(gitlab_project: Project) -> None:
+    """Register the homework runner for the gitlab project."""
     gitlab_project.runners.create({"runner_id": RUNNER_ID})
+
+
+def upload_avatar(gitlab_project: Project) -> None:
+    """Upload the repo avatar to the gitlab project."""
     gitlab_project.avatar = AVATAR_PATH.read_bytes()
     gitlab_project.save()
 
@@ -58,3 +157,12 @@ def get_repo_settings(group_id: int, repo_base_name: str, repo_number: int) -> d
         "namespace_id": group_id,
         "jobs_enabled": True,
     }
+
+
+def print_create_failures(failures: dict[str, Exception], number_of_repos: int) -> None:
+    """Print a summary of the repositories that could not be created."""
+    if not failures:
+        return
+    print(f"Failed to create {len(failures)} of {number_of_repos} repos:")
+    for name, error in sorted(failures.items()):
+        print(f"- {name}: {error}")
@@ -0,0 +1,453 @@
+"""In-process fake of the subset of the GitLab v4 API used by the tools.
+
+Serves projects, issues, notes, uploads, commits, members, users, pipelines,
+protected branches, runners and groups from memory. The git repositories of
+the projects are bare repositories on disk, cloned via file:// URLs. Latency
+and rate limiting can be injected to benchmark bulk operations locally.
+"""
+
+import base64
+import contextlib
+import hashlib
+import json
+import math
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from email.parser import BytesParser
+from email.policy import default
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+from urllib.parse import parse_qs, unquote, urlparse
+
+API_PREFIX = "/api/v4"
+ISSUE_STATES = {"close": "closed", "reopen": "opened"}
+PROJECT_RESOURCES = ("issues", "uploads", "members", "pipelines", "protected_branches", "runners")
+
+Route = tuple[str, re.Pattern[str], Callable[..., tuple[HTTPStatus, Any]]]
+
+
+class RequestThrottle:
+    """Latency and rate limit of the requests to the fake server.
+
+    With a rate limit, at most that many requests are answered per rate limit
+    period, all further requests are rate limited.
+    """
+
+    def __init__(self, latency: float = 0.0, rate_limit: int | None = None, rate_limit_period: float = 60.0) -> None:
+        self.__latency = latency
+        self.__rate_limit = rate_limit
+        self.__rate_limit_period = rate_limit_period
+        self.__window_start = time.time()
+        self.__window_requests = 0
+        self.__lock = threading.Lock()
+
+    def delay(self) -> None:
+        time.sleep(self.__latency)
+
+    def count_request(self) -> tuple[bool, dict[str, str]]:
+        """Count the request in the current rate limit window and return if it is rate limited and the headers."""
+        if self.__rate_limit is None:
+            return False, {}
+        with self.__lock:
+            now = time.time()
+            if now >= self.__window_start + self.__rate_limit_period:
+                self.__window_start = now
+                self.__window_requests = 0
+            self.__window_requests += 1
+            reset = self.__window_start + self.__rate_limit_period
+            rate_limited = self.__window_requests > self.__rate_limit
+            headers = {
+                "RateLimit-Limit": str(self.__rate_limit),
+                "RateLimit-Remaining": str(max(0, self.__rate_limit - self.__window_requests)),
+                "RateLimit-Reset": str(math.ceil(reset)),
+            }
+            if rate_limited:
+                headers["Retry-After"] = str(math.ceil(reset - now))
+            return rate_limited, headers
+
+
+@dataclass
+class FakeProject:
+    """A project of the fake server with its resources.
+
+    The repository lock serializes the git operations on the bare repository
+    of the project.
+    """
+
+    project: dict
+    resources: dict[str, list[dict]] = field(default_factory=lambda: {name: [] for name in PROJECT_RESOURCES})
+    notes: dict[int, list[dict]] = field(default_factory=dict)
+    repo_lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+@dataclass
+class FakeGitlabState:
+    """In-memory state of the fake server."""
+
+    projects: dict[int, FakeProject] = field(default_factory=dict)
+    users: list[dict] = field(default_factory=list)
+    last_id: int = 1
+
+    def create_id(self) -> int:
+        self.last_id += 1
+        return self.last_id
+
+
+class FakeGitlabServer:
+    """Fake GitLab server running in a background thread.
+
+    Use it as context manager and point python-gitlab or GITLAB_SERVER_URL to
+    its url. Every request is delayed by latency seconds. With a rate limit,
+    at most that many requests are answered per rate limit period, all further
+    requests get 429 with Retry-After and RateLimit-* headers.
+    """
+
+    def __init__(self, repos_dir: Path, throttle: RequestThrottle | None = None, port: int = 0) -> None:
+        self.__repos_dir = repos_dir
+        self.__throttle = throttle or RequestThrottle()
+        # Guards the in-memory state, but not the git operations on the repositories
+        self.__lock = threading.RLock()
+        self.__state = FakeGitlabState()
+        self.__routes: list[Route] = [
+            ("GET", re.compile(r"/projects/(\d+)"), self.__get_project),
+            ("GET", re.compile(r"/projects/([^/]+)"), self.__get_project_by_path),
+            ("POST", re.compile(r"/projects"), self.__create_project),
+            ("PUT", re.compile(r"/projects/(\d+)"), self.__update_project),
+            ("POST", re.compile(r"/projects/(\d+)/runners"), self.__create_runner),
+            ("POST", re.compile(r"/projects/(\d+)/protected_branches"), self.__create_protected_branch),
+            ("POST", re.compile(r"/projects/(\d+)/repository/commits"), self.__create_commit),
+            ("POST", re.compile(r"/projects/(\d+)/issues"), self.__create_issue),
+            ("GET", re.compile(r"/projects/(\d+)/issues/(\d+)"), self.__get_issue),
+            ("PUT", re.compile(r"/projects/(\d+)/issues/(\d+)"), self.__update_issue),
+            ("POST", re.compile(r"/projects/(\d+)/issues/(\d+)/notes"), self.__create_note),
+            ("POST", re.compile(r"/projects/(\d+)/uploads"), self.__create_upload),
+            ("GET", re.compile(r"/projects/(\d+)/members(?:/all)?"), self.__list_members),
+            ("POST", re.compile(r"/projects/(\d+)/members"), self.__create_member),
+            ("GET", re.compile(r"/projects/(\d+)/pipelines"), self.__list_pipelines),
+            ("GET", re.compile(r"/users"), self.__list_users),
+            ("GET", re.compile(r"/groups/(\d+)"), self.__get_group),
+        ]
+        self.__http_server = ThreadingHTTPServer(("127.0.0.1", port), create_request_handler(self))
+        self.__thread = threading.Thread(target=self.__http_server.serve_forever, daemon=True)
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self.__http_server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> None:
+        self.__repos_dir.mkdir(parents=True, exist_ok=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        self.__http_server.shutdown()
+        self.__http_server.server_close()
+
+    def add_user(self, username: str, email: str) -> dict:
+        with self.__lock:
+            user = {"id": self.__state.create_id(), "username": username, "name": username, "email": email}
+            self.__state.users.append(user)
+            return user
+
+    def add_pipeline(self, project_id: int, ref: str, status: str) -> dict:
+        with self.__lock:
+            pipeline = {"id": self.__state.create_id(), "project_id": project_id, "ref": ref, "status": status}
+            self.__resources(project_id, "pipelines").insert(0, pipeline)
+            return pipeline
+
+    def project(self, project_id: int) -> dict:
+        with self.__lock:
+            return self.__state.projects[project_id].project
+
+    def issues(self, project_id: int) -> list[dict]:
+        with self.__lock:
+            return self.__resources(project_id, "issues")
+
+    def notes(self, project_id: int, issue_iid: int) -> list[dict]:
+        with self.__lock:
+            return self.__state.projects[project_id].notes.get(issue_iid, [])
+
+    def uploads(self, project_id: int) -> list[dict]:
+        with self.__lock:
+            return self.__resources(project_id, "uploads")
+
+    def members(self, project_id: int) -> list[dict]:
+        with self.__lock:
+            return self.__resources(project_id, "members")
+
+    def handle(self, method: str, path: str, body: Any) -> tuple[HTTPStatus, Any, dict[str, str]]:
+        """Answer an API request with status, json response and headers."""
+        self.__throttle.delay()
+        rate_limited, headers = self.__throttle.count_request()
+        if rate_limited:
+            return HTTPStatus.TOO_MANY_REQUESTS, {"message": "429 Too Many Requests"}, headers
+        url = urlparse(path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            status, response = self.__route(method, url.path.removeprefix(API_PREFIX).rstrip("/"), body, query)
+        except KeyError:
+            return HTTPStatus.NOT_FOUND, {"message": "404 Not Found"}, headers
+        return status, response, headers
+
+    def __route(self, method: str, resource: str, body: Any, query: dict[str, str]) -> tuple[HTTPStatus, Any]:
+        """Call the handler of the first route matching the request, raise KeyError if there is none."""
+        for route_method, pattern, handler in self.__routes:
+            if route_method == method and (match := pattern.fullmatch(resource)):
+                # Commits lock their project's repository only, not the whole server, while running git
+                lock = contextlib.nullcontext() if handler == self.__create_commit else self.__lock
+                with lock:
+                    return handler(*map(parse_route_parameter, match.groups()), body=body, query=query)
+        raise KeyError(resource)
+
+    def __resources(self, project_id: int, name: str) -> list[dict]:
+        return self.__state.projects[project_id].resources[name]
+
+    def __get_project(self, project_id: int, **_: Any) -> tuple[HTTPStatus, Any]:
+        return HTTPStatus.OK, self.__state.projects[project_id].project
+
+    def __get_project_by_path(self, path: str, **_: Any) -> tuple[HTTPStatus, Any]:
+        for fake_project in self.__state.projects.values():
+            if fake_project.project["path_with_namespace"] == path:
+                return HTTPStatus.OK, fake_project.project
+        return HTTPStatus.NOT_FOUND, {"message": "404 Project Not Found"}
+
+    def __create_project(self, body: dict, **_: Any) -> tuple[HTTPStatus, Any]:
+        project_id = self.__state.create_id()
+        namespace = f"group_{body.get('namespace_id', 0)}"
+        path_with_namespace = f"{namespace}/{body['name']}"
+        bare_repo = self.__repos_dir / f"{path_with_namespace}.git"
+        subprocess.run(["git", "init", "--bare", "--quiet", str(bare_repo)], check=True)
+        project = {
+            "id": project_id,
+            "name": body["name"],
+            "path": body["name"],
+            "description": body.get("description", ""),
+            "path_with_namespace": path_with_namespace,
+            "namespace": {"id": body.get("namespace_id", 0), "path": namespace},
+            "web_url": f"{self.url}/{path_with_namespace}",
+            "http_url_to_repo": bare_repo.resolve().as_uri(),
+            "ssh_url_to_repo": bare_repo.resolve().as_uri(),
+            "default_branch": None,
+        }
+        self.__state.projects[project_id] = FakeProject(project)
+        return HTTPStatus.CREATED, project
+
+    def __update_project(self, project_id: int, body: Any, **_: Any) -> tuple[HTTPStatus, Any]:
+        project = self.__state.projects[project_id].project
+        if isinstance(body, dict):
+            project.update({key: value for key, value in body.items() if key in project})
+        return HTTPStatus.OK, project
+
+    def __create_runner(self, project_id: int, body: dict, **_: Any) -> tuple[HTTPStatus, Any]:
+        runner = {"id": body["runner_id"], "active": True}
+        self.__resources(project_id, "runners").append(runner)
+        return HTTPStatus.CREATED, runner
+
+    def __create_protected_branch(self, project_id: int, body: dict, **_: Any) -> tuple[HTTPStatus, Any]:
+        protected_branch = {"id": self.__state.create_id(), **body}
+        self.__resources(project_id, "protected_branches").append(protected_branch)
+        return HTTPStatus.CREATED, protected_branch
+
+    def __create_commit(self, project_id: int, body: dict, **_: Any) -> tuple[HTTPStatus, Any]:
+        with self.__lock:
+            fake_project = self.__state.projects[project_id]
+            bare_repo = self.__repos_dir / f"{fake_project.project['path_with_namespace']}.git"
+        with fake_project.repo_lock:
+            sha = commit_actions(bare_repo, body["branch"], body["commit_message"], body.get("actions", []))
+        with self.__lock:
+            fake_project.project["default_branch"] = fake_project.project["default_branch"] or body["branch"]
+        return HTTPStatus.CREATED, {"id": sha, "short_id": sha[:8], "message": body["commit_message"]}
+
+    def __create_issue(self, project_id: int, body: dict, **_: Any) -> tuple[HTTPStatus, Any]:
+        issues = self.__resources(project_id, "issues")
+        issue = {
+            "id": self.__state.create_id(),
+            "iid": len(issues) + 1,
+            "project_id": project_id,
+            "title": body["title"],
+            "description": body.get("description", ""),
+            "due_date": body.get("due_date") or None,
+            "labels": body.get("labels", []),
+            "state": "opened",
+        }
+        issues.append(issue)
+        return HTTPStatus.CREATED, issue
+
+    def __get_issue(self, project_id: int, issue_iid: int, **_: Any) -> tuple[HTTPStatus, Any]:
+        issues = self.__resources(project_id, "issues")
+        if not 0 < issue_iid <= len(issues):
+            raise KeyError(issue_iid)
+        return HTTPStatus.OK, issues[issue_iid - 1]
+
+    def __update_issue(self, project_id: int, issue_iid: int, body: dict, **_: Any) -> tuple[HTTPStatus, Any]:
+        issue = self.__get_issue(project_id, issue_iid)[1]
+        if "state_event" in body:
+            issue["state"] = ISSUE_STATES[body["state_event"]]
+        return HTTPStatus.OK, issue
+
+    def __create_note(self, project_id: int, issue_iid: int, body: dict, **_: Any) -> tuple[HTTPStatus, Any]:
+        self.__get_issue(project_id, issue_iid)
+        note = {"id": self.__state.create_id(), "body": body["body"]}
+        self.__state.projects[project_id].notes.setdefault(issue_iid, []).append(note)
+        return HTTPStatus.CREATED, note
+
+    def __create_upload(self, project_id: int, body: Any, **_: Any) -> tuple[HTTPStatus, Any]:
+        file_name, content = body["file"]
+        url = f"/uploads/{hashlib.sha256(content).hexdigest()[:32]}/{file_name}"
+        upload = {
+            "alt": file_name,
+            "url": url,
+            "full_path": f"/{self.__state.projects[project_id].project['path_with_namespace']}{url}",
+            "markdown": f"![{file_name}]({url})",
+        }
+        self.__resources(project_id, "uploads").append(upload)
+        return HTTPStatus.CREATED, upload
+
+    def __list_members(self, project_id: int, **_: Any) -> tuple[HTTPStatus, Any]:
+        return HTTPStatus.OK, self.__resources(project_id, "members")
+
+    def __create_member(self, project_id: int, body: dict, **_: Any) -> tuple[HTTPStatus, Any]:
+        members = self.__resources(project_id, "members")
+        if any(member["id"] == int(body["user_id"]) for member in members):
+            return HTTPStatus.CONFLICT, {"message": "Member already exists"}
+        user = next(user for user in self.__state.users if user["id"] == int(body["user_id"]))
+        member = {**user, "access_level": int(body["access_level"])}
+        members.append(member)
+        return HTTPStatus.CREATED, member
+
+    def __list_pipelines(self, project_id: int, query: dict, **_: Any) -> tuple[HTTPStatus, Any]:
+        pipelines = self.__resources(project_id, "pipelines")
+        return HTTPStatus.OK, [
+            pipeline for pipeline in pipelines if pipeline["ref"] == query.get("ref", pipeline["ref"])
+        ]
+
+    def __list_users(self, query: dict, **_: Any) -> tuple[HTTPStatus, Any]:
+        search = query.get("search", "").lower()
+        return HTTPStatus.OK, [
+            user for user in self.__state.users if search in user["email"].lower() or search in user["username"].lower()
+        ]
+
+    @staticmethod
+    def __get_group(group_id: int, **_: Any) -> tuple[HTTPStatus, Any]:
+        return HTTPStatus.OK, {
+            "id": group_id,
+            "path": f"group_{group_id}",
+            "full_path": f"group_{group_id}",
+            "name": f"group_{group_id}",
+        }
+
+
+def parse_route_parameter(parameter: str) -> int | str:
+    """Parse a matched route parameter into an id or an url decoded path."""
+    return int(parameter) if parameter.isdigit() else unquote(parameter)
+
+
+def create_request_handler(server: FakeGitlabServer) -> type[BaseHTTPRequestHandler]:
+    """Create the HTTP request handler class forwarding to the fake server."""
+
+    class RequestHandler(BaseHTTPRequestHandler):
+        """Parse requests and write the responses of the fake server."""
+
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # pylint: disable=invalid-name
+            self.__answer("GET")
+
+        def do_POST(self) -> None:  # pylint: disable=invalid-name
+            self.__answer("POST")
+
+        def do_PUT(self) -> None:  # pylint: disable=invalid-name
+            self.__answer("PUT")
+
+        def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+            pass
+
+        def __answer(self, method: str) -> None:
+            status, response, headers = server.handle(method, self.path, self.__read_body())
+            content = json.dumps(response).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(content)
+
+        def __read_body(self) -> Any:
+            content = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            content_type = self.headers.get("Content-Type", "")
+            if content_type.startswith("multipart/form-data"):
+                return parse_multipart(content_type, content)
+            if content_type.startswith("application/json") and content:
+                return json.loads(content)
+            return {key: values[0] for key, values in parse_qs(content.decode()).items()}
+
+    return RequestHandler
+
+
+def parse_multipart(content_type: str, content: bytes) -> dict[str, Any]:
+    """Parse form fields as strings and files as tuple of file name and content."""
+    message = BytesParser(policy=default).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + content)
+    fields: dict[str, Any] = {}
+    for part in message.iter_parts():
+        assert isinstance(part, EmailMessage)
+        name = part.get_param("name", header="content-disposition")
+        payload = part.get_payload(decode=True)
+        file_name = part.get_filename()
+        fields[str(name)] = (file_name, payload) if file_name is not None else payload.decode()  # type: ignore[union-attr]
+    return fields
+
+
+def commit_actions(bare_repo: Path, branch: str, message: str, actions: list[dict]) -> str:
+    """Apply commit actions on the branch of the bare repository and return the commit sha."""
+    with tempfile.TemporaryDirectory() as worktree:
+
+        def git(*args: str) -> str:
+            return subprocess.run(
+                ["git", "-C", worktree, *args], check=True, capture_output=True, text=True
+            ).stdout.strip()
+
+        git("clone", "--quiet", str(bare_repo), ".")
+        has_branch = bool(git("ls-remote", "--heads", "origin", branch))
+        git("checkout", "--quiet", "-B", branch, *([f"origin/{branch}"] if has_branch else []))
+        for action in actions:
+            file = Path(worktree, action["file_path"])
+            if action["action"] in {"create", "update"}:
+                file.parent.mkdir(parents=True, exist_ok=True)
+                content = action.get("content", "")
+                file.write_bytes(base64.b64decode(content) if action.get("encoding") == "base64" else content.encode())
+            elif action["action"] == "delete":
+                file.unlink()
+            elif action["action"] == "move":
+                file.parent.mkdir(parents=True, exist_ok=True)
+                Path(worktree, action["previous_path"]).rename(file)
+        git("add", "--all")
+        git("-c", "user.name=Fake GitLab", "-c", "user.email=fake@gitlab", "commit", "--quiet", "-m", message)
+        git("push", "--quiet", "origin", branch)
+        # The first pushed branch becomes the default branch checked out by clones
+        if subprocess.run(
+            ["git", "-C", str(bare_repo), "rev-parse", "--verify", "--quiet", "HEAD"], check=False
+        ).returncode:
+            subprocess.run(["git", "-C", str(bare_repo), "symbolic-ref", "HEAD", f"refs/heads/{branch}"], check=True)
+        return git("rev-parse", "HEAD")
@@ -1,34 +1,103 @@
 """Clone or pull repos into a local workspace."""
 
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from subprocess import CalledProcessError
 
+import git
 import gitlab
+from git import GitCommandError
 from gitlab.v4.objects import Project
 from tqdm import tqdm
 
-from sel_tools.utils.repo import GitlabProject, GitRepo
+from sel_tools.utils.repo import DEFAULT_CLONE_OPTIONS, CloneOptions, GitlabProject, GitRepo
 from sel_tools.utils.student_config import get_branch_from_student_config
 
+FETCH_ERRORS = (GitCommandError, gitlab.GitlabError, CalledProcessError, OSError)
+REFERENCE_REPO_FOLDER = ".reference.git"
+REFERENCE_REFS_PREFIX = "refs/template"
 
-def fetch_repos(workspace: Path, student_repos: list[dict], gitlab_instance: gitlab.Gitlab) -> list[GitlabProject]:
-    """Fetch the student repositories into the workspace."""
+
+def fetch_repos(
+    workspace: Path,
+    student_repos: list[dict],
+    gitlab_instance: gitlab.Gitlab,
+    max_workers: int = 1,
+    clone_options: CloneOptions = DEFAULT_CLONE_OPTIONS,
+) -> list[GitlabProject]:
+    """Fetch the student repositories into the workspace.
+
+    Up to max_workers repositories are fetched concurrently. Repositories that fail
+    to fetch are reported in a summary and left out of the returned projects.
+    """
     workspace.mkdir(parents=True, exist_ok=True)
-    return [
-        fetch_repo(
-            GitRepo(workspace / student_repo["name"], get_branch_from_student_config(student_repo)),
-            gitlab_instance.projects.get(student_repo["id"]),
-        )
-        for student_repo in tqdm(student_repos, desc="Fetching Repos")
-    ]
+    if clone_options.reference is not None and student_repos:
+        try:
+            populate_reference_repo(
+                clone_options.reference, gitlab_instance.projects.get(student_repos[0]["id"]).ssh_url_to_repo
+            )
+        except FETCH_ERRORS as error:
+            print(f"Cloning without reference repo, populating it failed: {error}")
+    gitlab_projects: dict[int, GitlabProject] = {}
+    failures: dict[str, Exception] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_student_repo, workspace, student_repo, gitlab_instance, clone_options): index
+            for index, student_repo in enumerate(student_repos)
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Fetching Repos"):
+            index = futures[future]
+            try:
+                gitlab_projects[index] = future.result()
+            except FETCH_ERRORS as error:
+                failures[student_repos[index]["name"]] = error
+    print_fetch_failures(failures, len(student_repos))
+    return [gitlab_projects[index] for index in sorted(gitlab_projects)]
+
 
+def fetch_student_repo(
+    workspace: Path,
+    student_repo: dict,
+    gitlab_instance: gitlab.Gitlab,
+    clone_options: CloneOptions = DEFAULT_CLONE_OPTIONS,
+) -> GitlabProject:
+    """Look up the gitlab project of a student repo and fetch it into the workspace."""
+    return fetch_repo(
+        GitRepo(workspace / student_repo["name"], get_branch_from_student_config(student_repo)),
+        gitlab_instance.projects.get(student_repo["id"]),
+        clone_options,
+    )
 
-def fetch_repo(repo: GitRepo, gitlab_project: Project) -> GitlabProject:
+
+def fetch_repo(
+    repo: GitRepo, gitlab_project: Project, clone_options: CloneOptions = DEFAULT_CLONE_OPTIONS
+) -> GitlabProject:
     """Clone or pull student repo."""
     if os.environ.get("CI"):  # This variable is set by the CI pipeline
-        repo.fetch_from(gitlab_project.http_url_to_repo)
+        repo.fetch_from(gitlab_project.http_url_to_repo, clone_options)
     elif repo.is_repo():
         repo.pull()
     else:
-        repo.clone(gitlab_project.ssh_url_to_repo)
+        repo.clone(gitlab_project.ssh_url_to_repo, clone_options)
     return GitlabProject(repo.path, gitlab_project)
+
+
+def populate_reference_repo(reference: Path, url: str) -> None:
+    """Fetch the objects of a student repo into the reference repo unless it has them already.
+
+    All student repos start from the same template, so a single repo provides the
+    objects shared by all of them.
+    """
+    reference_repo = git.Repo.init(reference, bare=True) if not reference.is_dir() else git.Repo(reference)
+    if not reference_repo.git.for_each_ref(REFERENCE_REFS_PREFIX):
+        reference_repo.git.fetch(url, f"+refs/heads/*:{REFERENCE_REFS_PREFIX}/*")
+
+
+def print_fetch_failures(failures: dict[str, Exception], number_of_repos: int) -> None:
+    """Print a summary of the repositories that could not be fetched."""
+    if not failures:
+        return
+    print(f"Failed to fetch {len(failures)} of {number_of_repos} repos:")
+    for name, error in sorted(failures.items()):
+        print(f"- {name}: {error}")
@@ -1,10 +1,22 @@
 """Create and manage Gitlab instances."""
 
 import gitlab
+import requests
+from requests.adapters import HTTPAdapter
 
 from sel_tools.config import GITLAB_SERVER_URL
 
+DEFAULT_MAX_CONNECTIONS = 16
 
-def create_gitlab_instance(gitlab_token: str) -> gitlab.Gitlab:
-    """Create a gitlab instance."""
-    return gitlab.Gitlab(GITLAB_SERVER_URL, private_token=gitlab_token)
+
+def create_gitlab_instance(gitlab_token: str, max_connections: int = DEFAULT_MAX_CONNECTIONS) -> gitlab.Gitlab:
+    """Create a gitlab instance.
+
+    All requests share a keep-alive session with up to max_connections pooled
+    connections, so concurrent calls reuse their connections.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return gitlab.Gitlab(GITLAB_SERVER_URL, private_token=gitlab_token, session=session)
@@ -8,6 +8,8 @@ from typing import Any
 
 from sel_tools.config import REPO_DIR
 
+DEFAULT_PATCH_THRESHOLD = 1000
+
 
 def dir_path(path_string: str) -> Path:
     """Argparse type check if path is a directory."""
@@ -23,6 +25,15 @@ def file_path(path_string: str) -> Path:
     raise FileNotFoundError(path_string)
 
 
+def positive_int(int_string: str) -> int:
+    """Argparse type check if value is a positive integer."""
+    value = int(int_string)
+    if value > 0:
+        return value
+    msg = f"{int_string} is not a positive integer"
+    raise ValueError(msg)
+
+
 class DateAction(Action):
     """Parse dates from CLI arguments into datetime.date."""
 
@@ -248,3 +259,188 @@ class ArgumentParserFactory:  # pylint: disable=too-many-public-methods
             type=file_path,
             help="File which contains the student groups info",
         )
+
+    def add_jobs(self) -> None:
+        self.__parser.add_argument(
+            "--jobs",
+            type=positive_int,
+            default=1,
+            help="Number of repositories evaluated in parallel processes",
+        )
+
+    def add_fetch_jobs(self) -> None:
+        self.__parser.add_argument(
+            "--fetch-jobs",
+            type=positive_int,
+            default=1,
+            help="Number of repositories fetched concurrently",
+        )
+
+    def add_reference(self) -> None:
+        self.__parser.add_argument(
+            "--reference",
+            action="store_true",
+            help="Share the git objects of the template in a reference repository of the workspace for new clones",
+        )
+
+    def add_blob_filter(self) -> None:
+        self.__parser.add_argument(
+            "--blob-filter",
+            type=str,
+            default=None,
+            help="Partial clone filter for new clones, e.g. 'blob:limit=1m' to fetch large files on demand",
+        )
+
+    def add_shallow(self) -> None:
+        self.__parser.add_argument(
+            "--shallow",
+            action="store_true",
+            help="Clone only the history since the date of the last homework or the evaluation date",
+        )
+
+    def add_worktrees(self) -> None:
+        self.__parser.add_argument(
+            "--worktrees",
+            action="store_true",
+            help="Evaluate every repository in a git worktree of the workspace keeping the build folder between runs",
+        )
+
+    def add_diffstat_only(self) -> None:
+        self.__parser.add_argument(
+            "--diffstat-only",
+            action="store_true",
+            help="Only write the changed files and lines of commits below the patch threshold instead of their patches",
+        )
+
+    def add_patch_threshold(self) -> None:
+        self.__parser.add_argument(
+            "--patch-threshold",
+            type=positive_int,
+            default=DEFAULT_PATCH_THRESHOLD,
+            help="Number of changed lines from which patches are written with --diffstat-only",
+        )
+
+    def add_patch_commits(self) -> None:
+        self.__parser.add_argument(
+            "--patch-commits",
+            nargs="+",
+            default=[],
+            metavar="SHA",
+            help="Commits whose patches are written with --diffstat-only",
+        )
+
+    def add_ninja(self) -> None:
+        self.__parser.add_argument(
+            "--ninja",
+            action="store_true",
+            help="Build the C++ jobs created without an explicit build backend with Ninja instead of make",
+        )
+
+    def add_build_jobs(self) -> None:
+        self.__parser.add_argument(
+            "--build-jobs",
+            type=positive_int,
+            default=None,
+            help="Number of parallel compile jobs of every build of the C++ jobs. "
+            "The default of the build tool if not provided, i.e. all cores for Ninja and one for make",
+        )
+
+    def add_ccache_dir(self) -> None:
+        self.__parser.add_argument(
+            "--ccache-dir",
+            type=Path,
+            default=None,
+            help="Launch the compilers of the C++ jobs via ccache with this cache folder shared by all repositories",
+        )
+
+    def add_dependency_mirror(self) -> None:
+        self.__parser.add_argument(
+            "--dependency-mirror",
+            type=Path,
+            default=None,
+            help="Download the FetchContent dependencies of the C++ jobs once into this folder for all repositories",
+        )
+
+    def add_no_cache(self) -> None:
+        self.__parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Evaluate all jobs again instead of using cached results of previous runs",
+        )
+
+    def add_ignore_journal(self) -> None:
+        self.__parser.add_argument(
+            "--ignore-journal",
+            action="store_true",
+            help="Redo all steps instead of skipping the steps completed by a previous run with the same inputs",
+        )
+
+    def add_upload_jobs(self) -> None:
+        self.__parser.add_argument(
+            "--upload-jobs",
+            type=positive_int,
+            default=1,
+            help="Number of repositories to which attachments are uploaded concurrently",
+        )
+
+    def add_api_jobs(self) -> None:
+        self.__parser.add_argument(
+            "--api-jobs",
+            type=positive_int,
+            default=8,
+            help="Number of concurrent requests to GitLab",
+        )
+
+    def add_dry_run(self) -> None:
+        self.__parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only print a summary of the changes without applying them",
+        )
+
+    def add_repos_dir(self) -> None:
+        self.__parser.add_argument(
+            "repos_dir",
+            type=Path,
+            help="Folder for the bare git repositories of the created projects",
+        )
+
+    def add_port(self) -> None:
+        self.__parser.add_argument(
+            "--port",
+            type=int,
+            default=8080,
+            help="Port the server listens on",
+        )
+
+    def add_latency(self) -> None:
+        self.__parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.0,
+            help="Delay of every request in seconds",
+        )
+
+    def add_rate_limit(self) -> None:
+        self.__parser.add_argument(
+            "--rate-limit",
+            type=positive_int,
+            default=None,
+            help="Maximum number of requests per rate limit period. Unlimited if not provided",
+        )
+
+    def add_rate_limit_period(self) -> None:
+        self.__parser.add_argument(
+            "--rate-limit-period",
+            type=float,
+            default=60.0,
+            help="Rate limit period in seconds",
+        )
+
+    def add_users_file(self) -> None:
+        self.__parser.add_argument(
+            "--users",
+            type=file_path,
+            default=None,
+            help="Json file with a list of users, each with `username` and `email`",
+        )
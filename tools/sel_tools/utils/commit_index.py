@@ -0,0 +1,40 @@
+"""Index of the commits evaluated at a date."""
+
+import threading
+from datetime import date
+
+import git
+
+
+class CommitIndex:
+    """Last commits before a date, resolved with a single rev-list call.
+
+    The results are cached by HEAD commit and date. Since a commit hash
+    determines its whole history, the cache stays valid when the repository
+    is fetched and is shared by the evaluation and the diff creation.
+    """
+
+    def __init__(self) -> None:
+        self.__commits: dict[tuple[str, date], str | None] = {}
+        self.__lock = threading.Lock()
+
+    def last_commit_before(self, repo: git.Repo, before: date | None) -> str | None:
+        """Return the hash of the latest commit of HEAD before the date or None if there is none."""
+        head = repo.head.commit.hexsha
+        if before is None:
+            return head
+        key = (head, before)
+        with self.__lock:
+            if key in self.__commits:
+                return self.__commits[key]
+        commit = repo.git.rev_list("-n", "1", f"--before={before.isoformat()}", head) or None
+        with self.__lock:
+            self.__commits[key] = commit
+        return commit
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__commits.clear()
+
+
+COMMIT_INDEX = CommitIndex()
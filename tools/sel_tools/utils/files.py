@@ -1,15 +1,19 @@
 """File utils for software engineering tools."""
 
+import os
 from abc import ABCMeta, abstractmethod
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 from pathlib import Path
 
 CMAKELISTS_FILE_NAME = "CMakeLists.txt"
+GIT_FOLDER = ".git"
 
 
 class FileVisitor:
     """Interface for file visitor.
 
-    Children implement visit_file
+    Children implement visit_file and optionally finish
     """
 
     __metaclass__ = ABCMeta
@@ -19,34 +23,74 @@ class FileVisitor:
         msg = "Don't call me, I'm abstract."
         raise NotImplementedError(msg)
 
+    def finish(self) -> None:
+        """Hook called after all files of the tree were visited."""
+
+
+@dataclass(frozen=True)
+class FileWalker:
+    """Generator based walk over all files of a folder.
+
+    Folders and files with one of the ignored names are pruned, which also
+    skips the .git file of worktrees and submodules. Symbolic links to files
+    are walked like files, symbolic links to folders are skipped unless they
+    should be followed. The entries of each folder are walked sorted by name.
+    """
+
+    ignore_folders: frozenset[str] = frozenset({GIT_FOLDER})
+    follow_directory_symlinks: bool = False
+
+    def walk(self, folder: Path) -> Iterator[Path]:
+        yield from self.__walk(str(folder), frozenset({os.path.realpath(folder)}))
+
+    def __walk(self, folder: str, visited: frozenset[str]) -> Iterator[Path]:
+        with os.scandir(folder) as entries:
+            sorted_entries = sorted(entries, key=lambda entry: entry.name)
+        for entry in sorted_entries:
+            if entry.name in self.ignore_folders:
+                continue
+            is_dir = entry.is_dir()
+            if is_dir and entry.is_symlink() and not self.follow_directory_symlinks:
+                continue
+            if is_dir:
+                real_path = os.path.realpath(entry.path)
+                if real_path not in visited:
+                    yield from self.__walk(entry.path, visited | {real_path})
+            elif entry.is_file():
+                yield Path(entry.path)
+
+
+DEFAULT_FILE_WALKER = FileWalker()
+
 
 class FileTree:
     """Caller of the visitor pattern.
 
     Accepts visitors on it is file tree, applies FileVisitor.visit_file() to each
-    file in item
+    file the walker finds in item.
     """
 
-    def __init__(self, item: Path) -> None:
+    def __init__(self, item: Path, walker: FileWalker = DEFAULT_FILE_WALKER) -> None:
         self._item = item
+        self._walker = walker
 
     def accept(self, visitor: FileVisitor) -> None:
+        self.accept_all([visitor])
+
+    def accept_all(self, visitors: list[FileVisitor]) -> None:
+        """Apply all visitors to each file during a single walk of the file tree."""
         if self._item.is_file():
-            visitor.visit_file(self._item)
+            files: Iterable[Path] = [self._item]
         elif self._item.is_dir():
-            for sub_item in self.rglob_but(".git"):
-                if sub_item.is_file():
-                    visitor.visit_file(sub_item)
+            files = self._walker.walk(self._item)
         else:
             msg = f"Path {self._item} does not exist"
             raise FileNotFoundError(msg)
-
-    def rglob_but(self, ignore_folder: str) -> list[Path]:
-        return sorted(
-            set(self._item.rglob("*"))
-            - set(self._item.rglob(ignore_folder))
-            - set((self._item / ignore_folder).rglob("*"))
-        )
+        for file in files:
+            for visitor in visitors:
+                visitor.visit_file(file)
+        for visitor in visitors:
+            visitor.finish()
 
 
 def is_cmake(file: Path) -> bool:
@@ -0,0 +1,48 @@
+"""Journal of completed steps to resume interrupted bulk operations."""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+
+class Journal:
+    """Append-only journal of the completed steps per key.
+
+    Every completed step is appended as json line with key, step and data, so
+    an interrupted run can be resumed by skipping the completed steps. Without
+    a journal file, the steps are only kept in memory.
+    """
+
+    def __init__(self, journal_file: Path | None = None) -> None:
+        self.__journal_file = journal_file
+        self.__steps: dict[str, dict[str, Any]] = {}
+        self.__lock = threading.Lock()
+        if journal_file is not None and journal_file.exists():
+            for line in journal_file.read_text().splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line of an interrupted run
+                    continue
+                self.__steps.setdefault(entry["key"], {})[entry["step"]] = entry.get("data")
+
+    @property
+    def journal_file(self) -> Path | None:
+        return self.__journal_file
+
+    def steps(self, key: str) -> dict[str, Any]:
+        with self.__lock:
+            return dict(self.__steps.get(key, {}))
+
+    def is_done(self, key: str, step: str) -> bool:
+        with self.__lock:
+            return step in self.__steps.get(key, {})
+
+    def record(self, key: str, step: str, data: Any = None) -> None:
+        with self.__lock:
+            self.__steps.setdefault(key, {})[step] = data
+            if self.__journal_file is not None:
+                self.__journal_file.parent.mkdir(parents=True, exist_ok=True)
+                with self.__journal_file.open("a") as journal:
+                    journal.write(json.dumps({"key": key, "step": step, "data": data}) + "\n")
@@ -1,7 +1,9 @@
 """Repository utilities."""
 
 import subprocess
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, replace
+from datetime import date
 from pathlib import Path
 
 import git
@@ -9,6 +11,9 @@ from gitlab.v4.objects import Project
 
 from sel_tools.config import GIT_MAIN_BRANCH
 
+# Errors of git when no commit of the branch is recent enough for --shallow-since
+SHALLOW_SINCE_REJECTED_ERRORS = ("no commits selected for shallow requests", "error processing shallow info")
+
 
 @dataclass(frozen=True)
 class GitlabProject:
@@ -18,6 +23,33 @@ class GitlabProject:
     gitlab_project: Project
 
 
+@dataclass(frozen=True)
+class CloneOptions:
+    """Options to share and filter the git objects of cloned repositories.
+
+    Clones borrow the objects available in the reference repository via git
+    alternates, so the reference must not be deleted while the clones exist.
+    Shallow clones contain the commits since shallow_since and their parents.
+    """
+
+    reference: Path | None = None
+    blob_filter: str | None = None
+    shallow_since: date | None = None
+
+    def clone_arguments(self) -> list[str]:
+        arguments = []
+        if self.shallow_since is not None:
+            arguments.append(f"--shallow-since={self.shallow_since.isoformat()}")
+        if self.reference is not None and self.reference.is_dir():
+            arguments.append(f"--reference={self.reference.resolve()}")
+        if self.blob_filter is not None:
+            arguments.append(f"--filter={self.blob_filter}")
+        return arguments
+
+
+DEFAULT_CLONE_OPTIONS = CloneOptions()
+
+
 class GitRepo:
     """Git repository helper class."""
 
@@ -48,20 +80,63 @@ class GitRepo:
     def authenticate_http_url(url: str) -> str:
         return url.replace(GitRepo.HTTPS_LEAD, f"{GitRepo.HTTPS_LEAD}gitlab-ci-token:$GITLAB_TOKEN@")
 
-    def fetch_from(self, url: str) -> None:
+    def fetch_from(self, url: str, options: CloneOptions = DEFAULT_CLONE_OPTIONS) -> None:
         # The reason for this process here is to avoid that git writes the token
         # into .git/config
         self.__path.mkdir(parents=True, exist_ok=True)
         if not self.is_repo():
             git.Repo.init(self.path)
-        subprocess.check_call(
-            f"git pull {self.authenticate_http_url(url)} {self.__branch}",
+        if options.shallow_since is None:
+            self.__git_with_url("pull", url)
+            return
+        shallow_pull = subprocess.run(
+            self.__git_command_with_url(f"pull --shallow-since={options.shallow_since.isoformat()}", url),
             shell=True,
             cwd=self.path,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False,
+        )
+        sys.stderr.write(shallow_pull.stderr)
+        if shallow_pull.returncode and is_shallow_since_rejected(shallow_pull.stderr):
+            # There are no commits since the date, so only the latest commit is needed
+            self.__git_with_url("pull --depth=1", url)
+            return
+        shallow_pull.check_returncode()
+        self.__git_with_url("fetch --deepen=1", url)
+
+    def __git_with_url(self, command: str, url: str) -> None:
+        subprocess.check_call(self.__git_command_with_url(command, url), shell=True, cwd=self.path)
+
+    def __git_command_with_url(self, command: str, url: str) -> str:
+        return f"git {command} {self.authenticate_http_url(url)} {self.__branch}"
+
+    def clone(self, url: str, options: CloneOptions = DEFAULT_CLONE_OPTIONS) -> None:
+        progress = GitRepo.PrintProgress()
+        try:
+            repo = self.__clone_from(url, options.clone_arguments(), progress)
+        except git.GitCommandError:
+            # The errors of git are written to the progress instead of the exception
+            if options.shallow_since is None or not is_shallow_since_rejected("\n".join(progress.error_lines)):
+                raise
+            # There are no commits since the date, so only the latest commit is needed
+            self.__clone_from(
+                url, ["--depth=1", *replace(options, shallow_since=None).clone_arguments()], GitRepo.PrintProgress()
+            )
+            return
+        if options.shallow_since is not None:
+            # The diff of the oldest commit since the date needs its parent
+            repo.git.fetch("--deepen=1")
+
+    def __clone_from(self, url: str, clone_arguments: list[str], progress: PrintProgress) -> git.Repo:
+        return git.Repo.clone_from(
+            url, self.path, progress=progress, multi_options=clone_arguments, branch=self.__branch
         )
-
-    def clone(self, url: str) -> None:
-        git.Repo.clone_from(url, self.path, progress=GitRepo.PrintProgress(), branch=self.__branch)
 
     def pull(self) -> None:
         git.Repo(self.path).remote().pull(progress=GitRepo.PrintProgress())
+
+
+def is_shallow_since_rejected(git_stderr: str) -> bool:
+    """Return true if git failed because no commit is recent enough for --shallow-since, otherwise false."""
+    return any(error in git_stderr for error in SHALLOW_SINCE_REJECTED_ERRORS)
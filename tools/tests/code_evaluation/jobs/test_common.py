@@ -1,12 +1,16 @@
 """Common code evaluation job test."""
 
 import unittest
+from collections.abc import Hashable
 from pathlib import Path
-from subprocess import CalledProcessError
 from unittest.mock import MagicMock, patch
 
 from pyfakefs.fake_filesystem_unittest import TestCase
 from sel_tools.code_evaluation.jobs.common import (
+    EvaluationJob,
+    EvaluationJobGraph,
+    JobMetricsRecorder,
+    run_process,
     run_shell_command,
     run_shell_command_with_output,
 )
@@ -15,6 +19,15 @@ from sel_tools.code_evaluation.report import EvaluationResult
 from tests.helper import ComplexJob, OverMaxPassingJob, SimpleFailingJob, SimplePassingJob
 
 
+class ShellJob(EvaluationJob):
+    """Test job running a shell command."""
+
+    name = "shell"
+
+    def _run(self, repo_path: Path) -> int:
+        return run_shell_command("exit 3", repo_path)
+
+
 class EvaluationJobTest(unittest.TestCase):
     """Evaluation job test."""
 
@@ -45,6 +58,12 @@ class EvaluationJobTest(unittest.TestCase):
             results,
         )
 
+    def test_job_result_should_contain_metrics_of_its_processes(self) -> None:
+        result = ShellJob().run(Path())[0]
+        self.assertEqual((3,), result.metrics.exit_codes)
+        self.assertGreater(result.metrics.wall_time, 0)
+        self.assertFalse(result.metrics.cached)
+
     def test_over_max_passing_job__score_should_not_be_more_than_max(self) -> None:
         unit = OverMaxPassingJob()
         results = unit.run(Path())
@@ -68,29 +87,113 @@ class EvaluationJobTest(unittest.TestCase):
             "Each job instance should have its own dependency instances to avoid shared mutable state.",
         )
 
+    def test_parameters_should_not_contain_weight(self) -> None:
+        self.assertTupleEqual((), SimplePassingJob(3).parameters)
+
+    def test_identity_same_class_and_parameters_should_be_equal(self) -> None:
+        self.assertEqual(SimplePassingJob(1).identity, SimplePassingJob(2).identity)
+        self.assertEqual(CoverageJob(80).identity, CoverageJob(80).identity)
+
+    def test_identity_different_parameters_or_class_should_differ(self) -> None:
+        self.assertNotEqual(CoverageJob(80).identity, CoverageJob(75).identity)
+        self.assertNotEqual(SimplePassingJob().identity, SimpleFailingJob().identity)
+
+
+class CoverageJob(EvaluationJob):
+    """Test job with a parameter."""
+
+    name = "coverage"
+
+    def __init__(self, min_coverage: int, weight: int = 1) -> None:
+        super().__init__(weight)
+        self.__min_coverage = min_coverage
+
+    @property
+    def parameters(self) -> tuple[Hashable, ...]:
+        return (self.__min_coverage,)
+
+    def _run(self, repo_path: Path) -> int:
+        return 1
+
+
+class CyclicJob(EvaluationJob):
+    """Test job depending on itself."""
+
+    name = "cyclic"
+
+    @property
+    def dependencies(self) -> list[EvaluationJob]:
+        return [CyclicJob()]
+
+    def _run(self, repo_path: Path) -> int:
+        return 1
+
+
+class EvaluationJobGraphTest(unittest.TestCase):
+    """Evaluation job graph test."""
+
+    def test_equivalent_jobs_should_share_one_node(self) -> None:
+        unit = EvaluationJobGraph([ComplexJob(), SimplePassingJob(2), SimplePassingJob(1), CoverageJob(80)])
+        self.assertEqual(4, len(unit.nodes))
+
+    def test_equivalent_jobs_should_run_once(self) -> None:
+        with patch.object(SimplePassingJob, "_run", MagicMock(return_value=1)) as run_mock:
+            results = EvaluationJobGraph([ComplexJob(), SimplePassingJob(2)]).run(Path())
+
+        run_mock.assert_called_once()
+        self.assertListEqual(
+            [
+                EvaluationResult("simple_fail", 0, 1, "simple_fail: This caused the fail"),
+                EvaluationResult("simple_pass", 2, 2),
+                EvaluationResult("complex", 3, 3),
+                EvaluationResult("simple_pass", 2, 2),
+            ],
+            results,
+        )
+
+    def test_equivalent_jobs_with_different_weights_should_run_once_with_own_weight(self) -> None:
+        with patch.object(SimplePassingJob, "_run", MagicMock(return_value=1)) as run_mock:
+            results = EvaluationJobGraph([ComplexJob(), SimplePassingJob(5)]).run(Path())
+
+        run_mock.assert_called_once()
+        self.assertEqual(EvaluationResult("simple_pass", 2, 2), results[1])
+        self.assertEqual(EvaluationResult("simple_pass", 5, 5), results[3])
+
+    def test_cyclic_dependency_should_raise(self) -> None:
+        with self.assertRaisesRegex(ValueError, "Cyclic dependency"):
+            EvaluationJobGraph([CyclicJob()])
+
 
 class JobsTest(TestCase):
     """Test for jobs module."""
 
-    @patch("subprocess.check_call", MagicMock(return_value=0))
     def test_run_shell_command_success(self) -> None:
-        result = run_shell_command("make", Path())
+        result = run_shell_command("true", Path())
         self.assertEqual(1, result)
 
-    @patch("subprocess.check_call", MagicMock(side_effect=CalledProcessError(2, "")))
     def test_run_shell_command_fail(self) -> None:
-        result = run_shell_command("make", Path())
+        result = run_shell_command("exit 2", Path())
         self.assertEqual(0, result)
 
-    @patch("subprocess.check_output", MagicMock(return_value=b"success"))
     def test_run_shell_command_with_output_success(self) -> None:
-        result = run_shell_command_with_output("make", Path())
+        result = run_shell_command_with_output("printf success", Path())
         self.assertEqual((1, "success"), result)
 
-    @patch(
-        "subprocess.check_output",
-        MagicMock(side_effect=CalledProcessError(2, "", output=b"fail")),
-    )
     def test_run_shell_command_with_output_fail(self) -> None:
-        result = run_shell_command_with_output("make", Path())
+        result = run_shell_command_with_output("printf fail; exit 2", Path())
         self.assertEqual((0, "fail"), result)
+
+    def test_metrics_recorder_records_processes_of_nested_recorders(self) -> None:
+        with JobMetricsRecorder() as outer_recorder:
+            run_shell_command("true", Path())
+            with JobMetricsRecorder() as inner_recorder:
+                run_shell_command("exit 2", Path())
+
+        self.assertEqual((0, 2), outer_recorder.metrics.exit_codes)
+        self.assertEqual((2,), inner_recorder.metrics.exit_codes)
+        self.assertGreater(outer_recorder.metrics.peak_rss_kib, 0)
+        self.assertGreaterEqual(outer_recorder.metrics.wall_time, inner_recorder.metrics.wall_time)
+
+    def test_run_process_without_recorder_is_not_recorded(self) -> None:
+        self.assertEqual((0, ""), run_process("true", Path()))
+        self.assertListEqual([], JobMetricsRecorder.active_recorders())
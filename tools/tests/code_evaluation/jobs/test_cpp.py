@@ -4,17 +4,25 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from pyfakefs.fake_filesystem_unittest import TestCase
+from sel_tools.code_evaluation.jobs.common import JobMetricsRecorder, run_process
 from sel_tools.code_evaluation.jobs.cpp import (
+    CCACHE_STATS_LOG,
     CMAKE_MODULE_PATH,
+    DEPENDENCY_MIRROR_COMPLETE,
     HW_BUILD_FOLDER,
+    BuildBackend,
     ClangFormatTestJob,
     ClangTidyTestJob,
     CleanRepoJob,
     CMakeBuildJob,
     CodeCoverageTestJob,
+    DefaultBuildBackend,
     MakeTestJob,
     RelativeIncludeJob,
+    hash_dependency_declarations,
+    populate_dependency_mirror,
 )
+from sel_tools.config import REPO_DIR
 from sel_tools.utils.files import CMAKELISTS_FILE_NAME
 
 
@@ -76,6 +84,127 @@ class CMakeBuildJobTest(TestCase):
         self.assertIn("-DARG_TEST=ON", mock.call_args_list[0].args[0])
         self.assertEqual(2, len(mock.call_args_list))
 
+    @patch("sel_tools.code_evaluation.jobs.cpp.run_shell_command")
+    def test_default_build_backend_calls_make(self, mock: MagicMock) -> None:
+        self.unit.run(self.repo_path)
+        self.assertEqual("make", mock.call_args_list[1].args[0])
+
+    def test_identity_depends_on_cmake_options_and_build_backend(self) -> None:
+        self.assertEqual(CMakeBuildJob(cmake_options="-DX=1").identity, CMakeBuildJob(2, "-DX=1").identity)
+        self.assertNotEqual(CMakeBuildJob().identity, CMakeBuildJob(cmake_options="-DX=1").identity)
+        self.assertNotEqual(CMakeBuildJob().identity, CMakeBuildJob(build_backend=BuildBackend(ninja=True)).identity)
+
+    @patch("sel_tools.code_evaluation.jobs.cpp.run_shell_command")
+    def test_call_with_ninja_and_ccache(self, mock: MagicMock) -> None:
+        unit = CMakeBuildJob(build_backend=BuildBackend(ninja=True, parallel_jobs=4, ccache_dir=Path("ccache")))
+        unit.run(self.repo_path)
+        self.assertIn("-G Ninja", mock.call_args_list[0].args[0])
+        self.assertIn("-DCMAKE_CXX_COMPILER_LAUNCHER=ccache", mock.call_args_list[0].args[0])
+        self.assertIn("CCACHE_DIR=ccache", mock.call_args_list[1].args[0])
+        self.assertTrue(mock.call_args_list[1].args[0].endswith("ninja -j4"))
+
+    @patch("sel_tools.code_evaluation.jobs.cpp.run_shell_command")
+    def test_call_with_ccache_dir_containing_spaces(self, mock: MagicMock) -> None:
+        unit = CMakeBuildJob(build_backend=BuildBackend(ccache_dir=Path("ccache dir")))
+        unit.run(self.repo_path)
+        self.assertIn("CCACHE_DIR='ccache dir' ", mock.call_args_list[1].args[0])
+
+    def test_ccache_hit_rate_in_metrics_not_in_comment(self) -> None:
+        def build(command: str, cwd: Path) -> int:
+            if command.endswith("make -j2"):
+                stats = "# a.cpp\ndirect_cache_hit\n# b.cpp\npreprocessed_cache_hit\n# c.cpp\ncache_miss\n"
+                self.fs.create_file(cwd / CCACHE_STATS_LOG, contents=stats)
+            return 1
+
+        unit = CMakeBuildJob(build_backend=BuildBackend(parallel_jobs=2, ccache_dir=Path("ccache")))
+        with patch("sel_tools.code_evaluation.jobs.cpp.run_shell_command", side_effect=build):
+            result = unit.run(self.repo_path)
+        self.assertEqual(1, result[0].score)
+        self.assertEqual("", result[0].comment)
+        self.assertEqual((2, 3), (result[0].metrics.ccache_hits, result[0].metrics.ccache_compilations))
+
+    @patch("sel_tools.code_evaluation.jobs.cpp.run_shell_command")
+    def test_configured_default_build_backend(self, mock: MagicMock) -> None:
+        DefaultBuildBackend.configure(BuildBackend(ninja=True))
+        self.addCleanup(DefaultBuildBackend.configure, BuildBackend())
+        CMakeBuildJob().run(self.repo_path)
+        self.assertEqual("ninja", mock.call_args_list[1].args[0])
+
+    @patch("sel_tools.code_evaluation.jobs.cpp.run_shell_command")
+    def test_call_with_dependency_mirror(self, mock: MagicMock) -> None:
+        mirror = Path("mirror")
+        self.fs.create_dir(mirror / "googletest-src")
+        self.fs.create_file(mirror / DEPENDENCY_MIRROR_COMPLETE, contents=hash_dependency_declarations(REPO_DIR))
+        unit = CMakeBuildJob(build_backend=BuildBackend(dependency_mirror=mirror))
+        unit.run(self.repo_path)
+        self.assertEqual(2, len(mock.call_args_list))
+        self.assertIn(
+            f"-DFETCHCONTENT_SOURCE_DIR_GOOGLETEST={(mirror / 'googletest-src').resolve()}",
+            mock.call_args_list[0].args[0],
+        )
+        self.assertIn("-DFETCHCONTENT_UPDATES_DISCONNECTED=ON", mock.call_args_list[0].args[0])
+
+
+class PopulateDependencyMirrorTest(TestCase):
+    """Tests for populating the dependency mirror."""
+
+    def setUp(self) -> None:
+        self.setUpPyfakefs()
+        self.mirror = Path("mirror")
+        self.fs.create_file(Path("course") / CMAKELISTS_FILE_NAME, contents="include(UnitTesting)")
+        self.declarations = Path("course") / CMAKE_MODULE_PATH.name / "UnitTesting.cmake"
+        self.fs.create_file(self.declarations, contents="FetchContent_Declare(googletest GIT_TAG v1.14.0)")
+
+    @patch("sel_tools.code_evaluation.jobs.cpp.run_shell_command", return_value=1)
+    def test_populate_empty_mirror(self, mock: MagicMock) -> None:
+        populate_dependency_mirror(self.mirror, Path("course"))
+        mock.assert_called_once()
+        self.assertIn(f"-DFETCHCONTENT_BASE_DIR={self.mirror.resolve()}", mock.call_args.args[0])
+        self.assertTrue((self.mirror / DEPENDENCY_MIRROR_COMPLETE).exists())
+
+    @patch("sel_tools.code_evaluation.jobs.cpp.run_shell_command")
+    def test_populated_mirror_is_reused(self, mock: MagicMock) -> None:
+        self.fs.create_file(
+            self.mirror / DEPENDENCY_MIRROR_COMPLETE, contents=hash_dependency_declarations(Path("course"))
+        )
+        populate_dependency_mirror(self.mirror, Path("course"))
+        mock.assert_not_called()
+
+    @patch("sel_tools.code_evaluation.jobs.cpp.run_shell_command", return_value=1)
+    def test_mirror_is_populated_again_for_changed_declarations(self, mock: MagicMock) -> None:
+        populate_dependency_mirror(self.mirror, Path("course"))
+        self.declarations.write_text("FetchContent_Declare(googletest GIT_TAG v1.15.0)")
+        populate_dependency_mirror(self.mirror, Path("course"))
+        populate_dependency_mirror(self.mirror, Path("course"))
+        self.assertEqual(2, mock.call_count)
+
+    def test_declaration_hash_ignores_cmake_files_without_dependencies(self) -> None:
+        declarations_hash = hash_dependency_declarations(Path("course"))
+        self.fs.create_file(Path("course") / CMAKE_MODULE_PATH.name / "ClangTidy.cmake", contents="find_program(tidy)")
+        self.assertEqual(declarations_hash, hash_dependency_declarations(Path("course")))
+
+    @patch("sel_tools.code_evaluation.jobs.cpp.run_shell_command", return_value=0)
+    def test_failed_populate_raises_and_is_retried(self, mock: MagicMock) -> None:
+        self.fs.create_dir(self.mirror / "googletest-src")
+        with self.assertRaisesRegex(RuntimeError, "Populating the dependency mirror"):
+            populate_dependency_mirror(self.mirror, Path("course"))
+        self.assertFalse((self.mirror / DEPENDENCY_MIRROR_COMPLETE).exists())
+
+        mock.return_value = 1
+        populate_dependency_mirror(self.mirror, Path("course"))
+        self.assertEqual(2, mock.call_count)
+
+    def test_populate_is_not_recorded_in_job_metrics(self) -> None:
+        def populate(*_: object) -> int:
+            return int(run_process("true", Path())[0] == 0)
+
+        with (
+            patch("sel_tools.code_evaluation.jobs.cpp.run_shell_command", side_effect=populate),
+            JobMetricsRecorder() as recorder,
+        ):
+            populate_dependency_mirror(self.mirror, Path("course"))
+        self.assertEqual((), recorder.metrics.exit_codes)
+
 
 class ClangTidyTestJobTest(TestCase):
     """Tests for the clang-tidy test job."""
@@ -182,6 +311,13 @@ class MakeTestJobTest(TestCase):
         result = self.unit.run(self.repo_path)
         self.assertEqual(0, result[-1].score)
 
+    @patch("sel_tools.code_evaluation.jobs.cpp.run_shell_command", MagicMock(return_value=1))
+    @patch("sel_tools.code_evaluation.jobs.cpp.run_shell_command_with_output")
+    def test_run_impl_with_ninja_calls_ninja_test(self, mock: MagicMock) -> None:
+        mock.return_value = (1, "100% tests passed")
+        MakeTestJob(build_backend=BuildBackend(ninja=True)).run(self.repo_path)
+        self.assertEqual("ninja test", mock.call_args.args[0])
+
     @patch(
         "sel_tools.code_evaluation.jobs.cpp.run_shell_command",
         MagicMock(return_value=1),
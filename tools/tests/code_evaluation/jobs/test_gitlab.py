@@ -48,3 +48,10 @@ class CIStatusTestJobTest(unittest.TestCase):
         result = unit.run(Path("test"))
         self.assertEqual(0, result[0].score)
         self.assertIn("No CI pipelines found", result[0].comment)
+
+    def test_identity__same_repos_with_other_project_objects__should_be_equal(self) -> None:
+        first_unit = CIStatusTestJob([self.__create_fake_project_with_status(Path("test"), "success")])
+        second_unit = CIStatusTestJob([self.__create_fake_project_with_status(Path("test"), "success")], weight=2)
+
+        self.assertEqual(first_unit.identity, second_unit.identity)
+        self.assertNotEqual(first_unit.identity, CIStatusTestJob([], branch="develop").identity)
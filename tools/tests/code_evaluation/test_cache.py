@@ -0,0 +1,149 @@
+"""Test evaluation result cache module."""
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from sel_tools.code_evaluation.cache import EvaluationResultCache, get_tool_version
+from sel_tools.code_evaluation.jobs.common import EvaluationJob, EvaluationJobGraph
+from sel_tools.code_evaluation.report import EvaluationResult, JobMetrics
+
+from tests.helper import GitTestCase, SimplePassingJob
+
+
+class CountingJob(SimplePassingJob):
+    """Test job counting its runs."""
+
+    run_count = 0
+
+    def _run(self, repo_path: Path) -> int:
+        CountingJob.run_count += 1
+        return 1
+
+
+class DependsOnCountingJob(EvaluationJob):
+    """Test job depending on the counting job."""
+
+    name = "depends_on_counting"
+
+    @property
+    def dependencies(self) -> list[EvaluationJob]:
+        return [CountingJob()]
+
+    def _run(self, repo_path: Path) -> int:
+        return 1
+
+
+class EvaluationResultCacheTest(GitTestCase):
+    """Evaluation result cache test."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.test_file = self.repo_path / "test.txt"
+        self.test_file.write_text("init")
+        self.repo.index.add(["test.txt"])
+        self.repo.index.commit("init")
+        self.unit = EvaluationResultCache(self.workspace / "cache")
+        self.results = [EvaluationResult("simple_pass", 1, 1), EvaluationResult("simple_fail", 0, 1, "fail")]
+
+    def test_create_key_same_commit_and_job_should_be_equal(self) -> None:
+        self.assertEqual(
+            self.unit.create_key(self.repo_path, "job", ()),
+            self.unit.create_key(self.repo_path, "job", ()),
+        )
+
+    def test_create_key_different_job_should_differ(self) -> None:
+        self.assertNotEqual(
+            self.unit.create_key(self.repo_path, "job", ()),
+            self.unit.create_key(self.repo_path, "other_job", ()),
+        )
+
+    def test_create_key_new_commit_should_differ(self) -> None:
+        key = self.unit.create_key(self.repo_path, "job", ())
+        self.test_file.write_text("changed")
+        self.repo.index.add(["test.txt"])
+        self.repo.index.commit("change")
+
+        self.assertNotEqual(key, self.unit.create_key(self.repo_path, "job", ()))
+
+    def test_create_key_dirty_repo_should_be_none(self) -> None:
+        self.test_file.write_text("changed")
+        self.assertIsNone(self.unit.create_key(self.repo_path, "job", ()))
+
+    def test_create_key_no_repo_should_be_none(self) -> None:
+        self.assertIsNone(self.unit.create_key(self.workspace, "job", ()))
+
+    @patch("sel_tools.code_evaluation.cache.get_tool_version")
+    def test_create_key_different_tool_version_should_differ(self, tool_version_mock: MagicMock) -> None:
+        tool_version_mock.return_value = "cmake version 3.28"
+        key = self.unit.create_key(self.repo_path, "job", ("cmake",))
+        tool_version_mock.return_value = "cmake version 3.29"
+
+        self.assertNotEqual(key, self.unit.create_key(self.repo_path, "job", ("cmake",)))
+
+    def test_get_missing_key_should_be_none(self) -> None:
+        self.assertIsNone(self.unit.get("missing"))
+
+    def test_put_and_get(self) -> None:
+        self.unit.put("key", self.results)
+        self.assertEqual(self.results, self.unit.get("key"))
+
+    def test_get_should_mark_results_as_cached(self) -> None:
+        self.unit.put("key", [EvaluationResult("foo", 1, 1, metrics=JobMetrics(2.0, 1.0, 1024, (0,)))])
+        results = self.unit.get("key")
+
+        self.assertIsNotNone(results)
+        self.assertEqual([JobMetrics(cached=True)], [result.metrics for result in results or []])
+
+    def test_evict_should_remove_old_entries(self) -> None:
+        self.unit.put("old", self.results)
+        self.unit.put("new", self.results)
+        old_time = time.time() - 3600
+        os.utime(self.workspace / "cache" / "old.json", (old_time, old_time))
+
+        EvaluationResultCache(self.workspace / "cache", max_age_seconds=60).evict()
+
+        self.assertIsNone(self.unit.get("old"))
+        self.assertIsNotNone(self.unit.get("new"))
+
+    def test_evict_should_remove_oldest_entries_above_max_size(self) -> None:
+        for index, key in enumerate(["oldest", "older", "new"]):
+            self.unit.put(key, self.results)
+            entry_time = time.time() - 100 + index
+            os.utime(self.workspace / "cache" / f"{key}.json", (entry_time, entry_time))
+        entry_size = (self.workspace / "cache" / "new.json").stat().st_size
+
+        EvaluationResultCache(self.workspace / "cache", max_size_bytes=entry_size).evict()
+
+        self.assertIsNone(self.unit.get("oldest"))
+        self.assertIsNone(self.unit.get("older"))
+        self.assertIsNotNone(self.unit.get("new"))
+
+    def test_job_run_with_cache_should_run_once_per_commit(self) -> None:
+        CountingJob.run_count = 0
+        first_results = CountingJob().run(self.repo_path, self.unit)
+        second_results = CountingJob().run(self.repo_path, self.unit)
+
+        self.assertEqual(1, CountingJob.run_count)
+        self.assertListEqual(first_results, second_results)
+
+    def test_job_run_with_cache_different_weight_should_rescale_cached_results(self) -> None:
+        CountingJob.run_count = 0
+        CountingJob(1).run(self.repo_path, self.unit)
+        results = CountingJob(2).run(self.repo_path, self.unit)
+
+        self.assertEqual(1, CountingJob.run_count)
+        self.assertListEqual([EvaluationResult("simple_pass", 2, 2)], results)
+
+    def test_get_tool_version_of_missing_tool(self) -> None:
+        self.assertEqual("not installed", get_tool_version("this-tool-does-not-exist"))
+
+    def test_job_graph_cached_job_should_still_run_as_dependency(self) -> None:
+        CountingJob.run_count = 0
+        CountingJob().run(self.repo_path, self.unit)
+
+        results = EvaluationJobGraph([CountingJob(), DependsOnCountingJob()]).run(self.repo_path, self.unit)
+
+        self.assertEqual(2, CountingJob.run_count)
+        self.assertEqual(["simple_pass", "simple_pass", "depends_on_counting"], [result.name for result in results])
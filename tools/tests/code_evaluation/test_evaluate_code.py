@@ -1,11 +1,79 @@
 """Test evaluate code module."""
 
+import os
 from datetime import date, datetime
+from pathlib import Path
 
-from sel_tools.code_evaluation.evaluate_code import CodeEvaluator
+import git
+from sel_tools.code_evaluation.evaluate_code import (
+    FAILED_EVALUATION_NAME,
+    WORKTREE_FOLDER,
+    CodeEvaluator,
+    EvaluationSettings,
+    evaluate_code,
+)
+from sel_tools.code_evaluation.jobs.common import EvaluationJob
+from sel_tools.code_evaluation.jobs.cpp import HW_BUILD_FOLDER
+from sel_tools.code_evaluation.jobs.factory import EvaluationJobFactory
+from sel_tools.diff_creation.create_diff import create_diff
 from sel_tools.utils.repo import GitlabProject
 
-from tests.helper import ComplexJob, GitlabProjectFake, GitTestCase, SimplePassingJob
+from tests.helper import (
+    ComplexJob,
+    GitlabProjectFake,
+    GitTestCase,
+    SimplePassingJob,
+    create_gitlab_project_fake,
+)
+
+
+class CrashingJob(EvaluationJob):
+    """Test job that crashes on repositories named crash."""
+
+    name = "crash"
+
+    def _run(self, repo_path: Path) -> int:
+        if repo_path.name == "crash":
+            msg = "Job crashed"
+            raise RuntimeError(msg)
+        return 1
+
+
+class CrashingJobFactory(EvaluationJobFactory):
+    """Test factory."""
+
+    @staticmethod
+    def create(gitlab_projects: list[GitlabProject], homework_number: int) -> list[EvaluationJob]:
+        return [SimplePassingJob(), CrashingJob()]
+
+
+class KillingJob(EvaluationJob):
+    """Test job that kills its worker process on repositories named crash."""
+
+    name = "kill"
+
+    def _run(self, repo_path: Path) -> int:
+        if repo_path.name == "crash":
+            os._exit(1)
+        return 1
+
+
+class KillingJobFactory(EvaluationJobFactory):
+    """Test factory."""
+
+    @staticmethod
+    def create(gitlab_projects: list[GitlabProject], homework_number: int) -> list[EvaluationJob]:
+        return [SimplePassingJob(), KillingJob()]
+
+
+class RepoPathJob(EvaluationJob):
+    """Test job that comments the path it runs on."""
+
+    name = "repo path"
+
+    def _run(self, repo_path: Path) -> int:
+        self._comment = str(repo_path)
+        return 1
 
 
 class CodeEvaluatorTest(GitTestCase):
@@ -68,3 +136,111 @@ class CodeEvaluatorTest(GitTestCase):
         evaluator_two = CodeEvaluator(job_list, self.gitlab_project, 1)
 
         self.assertNotEqual(evaluator_one.__dict__, evaluator_two.__dict__)
+
+
+class WorktreeCodeEvaluatorTest(GitTestCase):
+    """Code evaluator test with worktrees."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.gitlab_project = create_gitlab_project_fake(self.repo_path)
+        self.settings = EvaluationSettings(worktrees=True)
+        self.worktree_path = self.workspace / WORKTREE_FOLDER / self.repo_path.name
+        self.__commit_test_file("", datetime(2021, 11, 11))
+
+    def __commit_test_file(self, file_content: str, commit_date: date) -> None:
+        (self.repo_path / "test.txt").write_text(file_content)
+        self.repo.index.add(["test.txt"])
+        self.repo.index.commit("edit test.txt", commit_date=commit_date.isoformat())
+
+    def test_evaluate_should_run_jobs_in_worktree(self) -> None:
+        report = CodeEvaluator([RepoPathJob()], self.gitlab_project, 1, self.settings).evaluate(None)
+
+        self.assertEqual(self.repo_path, report.repo_path)
+        self.assertIn(str(self.worktree_path), report.results[0].comment)
+
+    def test_evaluate_with_eval_date_should_not_touch_clone(self) -> None:
+        self.__commit_test_file("late", datetime(2021, 11, 14))
+        head = self.repo.head.commit
+
+        CodeEvaluator([SimplePassingJob()], self.gitlab_project, 1, self.settings).evaluate(date(2021, 11, 13))
+
+        self.assertEqual("", (self.worktree_path / "test.txt").read_text())
+        self.assertEqual("late", (self.repo_path / "test.txt").read_text())
+        self.assertEqual(head, self.repo.head.commit)
+
+    def test_diff_with_eval_date_should_end_at_evaluated_commit(self) -> None:
+        self.__commit_test_file("on time 1", datetime(2021, 11, 12, 12))
+        self.__commit_test_file("on time 2", datetime(2021, 11, 13, 12))
+        self.__commit_test_file("late", datetime(2021, 11, 15, 12))
+
+        CodeEvaluator([SimplePassingJob()], self.gitlab_project, 1, self.settings).evaluate(date(2021, 11, 14))
+        total_diff = create_diff([self.repo_path], date(2021, 11, 12), date(2021, 11, 14))[0].diffs[0]
+
+        self.assertEqual("late", (self.repo_path / "test.txt").read_text())
+        self.assertIn("+on time 2", str(total_diff.patch))
+        self.assertNotIn("late", str(total_diff.patch))
+
+    def test_evaluate_again_should_keep_build_folder_and_move_to_new_commit(self) -> None:
+        CodeEvaluator([SimplePassingJob()], self.gitlab_project, 1, self.settings).evaluate(None)
+        build_file = self.worktree_path / HW_BUILD_FOLDER / "CMakeCache.txt"
+        build_file.parent.mkdir()
+        build_file.touch()
+        (self.worktree_path / "untracked.txt").touch()
+        self.__commit_test_file("new", datetime(2021, 11, 14))
+
+        CodeEvaluator([SimplePassingJob()], self.gitlab_project, 1, self.settings).evaluate(None)
+
+        self.assertTrue(build_file.exists())
+        self.assertFalse((self.worktree_path / "untracked.txt").exists())
+        self.assertEqual("new", (self.worktree_path / "test.txt").read_text())
+
+    def test_evaluate_should_replace_stale_worktree_folder(self) -> None:
+        self.worktree_path.mkdir(parents=True)
+        (self.worktree_path / "stale.txt").touch()
+
+        CodeEvaluator([SimplePassingJob()], self.gitlab_project, 1, self.settings).evaluate(None)
+
+        self.assertFalse((self.worktree_path / "stale.txt").exists())
+        self.assertTrue((self.worktree_path / "test.txt").exists())
+
+
+class EvaluateCodeTest(GitTestCase):
+    """Evaluate code test."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.gitlab_projects = []
+        for name in ["repo", "crash", "other"]:
+            repo = self.repo if name == "repo" else git.Repo.init(self.workspace / name)
+            (self.workspace / name / "test.txt").touch()
+            repo.index.add(["test.txt"])
+            repo.index.commit("init")
+            self.gitlab_projects.append(create_gitlab_project_fake(self.workspace / name, name))
+
+    def test_evaluate_code_sequential(self) -> None:
+        reports = evaluate_code(CrashingJobFactory, self.gitlab_projects, 1, None)
+
+        self.assertEqual(["repo", "crash", "other"], [report.project_id for report in reports])
+        self.assertEqual([2, 0, 2], [report.score for report in reports])
+
+    def test_evaluate_code_parallel_should_keep_project_order(self) -> None:
+        reports = evaluate_code(CrashingJobFactory, self.gitlab_projects, 1, None, EvaluationSettings(max_workers=2))
+
+        self.assertEqual(["repo", "crash", "other"], [report.project_id for report in reports])
+        self.assertEqual([2, 2], [reports[0].score, reports[2].score])
+
+    def test_evaluate_code_parallel_crash_should_only_fail_that_report(self) -> None:
+        reports = evaluate_code(CrashingJobFactory, self.gitlab_projects, 1, None, EvaluationSettings(max_workers=2))
+
+        self.assertEqual(0, reports[1].score)
+        self.assertEqual(FAILED_EVALUATION_NAME, reports[1].results[0].name)
+        self.assertIn("Job crashed", reports[1].results[0].comment)
+
+    def test_evaluate_code_parallel_killed_worker_should_only_fail_that_report(self) -> None:
+        reports = evaluate_code(KillingJobFactory, self.gitlab_projects, 1, None, EvaluationSettings(max_workers=2))
+
+        self.assertEqual(["repo", "crash", "other"], [report.project_id for report in reports])
+        self.assertEqual([2, 0, 2], [report.score for report in reports])
+        self.assertEqual(FAILED_EVALUATION_NAME, reports[1].results[0].name)
+        self.assertIn("BrokenProcessPool", reports[1].results[0].comment)
@@ -8,12 +8,16 @@ from pyfakefs.fake_filesystem_unittest import TestCase
 from sel_tools.code_evaluation.report import (
     EvaluationReport,
     EvaluationResult,
+    JobMetrics,
+    create_timing_summary,
+    percentile,
     write_evaluation_report_for_student_comments,
     write_evaluation_reports,
+    write_timing_summary,
 )
 from sel_tools.utils.repo import GitlabProject
 
-from tests.helper import GitlabProjectFake
+from tests.helper import GitlabProjectFake, create_gitlab_project_fake
 
 
 class ReportTest(TestCase):
@@ -67,6 +71,17 @@ class ReportTest(TestCase):
         self.assertIn("## Comments for Project 5678", md_report)
         self.assertIn("this caused the fail", md_report)
 
+    def test_write_timing_summary(self) -> None:
+        self.fs.create_dir("workspace")
+        gitlab_project = create_gitlab_project_fake(Path("workspace/project_1"), "1234")
+
+        write_timing_summary(
+            [EvaluationReport(gitlab_project, 1, [EvaluationResult("foo", 1, 1, metrics=JobMetrics(2.0))])],
+            Path("workspace"),
+        )
+
+        self.assertIn("| workspace/project_1 | 2.0 |", Path("workspace/evaluation_timing_summary.md").read_text())
+
 
 class EvaluationReportTest(unittest.TestCase):
     """Evaluation report test."""
@@ -112,8 +127,8 @@ class EvaluationReportTest(unittest.TestCase):
             self.gitlab_project,
             1,
             [
-                EvaluationResult("foo", 2, 2),
-                EvaluationResult("bar", 0, 1, comment="this caused the fail"),
+                EvaluationResult("foo", 2, 2, metrics=JobMetrics(1.5, 1.25, 2048, (0, 2))),
+                EvaluationResult("bar", 0, 1, comment="this caused the fail", metrics=JobMetrics(cached=True)),
             ],
         )
         self.assertEqual(
@@ -126,8 +141,36 @@ class EvaluationReportTest(unittest.TestCase):
                     "score": 2,
                     "max_score": 3,
                     "results": [
-                        {"name": "foo", "score": 2, "max_score": 2, "comment": ""},
-                        {"name": "bar", "score": 0, "max_score": 1, "comment": "this caused the fail"},
+                        {
+                            "name": "foo",
+                            "score": 2,
+                            "max_score": 2,
+                            "comment": "",
+                            "metrics": {
+                                "wall_time": 1.5,
+                                "cpu_time": 1.25,
+                                "peak_rss_kib": 2048,
+                                "exit_codes": [0, 2],
+                                "cached": False,
+                                "ccache_hits": 0,
+                                "ccache_compilations": 0,
+                            },
+                        },
+                        {
+                            "name": "bar",
+                            "score": 0,
+                            "max_score": 1,
+                            "comment": "this caused the fail",
+                            "metrics": {
+                                "wall_time": 0.0,
+                                "cpu_time": 0.0,
+                                "peak_rss_kib": 0,
+                                "exit_codes": [],
+                                "cached": True,
+                                "ccache_hits": 0,
+                                "ccache_compilations": 0,
+                            },
+                        },
                     ],
                 },
                 indent=4,
@@ -166,3 +209,46 @@ class EvaluationReportTest(unittest.TestCase):
         self.assertIn("Overall score: 2/3", student_section)
         self.assertIn("this caused the fail", student_section)
         self.assertNotIn("foo", student_section)
+
+    def test_metrics_should_not_change_result_equality(self) -> None:
+        self.assertEqual(EvaluationResult("foo", 1, 1), EvaluationResult("foo", 1, 1, metrics=JobMetrics(1.0)))
+
+    def test_unique_results_should_skip_repeated_dependency_results(self) -> None:
+        dependency = EvaluationResult("build", 1, 1)
+        job = EvaluationResult("build", 1, 1)
+        unit = EvaluationReport(self.gitlab_project, 1, [dependency, dependency, job])
+
+        self.assertEqual(2, len(unit.unique_results))
+
+
+class TimingSummaryTest(unittest.TestCase):
+    """Timing summary test."""
+
+    def test_create_timing_summary_should_sort_repos_and_jobs_by_wall_time(self) -> None:
+        reports = [
+            EvaluationReport(
+                create_gitlab_project_fake(Path(name), name),
+                1,
+                [
+                    EvaluationResult("build", 1, 1, metrics=JobMetrics(build_time, 3.0, 4096)),
+                    EvaluationResult("format", 1, 1, metrics=JobMetrics(1.0, 0.5, 1024)),
+                    EvaluationResult("tidy", 1, 1, metrics=JobMetrics(cached=True)),
+                ],
+            )
+            for name, build_time in [("fast", 2.0), ("slow", 10.0)]
+        ]
+
+        summary = create_timing_summary(reports)
+
+        self.assertIn("Evaluated 2 repos in 14.0s job wall time and 7.0s process CPU time.", summary)
+        self.assertIn("2 job results were taken from the cache.", summary)
+        self.assertLess(summary.index("| slow | 11.0 | 3.5 | 4.0 |"), summary.index("| fast | 3.0 | 3.5 | 4.0 |"))
+        self.assertIn("| build | 2 | 12.0 | 2.0 | 10.0 | 10.0 | 10.0 |", summary)
+        self.assertIn("| format | 2 | 2.0 | 1.0 | 1.0 | 1.0 | 1.0 |", summary)
+        self.assertNotIn("| tidy |", summary)
+
+    def test_percentile_should_use_nearest_rank(self) -> None:
+        values = [4.0, 1.0, 3.0, 2.0]
+        self.assertEqual(1.0, percentile(values, 0))
+        self.assertEqual(2.0, percentile(values, 50))
+        self.assertEqual(4.0, percentile(values, 90))
@@ -4,11 +4,26 @@ import unittest
 from datetime import date, datetime
 from pathlib import Path
 
-from sel_tools.diff_creation.create_diff import DiffCreator, create_diff
+from sel_tools.diff_creation.create_diff import (
+    PATCH_STORE_FOLDER,
+    DiffCreator,
+    DiffSettings,
+    PatchStore,
+    create_diff,
+)
+from sel_tools.diff_creation.report import Diff, DiffStat
 
 from tests.helper import GitTestCase
 
 
+def get_patch(diff: Diff) -> str:
+    """Return the patch of the diff, failing if it was not created."""
+    if diff.patch is None:
+        msg = f"No patch created for {diff.hexsha}"
+        raise AssertionError(msg)
+    return diff.patch
+
+
 class CreateDiffTest(unittest.TestCase):
     """Create diff module test."""
 
@@ -83,7 +98,7 @@ class DiffCreatorTest(GitTestCase):
 
         result = unit.create(date(2021, 11, 12), None)
 
-        self.assertIn("+line 1\n+line 2\n+line 3", result.diffs[1].patch)
+        self.assertIn("+line 1\n+line 2\n+line 3", get_patch(result.diffs[1]))
 
     def test_create__three_commits_and_one_between_both_dates_should_have_one_plus_total_diffs(
         self,
@@ -112,11 +127,11 @@ class DiffCreatorTest(GitTestCase):
 
         self.assertEqual(3, len(result.diffs))
 
-        self.assertIn("should be there", result.diffs[0].patch)
-        self.assertNotIn("ignore me", result.diffs[0].patch)
+        self.assertIn("should be there", get_patch(result.diffs[0]))
+        self.assertNotIn("ignore me", get_patch(result.diffs[0]))
 
-        self.assertIn("should be there", result.diffs[1].patch)
-        self.assertIn("ignore me", result.diffs[1].patch)
+        self.assertIn("should be there", get_patch(result.diffs[1]))
+        self.assertIn("ignore me", get_patch(result.diffs[1]))
 
     def test_create__commits_with_ignored_folder_should_not_be_in_total_diff(
         self,
@@ -135,10 +150,95 @@ class DiffCreatorTest(GitTestCase):
 
         self.assertEqual(3, len(result.diffs))
 
-        self.assertIn("should be there", result.diffs[0].patch)
-        self.assertNotIn("ignore me", result.diffs[0].patch)
-        self.assertNotIn("me too", result.diffs[0].patch)
+        self.assertIn("should be there", get_patch(result.diffs[0]))
+        self.assertNotIn("ignore me", get_patch(result.diffs[0]))
+        self.assertNotIn("me too", get_patch(result.diffs[0]))
+
+        self.assertIn("should be there", get_patch(result.diffs[1]))
+        self.assertIn("ignore me", get_patch(result.diffs[1]))
+        self.assertIn("me too", get_patch(result.diffs[1]))
+
+    def test_create__per_commit_patches_should_equal_git_diff(self) -> None:
+        self.repo_path.joinpath("test.txt").write_text("line 1\n")
+        self.repo_path.joinpath("other.txt").write_text("other\n")
+        self.repo.index.add(["test.txt", "other.txt"])
+        self.repo.index.commit("add files", commit_date=datetime(2021, 11, 13).isoformat())
+        self.repo_path.joinpath("test.txt").write_text("line 1\nline 2\n")
+        self.repo.index.add(["test.txt"])
+        self.repo.index.commit("edit test.txt", commit_date=datetime(2021, 11, 14).isoformat())
+        self.repo.index.commit("empty", commit_date=datetime(2021, 11, 15).isoformat())
+
+        result = DiffCreator(self.repo_path).create(date(2021, 11, 12), None)
+
+        for diff in result.diffs[1:]:
+            commit = self.repo.commit(diff.hexsha)
+            self.assertEqual(self.repo.git.diff(commit.parents[0].tree, commit.tree), diff.patch)
+
+    def test_create__patches_should_be_stored_in_git_folder_and_reused(self) -> None:
+        commit = self.repo.index.commit("second", commit_date=datetime(2021, 11, 13).isoformat())
+        DiffCreator(self.repo_path).create(date(2021, 11, 12), None)
+        patch_store_folder = self.repo_path / ".git" / PATCH_STORE_FOLDER
+        self.assertTrue((patch_store_folder / f"{commit.hexsha}.patch").is_file())
+        PatchStore(patch_store_folder).put(commit.hexsha, "stored patch")
+
+        result = DiffCreator(self.repo_path).create(date(2021, 11, 12), None)
+
+        self.assertEqual("stored patch", result.diffs[1].patch)
+
+    def test_create__overall_diff_of_dirty_repo_should_not_be_reused(self) -> None:
+        self.repo_path.joinpath("test.txt").write_text("committed\n")
+        self.repo.index.add(["test.txt"])
+        self.repo.index.commit("add test.txt", commit_date=datetime(2021, 11, 13).isoformat())
+        DiffCreator(self.repo_path).create(date(2021, 11, 10), None)
+        self.repo_path.joinpath("test.txt").write_text("changed\n")
+
+        result = DiffCreator(self.repo_path).create(date(2021, 11, 10), None)
+
+        self.assertIn("+changed", get_patch(result.diffs[0]))
+
+    def test_create__diffs_should_have_stats(self) -> None:
+        self.repo_path.joinpath("test.txt").write_text("line 1\nline 2\n")
+        self.repo_path.joinpath("image.png").write_bytes(b"\x89PNG\x00\xff")
+        self.repo.index.add(["test.txt", "image.png"])
+        self.repo.index.commit("add files", commit_date=datetime(2021, 11, 13).isoformat())
+        self.repo_path.joinpath("test.txt").write_text("line 1\nline 3\n")
+        self.repo.index.add(["test.txt"])
+        self.repo.index.commit("edit test.txt", commit_date=datetime(2021, 11, 14).isoformat())
+
+        result = DiffCreator(self.repo_path).create(date(2021, 11, 12), None)
+
+        self.assertEqual(DiffStat(1, 1, 1, 0), result.diffs[1].stat)
+        self.assertEqual(DiffStat(2, 2, 0, 1), result.diffs[2].stat)
+
+    def test_create__diffstat_only_should_only_create_requested_and_large_patches(self) -> None:
+        self.repo_path.joinpath("small.txt").write_text("line\n")
+        self.repo.index.add(["small.txt"])
+        small_commit = self.repo.index.commit("small", commit_date=datetime(2021, 11, 13).isoformat())
+        self.repo_path.joinpath("large.txt").write_text("line\n" * 10)
+        self.repo.index.add(["large.txt"])
+        self.repo.index.commit("large", commit_date=datetime(2021, 11, 14).isoformat())
+        self.repo_path.joinpath("requested.txt").write_text("line\n")
+        self.repo.index.add(["requested.txt"])
+        requested_commit = self.repo.index.commit("requested", commit_date=datetime(2021, 11, 15).isoformat())
+        settings = DiffSettings(
+            diffstat_only=True, patch_threshold=10, patch_commits=frozenset({requested_commit.hexsha[:7]})
+        )
+
+        result = DiffCreator(self.repo_path, settings=settings).create(date(2021, 11, 12), None)
+
+        diffs = {diff.message: diff for diff in result.diffs[1:]}
+        self.assertIn("+line", get_patch(diffs["large"]))
+        self.assertIn("+line", get_patch(diffs["requested"]))
+        self.assertIsNone(diffs["small"].patch)
+        self.assertEqual(11, result.diffs[0].stat.insertions)
+        self.assertIsNotNone(result.diffs[0].patch, msg="The total diff exceeds the threshold too")
+        self.assertFalse((self.repo_path / ".git" / PATCH_STORE_FOLDER / f"{small_commit.hexsha}.patch").exists())
+
+
+class DiffStatTest(unittest.TestCase):
+    """Diff stat test."""
+
+    def test_from_numstat_should_sum_lines_and_count_binary_files(self) -> None:
+        numstat = ["3\t1\tsrc/main.cpp", "-\t-\tassets/image.png", "0\t2\tREADME.md", ""]
 
-        self.assertIn("should be there", result.diffs[1].patch)
-        self.assertIn("ignore me", result.diffs[1].patch)
-        self.assertIn("me too", result.diffs[1].patch)
+        self.assertEqual(DiffStat(3, 3, 3, 1), DiffStat.from_numstat(numstat))
@@ -1,9 +1,23 @@
 """Diff report tests."""
 
+import tempfile
+import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 from pyfakefs.fake_filesystem_unittest import TestCase
-from sel_tools.diff_creation.report import Diff, DiffReport, write_diff_reports, write_report_for_inactive_student_repos
+from sel_tools.diff_creation.report import (
+    DIFF_STYLESHEET,
+    HTML_CACHE_FOLDER,
+    Diff,
+    DiffReport,
+    DiffStat,
+    hash_patch,
+    render_html_files,
+    render_patch_html,
+    write_diff_reports,
+    write_report_for_inactive_student_repos,
+)
 
 
 class ReportTest(TestCase):
@@ -38,6 +52,59 @@ class ReportTest(TestCase):
         self.assertTrue(Path("report/base.csv").exists())
         self.assertEqual(2, len(list(Path("report").glob("*.patch"))))
 
+    def test_write_diff_reports_should_share_one_stylesheet_per_workspace(self) -> None:
+        self.fs.create_dir("workspace/repo_1")
+        self.fs.create_dir("workspace/repo_2")
+
+        write_diff_reports(
+            [
+                DiffReport(Path("workspace/repo_1"), [Diff("a", "a", "a", "+a")]),
+                DiffReport(Path("workspace/repo_2"), [Diff("b", "b", "b", "+b")]),
+            ],
+            "base",
+        )
+
+        self.assertTrue(Path("workspace", DIFF_STYLESHEET).exists())
+        html = Path("workspace/repo_1/0-a.html").read_text()
+        self.assertIn(f'href="../{DIFF_STYLESHEET}"', html)
+        self.assertNotIn("<style", html)
+
+    def test_write_diff_reports_should_reuse_cached_html(self) -> None:
+        self.fs.create_dir("workspace/repo")
+        self.fs.create_file(Path("workspace", HTML_CACHE_FOLDER, f"{hash_patch('+a')}.html"), contents="cached")
+
+        with patch("sel_tools.diff_creation.report.render_patch_html") as render_mock:
+            write_diff_reports([DiffReport(Path("workspace/repo"), [Diff("a", "a", "a", "+a")])], "base")
+
+        render_mock.assert_not_called()
+        self.assertEqual("cached", Path("workspace/repo/0-a.html").read_text())
+
+    def test_write_diff_reports_should_prune_unused_cached_html(self) -> None:
+        self.fs.create_dir("workspace/repo")
+        unused_cache_file = Path("workspace", HTML_CACHE_FOLDER, f"{hash_patch('+old')}.html")
+        self.fs.create_file(unused_cache_file, contents="old")
+
+        write_diff_reports([DiffReport(Path("workspace/repo"), [Diff("a", "a", "a", "+a")])], "base")
+
+        self.assertFalse(unused_cache_file.exists())
+        self.assertTrue(Path("workspace", HTML_CACHE_FOLDER, f"{hash_patch('+a')}.html").exists())
+
+    def test_write_diff_reports_should_replace_outdated_stylesheet(self) -> None:
+        self.fs.create_dir("workspace/repo")
+        self.fs.create_file(Path("workspace", DIFF_STYLESHEET), contents=".highlight { color: red }")
+
+        write_diff_reports([DiffReport(Path("workspace/repo"), [Diff("a", "a", "a", "+a")])], "base")
+
+        self.assertNotIn("color: red", Path("workspace", DIFF_STYLESHEET).read_text())
+
+    def test_render_patch_html_should_truncate_large_patches(self) -> None:
+        with patch("sel_tools.diff_creation.report.MAX_HIGHLIGHTED_PATCH_SIZE", 10):
+            html = render_patch_html("+first line\n+second line\n")
+
+        self.assertIn("first", html)
+        self.assertNotIn("second", html)
+        self.assertIn("Patch truncated after 10 characters", html)
+
     def test_write_report_for_inactive_student_repos__no_report__should_write_nothing(
         self,
     ) -> None:
@@ -102,6 +169,24 @@ class DiffReportTest(TestCase):
         self.assertIn("paul", table.values)
         self.assertIn("blub", table.values)
 
+    def test_generate_overview_table_should_contain_diff_stats(self) -> None:
+        unit = DiffReport(self.path, [Diff("abc", "author", "foo bar", None, DiffStat(2, 10, 3, 1))])
+
+        table = unit.generate_overview_table()
+
+        self.assertDictEqual(
+            {"files": 2, "insertions": 10, "deletions": 3, "binary_files": 1},
+            table[["files", "insertions", "deletions", "binary_files"]].iloc[0].to_dict(),
+        )
+
+    def test_write_diff_patches_should_skip_diffs_without_patch(self) -> None:
+        unit = DiffReport(self.path, [Diff("a", "a", "a", None), Diff("b", "b", "b", "+b")])
+
+        unit.write_diff_patches()
+
+        self.assertListEqual([Path("report/1-b.patch")], list(self.path.glob("*.patch")))
+        self.assertListEqual([Path("report/1-b.html")], list(self.path.glob("*.html")))
+
     def test_write_diff_patches_without_diffs_should_write_nothing(self) -> None:
         unit = DiffReport(self.path, [])
 
@@ -157,3 +242,18 @@ class DiffReportTest(TestCase):
         unit = DiffReport(self.path, [Diff("a", "a", "a", "a"), Diff("b", "b", "b", "b")])
 
         self.assertTrue(unit.has_diffs)
+
+
+class RenderHtmlFilesTest(unittest.TestCase):
+    """Render html files test."""
+
+    def test_render_html_files_in_parallel_processes(self) -> None:
+        with tempfile.TemporaryDirectory() as workspace:
+            repo_path = Path(workspace, "repo")
+            repo_path.mkdir()
+            patches = [(f"+line {index}", repo_path / f"{index}.html") for index in range(4)]
+
+            render_html_files(patches, max_workers=2)
+
+            for index in range(4):
+                self.assertIn(f"line {index}", repo_path.joinpath(f"{index}.html").read_text())
@@ -1,10 +1,13 @@
 """Test copy item module."""
 
+import stat
 from pathlib import Path
+from unittest.mock import patch
 
 from pyfakefs.fake_filesystem_unittest import TestCase
 from sel_tools.file_export.config import EXPORT_IGNORE
-from sel_tools.file_export.copy_item import copy_item
+from sel_tools.file_export.copy_item import SYNC_MANIFEST_FILE, copy_item, hash_file, sync_item
+from sel_tools.utils.files import GIT_FOLDER
 
 
 class CopyItemTest(TestCase):
@@ -60,3 +63,64 @@ class CopyItemTest(TestCase):
         self.assertFalse((self.dest_folder / "nested" / "folder" / "log.txt").exists())
         self.assertFalse((self.dest_folder / "build").exists())
         self.assertFalse((self.dest_folder / EXPORT_IGNORE).is_file())
+
+
+class SyncItemTest(TestCase):
+    """Sync Item Test."""
+
+    def setUp(self) -> None:
+        self.setUpPyfakefs()
+        self.source_folder = Path("source")
+        self.fs.create_file(self.source_folder / "main.cpp", contents="int main() {}")
+        self.fs.create_file(self.source_folder / "include" / "header.h", contents="#pragma once")
+        self.dest_folder = Path("repo")
+
+    def test_sync_into_empty_folder_copies_all_files(self) -> None:
+        self.assertEqual(2, sync_item(self.source_folder, self.dest_folder))
+        self.assertEqual("#pragma once", (self.dest_folder / "include" / "header.h").read_text())
+
+    def test_sync_copies_changed_files_only(self) -> None:
+        self.fs.create_file(self.dest_folder / "main.cpp", contents="int main() {}")
+        self.fs.create_file(self.dest_folder / "include" / "header.h", contents="// changed")
+        self.fs.create_file(self.dest_folder / "student.cpp")
+
+        self.assertEqual(1, sync_item(self.source_folder, self.dest_folder))
+        self.assertEqual("#pragma once", (self.dest_folder / "include" / "header.h").read_text())
+        self.assertTrue((self.dest_folder / "student.cpp").exists())
+
+    def test_sync_into_repo_reads_synced_files_only_once(self) -> None:
+        self.fs.create_dir(self.dest_folder / GIT_FOLDER)
+        sync_item(self.source_folder, self.dest_folder)
+        self.assertTrue((self.dest_folder / GIT_FOLDER / SYNC_MANIFEST_FILE).is_file())
+
+        with patch("sel_tools.file_export.copy_item.hash_file") as hash_file_mock:
+            self.assertEqual(
+                0,
+                sync_item(
+                    self.source_folder, self.dest_folder, {"main.cpp": hash_file(self.source_folder / "main.cpp")}
+                ),
+            )
+        hash_file_mock.assert_not_called()
+
+    def test_sync_into_repo_copies_file_changed_since_last_sync(self) -> None:
+        self.fs.create_dir(self.dest_folder / GIT_FOLDER)
+        sync_item(self.source_folder, self.dest_folder)
+        (self.dest_folder / "main.cpp").write_text("// student change")
+
+        self.assertEqual(1, sync_item(self.source_folder, self.dest_folder))
+        self.assertEqual("int main() {}", (self.dest_folder / "main.cpp").read_text())
+
+    def test_sync_keeps_executable_mode(self) -> None:
+        (self.source_folder / "main.cpp").chmod(0o755)
+
+        sync_item(self.source_folder, self.dest_folder)
+
+        self.assertEqual(0o755, stat.S_IMODE((self.dest_folder / "main.cpp").stat().st_mode))
+
+    def test_sync_into_repo_applies_changed_mode_of_synced_file(self) -> None:
+        self.fs.create_dir(self.dest_folder / GIT_FOLDER)
+        sync_item(self.source_folder, self.dest_folder)
+        (self.source_folder / "main.cpp").chmod(0o755)
+
+        self.assertEqual(1, sync_item(self.source_folder, self.dest_folder))
+        self.assertEqual(0o755, stat.S_IMODE((self.dest_folder / "main.cpp").stat().st_mode))
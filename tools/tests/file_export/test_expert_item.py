@@ -1,10 +1,12 @@
 """Export item module tests."""
 
 from pathlib import Path
+from unittest.mock import patch
 
 from pyfakefs.fake_filesystem_unittest import TestCase
 from sel_tools.file_export.config import EXPORT_BEGIN, EXPORT_END
 from sel_tools.file_export.export_item import export_items, visit_exported_item
+from sel_tools.file_export.formatter import CLANG_FORMAT, find_clang_format_style_file
 
 TEST_CONTENT = f"""
 // {EXPORT_BEGIN}
@@ -59,3 +61,36 @@ class ExportFilesTest(TestCase):
 
         self.assertTrue(Path("repo1").joinpath("test.cpp").exists())
         self.assertTrue(Path("repo2").joinpath("test.cpp").exists())
+
+    def test_export_items_student_files_untouched(self) -> None:
+        self.fs.create_file("repo1/student.cpp", contents=TEST_CONTENT)
+
+        export_items(self.exported_item, [Path("repo1")], False)
+
+        self.assertNotIn("foo bar", Path("repo1/test.cpp").read_text())
+        self.assertEqual(TEST_CONTENT, Path("repo1/student.cpp").read_text())
+
+    def test_export_items_single_file(self) -> None:
+        self.fs.create_dir("repo1")
+
+        export_items(self.test_file, [Path("repo1")], True)
+
+        self.assertIn("foo bar", Path("repo1/test.cpp").read_text())
+
+    def test_export_items_formatted_with_style_of_repos_parent_folder(self) -> None:
+        self.fs.create_file("course/.clang-format", contents="BasedOnStyle: Google")
+        self.fs.create_dir("course/repo1")
+        style_files: list[Path | None] = []
+
+        def apply_format_mock(formatter: str, files: list[Path]) -> None:
+            self.assertEqual(CLANG_FORMAT, formatter)
+            style_files.extend(find_clang_format_style_file(file) for file in files)
+
+        with (
+            patch("sel_tools.file_export.formatter.is_formatter_available", return_value=True),
+            patch("sel_tools.file_export.formatter.apply_format", side_effect=apply_format_mock),
+        ):
+            export_items(self.exported_item, [Path("course/repo1")], False)
+
+        self.assertEqual([Path("course/.clang-format").absolute()], style_files)
+        self.assertEqual({"repo1", ".clang-format"}, {path.name for path in Path("course").iterdir()})
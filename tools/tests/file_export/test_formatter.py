@@ -5,12 +5,16 @@ from unittest.mock import MagicMock, patch
 
 from pyfakefs.fake_filesystem_unittest import TestCase
 from sel_tools.file_export.formatter import (
+    FORMAT_BATCH_SIZE,
+    FormattedHashes,
     FormatterVisitor,
     apply_clang_format,
     apply_cmake_format,
+    is_formatter_available,
 )
 
 
+@patch("sel_tools.file_export.formatter.is_formatter_available", MagicMock(return_value=True))
 class FormatterTest(TestCase):
     """Tests for formatter functions."""
 
@@ -23,8 +27,9 @@ class FormatterTest(TestCase):
 
         unit = FormatterVisitor()
         unit.visit_file(Path("CMakeLists.txt"))
+        unit.finish()
 
-        cmake_format_mock.assert_called_once_with(Path("CMakeLists.txt"))
+        cmake_format_mock.assert_called_once_with([Path("CMakeLists.txt")])
 
     @patch("sel_tools.file_export.formatter.apply_cmake_format")
     def test_cmake_format__is_cmake_module__should_format(self, cmake_format_mock: MagicMock) -> None:
@@ -32,8 +37,9 @@ class FormatterTest(TestCase):
 
         unit = FormatterVisitor()
         unit.visit_file(Path("FooBar.cmake"))
+        unit.finish()
 
-        cmake_format_mock.assert_called_once_with(Path("FooBar.cmake"))
+        cmake_format_mock.assert_called_once_with([Path("FooBar.cmake")])
 
     @patch("sel_tools.file_export.formatter.apply_cmake_format")
     def test_cmake_format__is_cmake_lists__should_not_format(self, cmake_format_mock: MagicMock) -> None:
@@ -41,6 +47,7 @@ class FormatterTest(TestCase):
 
         unit = FormatterVisitor()
         unit.visit_file(Path("some_thing.txt"))
+        unit.finish()
 
         cmake_format_mock.assert_not_called()
 
@@ -51,8 +58,9 @@ class FormatterTest(TestCase):
 
                 unit = FormatterVisitor()
                 unit.visit_file(Path(file))
+                unit.finish()
 
-                clang_format_mock.assert_called_once_with(Path(file))
+                clang_format_mock.assert_called_once_with([Path(file)])
 
     @patch("sel_tools.file_export.formatter.apply_clang_format")
     def test_clang_format__is_not_cpp__should_not_format(self, clang_format_mock: MagicMock) -> None:
@@ -60,25 +68,74 @@ class FormatterTest(TestCase):
 
         unit = FormatterVisitor()
         unit.visit_file(Path("some_thing.txt"))
+        unit.finish()
 
         clang_format_mock.assert_not_called()
 
-    @staticmethod
-    def test_apply_clang_format() -> None:
-        file = Path("test_file")
-        with (
-            patch("sel_tools.file_export.formatter.which", lambda _: True),
-            patch("sel_tools.file_export.formatter.run", MagicMock()) as run_mock,
-        ):
-            apply_clang_format(file)
-            run_mock.assert_called_once_with("clang-format -i test_file", shell=True, check=True)
-
-    @staticmethod
-    def test_apply_cmake_format() -> None:
-        file = Path("test_file")
-        with (
-            patch("sel_tools.file_export.formatter.which", lambda _: True),
-            patch("sel_tools.file_export.formatter.run", MagicMock()) as run_mock,
-        ):
-            apply_cmake_format(file)
-            run_mock.assert_called_once_with("cmake-format -i test_file", shell=True, check=True)
+    @patch("sel_tools.file_export.formatter.apply_clang_format")
+    def test_clang_format__many_files__should_format_in_batches(self, clang_format_mock: MagicMock) -> None:
+        files = [Path(f"file_{index}.cpp") for index in range(FORMAT_BATCH_SIZE + 1)]
+        unit = FormatterVisitor()
+        for file in files:
+            self.fs.create_file(file)
+            unit.visit_file(file)
+        unit.finish()
+
+        self.assertEqual(2, clang_format_mock.call_count)
+        formatted_files = [file for call in clang_format_mock.call_args_list for file in call.args[0]]
+        self.assertCountEqual(files, formatted_files)
+
+    @patch("sel_tools.file_export.formatter.apply_clang_format")
+    def test_clang_format__formatted_before__should_not_format(self, clang_format_mock: MagicMock) -> None:
+        self.fs.create_file("foo.cpp", contents="int main() {}")
+        self.fs.create_file("bar.cpp", contents="int bar() {}")
+        hashes_file = Path("cache/formatted_hashes.txt")
+
+        unit = FormatterVisitor(FormattedHashes(hashes_file))
+        unit.visit_file(Path("foo.cpp"))
+        unit.finish()
+        Path("bar.cpp").write_text("int bar();")
+
+        unit = FormatterVisitor(FormattedHashes(hashes_file))
+        unit.visit_file(Path("foo.cpp"))
+        unit.visit_file(Path("bar.cpp"))
+        unit.finish()
+
+        self.assertEqual([Path("foo.cpp")], clang_format_mock.call_args_list[0].args[0])
+        self.assertEqual([Path("bar.cpp")], clang_format_mock.call_args_list[1].args[0])
+
+    @patch("sel_tools.file_export.formatter.apply_clang_format")
+    def test_clang_format__style_changed__should_format_again(self, clang_format_mock: MagicMock) -> None:
+        self.fs.create_file("foo.cpp", contents="int main() {}")
+        self.fs.create_file(".clang-format", contents="BasedOnStyle: Google")
+        formatted_hashes = FormattedHashes(Path("formatted_hashes.txt"))
+
+        for style in ["BasedOnStyle: Google", "BasedOnStyle: LLVM"]:
+            Path(".clang-format").write_text(style)
+            unit = FormatterVisitor(formatted_hashes)
+            unit.visit_file(Path("foo.cpp"))
+            unit.finish()
+
+        self.assertEqual(2, clang_format_mock.call_count)
+
+    def test_apply_clang_format(self) -> None:
+        with patch("sel_tools.file_export.formatter.run", MagicMock()) as run_mock:
+            apply_clang_format([Path("test_file"), Path("other_file")])
+            run_mock.assert_called_once_with(["clang-format", "-i", "test_file", "other_file"], check=True)
+
+    def test_apply_cmake_format(self) -> None:
+        with patch("sel_tools.file_export.formatter.run", MagicMock()) as run_mock:
+            apply_cmake_format([Path("test_file")])
+            run_mock.assert_called_once_with(["cmake-format", "-i", "test_file"], check=True)
+
+
+class FormatterAvailableTest(TestCase):
+    """Tests for looking up the formatters."""
+
+    def test_which_called_once(self) -> None:
+        is_formatter_available.cache_clear()
+        with patch("sel_tools.file_export.formatter.which", MagicMock(return_value="/usr/bin/tool")) as which_mock:
+            self.assertTrue(is_formatter_available("tool"))
+            self.assertTrue(is_formatter_available("tool"))
+            which_mock.assert_called_once_with("tool")
+        is_formatter_available.cache_clear()
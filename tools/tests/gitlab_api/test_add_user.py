@@ -1,11 +1,13 @@
 """Test add user module."""
 
+from pathlib import Path
 from unittest.mock import MagicMock, call
 
 import gitlab
 from pyfakefs.fake_filesystem_unittest import TestCase
 from sel_tools.file_parsing.student_group_parser import Student
 from sel_tools.gitlab_api.add_user import (
+    UserIdCache,
     add_students_to_repos,
     find_gitlab_users_of_students,
 )
@@ -42,17 +44,17 @@ class AddUserTest(TestCase):
         self.setUpPyfakefs()
         self.mock_instance = MagicMock()
         self.mock_instance.user1 = GitlabUserFake(
-            "12345",
+            12345,
             STUDENT1["Email address"],
             f"{STUDENT1['First name']} {STUDENT1['Last name']}",
         )
         self.mock_instance.user2 = GitlabUserFake(
-            "35711",
+            35711,
             STUDENT2["Email address"],
             f"{STUDENT2['First name']} {STUDENT2['Last name']}",
         )
         self.mock_instance.user3 = GitlabUserFake(
-            "35711",
+            35711,
             STUDENT_MISSING_GROUP["Email address"],
             f"{STUDENT_MISSING_GROUP['First name']} {STUDENT_MISSING_GROUP['Last name']}",
         )
@@ -120,12 +122,12 @@ class AddUserTest(TestCase):
         add_students_to_repos(students, repo_from_group_id)
         self.mock_repo1.members.create.assert_has_calls(
             [
-                call({"user_id": "12345", "access_level": gitlab.const.DEVELOPER_ACCESS}),
+                call({"user_id": 12345, "access_level": gitlab.const.DEVELOPER_ACCESS}),
             ]
         )
         self.mock_repo2.members.create.assert_has_calls(
             [
-                call({"user_id": "35711", "access_level": gitlab.const.DEVELOPER_ACCESS}),
+                call({"user_id": 35711, "access_level": gitlab.const.DEVELOPER_ACCESS}),
             ]
         )
 
@@ -145,3 +147,36 @@ class AddUserTest(TestCase):
         repo_from_group_id = {1: self.mock_repo1, 2: self.mock_repo2}
         with self.assertRaises(KeyError):
             add_students_to_repos(students, repo_from_group_id)
+
+    def test_find_gitlab_users_of_students_with_cache(self) -> None:
+        self.mock_instance.url = "https://gitlab.example.com"
+        cache_file = Path("cache/gitlab_user_ids.json")
+        find_gitlab_users_of_students(self.mock_instance, [Student.from_dict(STUDENT1)], UserIdCache(cache_file))
+        self.mock_instance.users = MagicMock()
+
+        students = find_gitlab_users_of_students(
+            self.mock_instance, [Student.from_dict(STUDENT1)], UserIdCache(cache_file)
+        )
+
+        self.mock_instance.users.list.assert_not_called()
+        self.mock_instance.users.get.assert_called_once_with(12345, lazy=True)
+        self.assertEqual(self.mock_instance.users.get.return_value, students[0].gitlab_user)
+
+    def test_add_students_to_repos__existing_member_should_be_skipped(self) -> None:
+        students = [
+            self._create_student_with_gitlab_user(STUDENT1, self.mock_instance.user1),
+            self._create_student_with_gitlab_user(STUDENT2, self.mock_instance.user2),
+        ]
+        repo_from_group_id = {1: self.mock_repo1, 2: self.mock_repo2}
+
+        add_students_to_repos(students, repo_from_group_id, {1: {12345}, 2: set()})
+
+        self.mock_repo1.members.create.assert_not_called()
+        self.mock_repo2.members.create.assert_called_once()
+
+    def test_add_students_to_repos__dry_run_should_not_add(self) -> None:
+        students = [self._create_student_with_gitlab_user(STUDENT1, self.mock_instance.user1)]
+
+        add_students_to_repos(students, {1: self.mock_repo1, 2: self.mock_repo2}, dry_run=True)
+
+        self.mock_repo1.members.create.assert_not_called()
@@ -0,0 +1,143 @@
+"""Tests for the asyncio gitlab facade."""
+
+import pickle
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import gitlab
+import requests
+from sel_tools.gitlab_api.async_gitlab import AsyncGitlab, RateLimiter, backoff_seconds
+
+
+def create_response(status_code: int, headers: dict[str, str]) -> requests.Response:
+    """Create a response with status code and headers."""
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers)
+    return response
+
+
+class RateLimiterTest(TestCase):
+    """Tests for the shared rate limiter."""
+
+    def test_no_delay_without_rate_limit_headers(self) -> None:
+        unit = RateLimiter()
+        unit.update(create_response(200, {"RateLimit-Remaining": "10"}))
+        self.assertEqual(0.0, unit.delay)
+
+    def test_delay_from_retry_after(self) -> None:
+        unit = RateLimiter()
+        unit.update(create_response(429, {"Retry-After": "10"}))
+        self.assertGreater(unit.delay, 9.0)
+
+    def test_delay_from_exhausted_rate_limit(self) -> None:
+        unit = RateLimiter()
+        unit.update(create_response(200, {"RateLimit-Remaining": "0", "RateLimit-Reset": str(int(time.time()) + 20)}))
+        self.assertGreater(unit.delay, 18.0)
+
+    def test_pickled_with_delay_but_without_lock(self) -> None:
+        unit = RateLimiter()
+        unit.update(create_response(429, {"Retry-After": "10"}))
+
+        unpickled_unit = pickle.loads(pickle.dumps(unit))
+
+        self.assertGreater(unpickled_unit.delay, 9.0)
+        unpickled_unit.update(create_response(429, {"Retry-After": "20"}))
+        self.assertGreater(unpickled_unit.delay, 19.0)
+
+
+@patch("sel_tools.gitlab_api.async_gitlab.backoff_seconds", MagicMock(return_value=0.0))
+class AsyncGitlabTest(TestCase):
+    """Tests for the asyncio gitlab facade."""
+
+    def setUp(self) -> None:
+        self.gitlab_instance = gitlab.Gitlab("http://localhost", session=requests.Session())
+
+    def test_rate_limiter_registered_as_response_hook(self) -> None:
+        unit = AsyncGitlab(self.gitlab_instance)
+        self.assertIn(unit.rate_limiter.update, self.gitlab_instance.session.hooks["response"])
+
+    def test_gitlab_project_with_rate_limiter_can_be_pickled(self) -> None:
+        AsyncGitlab(self.gitlab_instance)
+        project = self.gitlab_instance.projects.get(1, lazy=True)
+
+        unpickled_project = pickle.loads(pickle.dumps(project))
+
+        unpickled_session = unpickled_project.manager.gitlab.session
+        self.assertEqual(1, len(unpickled_session.hooks["response"]))
+        AsyncGitlab(unpickled_project.manager.gitlab)
+        self.assertEqual(1, len(unpickled_session.hooks["response"]))
+
+    def test_rate_limiter_registered_once_per_session(self) -> None:
+        unit = AsyncGitlab(self.gitlab_instance)
+        other_unit = AsyncGitlab(self.gitlab_instance)
+
+        self.assertIs(unit.rate_limiter, other_unit.rate_limiter)
+        self.assertEqual(1, len(self.gitlab_instance.session.hooks["response"]))
+
+    def test_map_returns_results_in_order_with_limited_concurrency(self) -> None:
+        running = 0
+        max_running = 0
+        lock = threading.Lock()
+
+        def square(value: int) -> int:
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+            return value * value
+
+        results = AsyncGitlab(self.gitlab_instance, max_concurrency=2).map_sync(square, range(6))
+
+        self.assertListEqual([0, 1, 4, 9, 16, 25], results)
+        self.assertEqual(2, max_running)
+
+    def test_idempotent_call_retries_temporary_errors(self) -> None:
+        function = MagicMock(
+            side_effect=[gitlab.GitlabHttpError(response_code=503), requests.ConnectionError(), "result"]
+        )
+
+        results = AsyncGitlab(self.gitlab_instance).map_sync(function, ["item"], idempotent=True)
+
+        self.assertListEqual(["result"], results)
+        self.assertEqual(3, function.call_count)
+
+    def test_non_idempotent_call_retries_rate_limiting_only(self) -> None:
+        for error in (gitlab.GitlabHttpError(response_code=503), requests.ConnectionError()):
+            with self.subTest(error=error):
+                function = MagicMock(side_effect=error)
+
+                with self.assertRaises(type(error)):
+                    AsyncGitlab(self.gitlab_instance).map_sync(function, ["item"])
+                function.assert_called_once()
+
+        function = MagicMock(side_effect=[gitlab.GitlabHttpError(response_code=429), "result"])
+        self.assertListEqual(["result"], AsyncGitlab(self.gitlab_instance).map_sync(function, ["item"]))
+
+    def test_call_raises_after_max_retries(self) -> None:
+        function = MagicMock(side_effect=gitlab.GitlabHttpError(response_code=429))
+
+        with self.assertRaises(gitlab.GitlabHttpError):
+            AsyncGitlab(self.gitlab_instance, max_retries=2).map_sync(function, ["item"])
+        self.assertEqual(3, function.call_count)
+
+    def test_call_raises_permanent_errors_immediately(self) -> None:
+        function = MagicMock(side_effect=gitlab.GitlabHttpError(response_code=404))
+
+        with self.assertRaises(gitlab.GitlabHttpError):
+            AsyncGitlab(self.gitlab_instance).map_sync(function, ["item"])
+        function.assert_called_once()
+
+
+class BackoffTest(TestCase):
+    """Tests for the exponential backoff."""
+
+    def test_backoff_doubles_until_max(self) -> None:
+        self.assertEqual(0.5, backoff_seconds(0))
+        self.assertEqual(1.0, backoff_seconds(1))
+        self.assertEqual(30.0, backoff_seconds(10))
@@ -6,6 +6,7 @@ from unittest.mock import MagicMock
 from pyfakefs.fake_filesystem_unittest import TestCase
 from sel_tools.config import REPO_DIR
 from sel_tools.gitlab_api.attachments import (
+    UploadCache,
     replace_file_paths_with_urls,
     upload_attachments,
 )
@@ -51,3 +52,39 @@ class AttachmentsTest(TestCase):
         results = upload_attachments(attachments, gitlab_project)
 
         self.assertEqual("/uploads/hash/file.txt", results[0]["url"])
+
+    def test_upload_attachments_with_cache_uploads_once_per_project(self) -> None:
+        attachment = Path("/path/to/file.txt")
+        self.fs.create_file(attachment, contents="content")
+        gitlab_project = MagicMock(id=42)
+        gitlab_project.upload = MagicMock(return_value={"url": "/uploads/hash/file.txt"})
+        other_gitlab_project = MagicMock(id=43)
+        other_gitlab_project.upload = MagicMock(return_value={"url": "/uploads/other/file.txt"})
+
+        upload_attachments([attachment], gitlab_project, UploadCache(Path("config.uploads.json")))
+        results = upload_attachments([attachment], gitlab_project, UploadCache(Path("config.uploads.json")))
+        other_results = upload_attachments([attachment], other_gitlab_project, UploadCache(Path("config.uploads.json")))
+
+        gitlab_project.upload.assert_called_once()
+        self.assertEqual("/uploads/hash/file.txt", results[0]["url"])
+        self.assertEqual("/uploads/other/file.txt", other_results[0]["url"])
+
+    def test_upload_attachments_with_cache_uploads_changed_file_again(self) -> None:
+        attachment = Path("/path/to/file.txt")
+        self.fs.create_file(attachment, contents="content")
+        gitlab_project = MagicMock(id=42)
+        gitlab_project.upload = MagicMock(return_value={"url": "/uploads/hash/file.txt"})
+        cache = UploadCache(Path("config.uploads.json"))
+
+        upload_attachments([attachment], gitlab_project, cache)
+        attachment.write_text("changed content")
+        upload_attachments([attachment], gitlab_project, cache)
+
+        self.assertEqual(2, gitlab_project.upload.call_count)
+
+    def test_upload_cache_next_to_student_repo_info_file(self) -> None:
+        self.fs.create_file("config/demo.json")
+        cache = UploadCache.for_student_repo_info_file(Path("config/demo.json"))
+        cache.put(42, "key", {"url": "/uploads/hash/file.txt"})
+
+        self.assertTrue(Path("config/demo.uploads.json").exists())
@@ -0,0 +1,34 @@
+"""Tests for the settings and journals of bulk actions."""
+
+from pyfakefs.fake_filesystem_unittest import TestCase
+from sel_tools.config import JOURNAL_DIR
+from sel_tools.gitlab_api.bulk_action import create_action_journal, create_invocation_id
+
+
+class BulkActionTest(TestCase):
+    """Tests for the settings and journals of bulk actions."""
+
+    def setUp(self) -> None:
+        self.setUpPyfakefs()
+
+    def test_invocation_id_depends_on_action_and_inputs(self) -> None:
+        invocation_id = create_invocation_id("create_issues", ["config.json", "tasks"])
+
+        self.assertEqual(invocation_id, create_invocation_id("create_issues", ["config.json", "tasks"]))
+        self.assertNotEqual(invocation_id, create_invocation_id("comment_issue", ["config.json", "tasks"]))
+        self.assertNotEqual(invocation_id, create_invocation_id("create_issues", ["config.json", "other tasks"]))
+
+    def test_action_journal_resumes_invocation_with_same_inputs(self) -> None:
+        create_action_journal("upload_files", ["config.json"]).record("234", "commit")
+
+        self.assertTrue(create_action_journal("upload_files", ["config.json"]).is_done("234", "commit"))
+        self.assertFalse(create_action_journal("upload_files", ["other.json"]).is_done("234", "commit"))
+        self.assertTrue(JOURNAL_DIR.is_dir())
+
+    def test_ignored_journal_starts_from_scratch(self) -> None:
+        create_action_journal("upload_files", ["config.json"]).record("234", "commit")
+
+        journal = create_action_journal("upload_files", ["config.json"], ignore_journal=True)
+
+        self.assertFalse(journal.is_done("234", "commit"))
+        self.assertFalse(create_action_journal("upload_files", ["config.json"]).is_done("234", "commit"))
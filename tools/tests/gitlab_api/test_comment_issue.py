@@ -5,8 +5,10 @@ from typing import Any
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
+from sel_tools.gitlab_api.bulk_action import BulkActionSettings
 from sel_tools.gitlab_api.comment_issue import comment_issues, create_comment
 from sel_tools.utils.comment import Comment
+from sel_tools.utils.journal import Journal
 
 
 class CommentIssueTest(TestCase):
@@ -51,11 +53,22 @@ class CommentIssueTest(TestCase):
 
         self.assertEqual(2, mock_comment_issue.call_count)
 
+    @patch("sel_tools.gitlab_api.comment_issue.create_comment")
+    def test_comment_issues_skips_journaled_repos(self, mock_comment_issue: MagicMock) -> None:
+        student_repos = [{"id": 234, "name": ""}, {"id": 567, "name": ""}]
+        journal = Journal()
+        journal.record("567", "comment")
+
+        comment_issues(Comment(42, "message"), student_repos, MagicMock(), BulkActionSettings(journal=journal))
+
+        mock_comment_issue.assert_called_once()
+        self.assertTrue(journal.is_done("234", "comment"))
+
     def test_comment_issues_does_not_modify_comment(self) -> None:
         student_repos = [{"id": 234, "name": ""}, {"id": 567, "name": ""}]
         comment = Comment(42, "message")
 
-        def modify_comment_message(comment: Comment, _: Any) -> None:
+        def modify_comment_message(comment: Comment, *_: Any) -> None:
             comment.message += "additional text"
 
         original_comment = deepcopy(comment)
@@ -3,12 +3,21 @@
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import gitlab
 from pyfakefs.fake_filesystem_unittest import TestCase
 from sel_tools.config import GIT_MAIN_BRANCH
+from sel_tools.gitlab_api.bulk_action import BulkActionSettings
 from sel_tools.gitlab_api.create_commit import (
+    COMMIT_ACTIONS_CACHE,
+    CommitActionsCache,
+    chunk_commit_actions,
+    create_commit,
     create_gitlab_commit_data_with_all_files_from,
+    create_journaled_commits,
+    hash_tree,
     upload_files,
 )
+from sel_tools.utils.journal import Journal
 
 
 class CreateCommitTest(TestCase):
@@ -20,19 +29,29 @@ class CreateCommitTest(TestCase):
         self.fs.create_dir(self.input_dir)
 
     def tearDown(self) -> None:
-        create_gitlab_commit_data_with_all_files_from.cache_clear()
+        COMMIT_ACTIONS_CACHE.clear()
 
     def test_create_gitlab_commit_data_with_all_files_from_empty_folder(self) -> None:
-        self.assertDictEqual(
-            {},
+        self.assertListEqual(
+            [],
             create_gitlab_commit_data_with_all_files_from(self.input_dir, "Commit message", GIT_MAIN_BRANCH),
         )
 
+    def test_create_gitlab_commit_data_with_all_files_from_folder_with_symlinked_file(self) -> None:
+        self.fs.create_file("install.sh", contents="echo install")
+        self.fs.create_symlink(self.input_dir / "install.sh", "../install.sh")
+
+        (actions,) = create_gitlab_commit_data_with_all_files_from(self.input_dir, "Initial commit", GIT_MAIN_BRANCH)
+
+        self.assertListEqual(
+            [{"action": "create", "content": "echo install", "file_path": "install.sh"}], actions["actions"]
+        )
+
     def test_create_gitlab_commit_data_with_all_files_from_filled_folder(self) -> None:
         self.fs.create_file(self.input_dir / "README.md", contents="Initial readme")
         self.fs.create_file(self.input_dir / "include" / "header.h", contents="#define if while")
 
-        actions = create_gitlab_commit_data_with_all_files_from(self.input_dir, "Initial commit", GIT_MAIN_BRANCH)
+        (actions,) = create_gitlab_commit_data_with_all_files_from(self.input_dir, "Initial commit", GIT_MAIN_BRANCH)
 
         self.assertEqual(actions["branch"], GIT_MAIN_BRANCH)
         self.assertEqual(actions["commit_message"], "Initial commit")
@@ -59,7 +78,7 @@ class CreateCommitTest(TestCase):
     def test_create_gitlab_commit_with_file_on_different_branch(self) -> None:
         self.fs.create_file(self.input_dir / "README.md", contents="Initial readme")
 
-        actions = create_gitlab_commit_data_with_all_files_from(self.input_dir, "Initial commit", "other_branch")
+        (actions,) = create_gitlab_commit_data_with_all_files_from(self.input_dir, "Initial commit", "other_branch")
 
         self.assertDictEqual(
             actions,
@@ -76,7 +95,78 @@ class CreateCommitTest(TestCase):
             },
         )
 
-    @patch("sel_tools.gitlab_api.create_commit.create_commit")
+    def test_create_gitlab_commit_data_encodes_binary_files(self) -> None:
+        self.fs.create_file(self.input_dir / "avatar.png", contents=b"\x89PNG\xff")
+
+        (commit_data,) = create_gitlab_commit_data_with_all_files_from(self.input_dir, "Add avatar", GIT_MAIN_BRANCH)
+
+        self.assertListEqual(
+            [{"action": "create", "file_path": "avatar.png", "content": "iVBOR/8=", "encoding": "base64"}],
+            commit_data["actions"],
+        )
+
+    def test_create_gitlab_commit_data_splits_large_folders(self) -> None:
+        for name in ["a.txt", "b.txt", "c.txt"]:
+            self.fs.create_file(self.input_dir / name, contents="x" * 100)
+
+        commits_data = create_gitlab_commit_data_with_all_files_from(self.input_dir, "Initial commit", "main", 350)
+
+        self.assertListEqual(
+            ["Initial commit (1/2)", "Initial commit (2/2)"],
+            [commit_data["commit_message"] for commit_data in commits_data],
+        )
+        self.assertListEqual([2, 1], [len(commit_data["actions"]) for commit_data in commits_data])
+
+    def test_chunk_commit_actions_keeps_oversized_action_in_own_chunk(self) -> None:
+        actions = [{"content": "x" * 50}, {"content": "x" * 500}, {"content": "x" * 50}]
+
+        self.assertListEqual([[actions[0]], [actions[1]], [actions[2]]], chunk_commit_actions(actions, 100))
+
+    def test_create_commit_creates_all_chunks(self) -> None:
+        for name in ["a.txt", "b.txt"]:
+            self.fs.create_file(self.input_dir / name, contents="x" * 100)
+        gitlab_project = MagicMock()
+
+        create_commit(self.input_dir, "Initial commit", "main", gitlab_project, 150)
+
+        self.assertEqual(2, gitlab_project.commits.create.call_count)
+
+    def test_create_journaled_commits_skips_commits_created_before(self) -> None:
+        commits_data = [{"commit_message": "Add (1/2)"}, {"commit_message": "Add (2/2)"}]
+        journal = Journal()
+        gitlab_project = MagicMock()
+        gitlab_project.commits.create.side_effect = [None, gitlab.GitlabCreateError()]
+
+        with self.assertRaises(gitlab.GitlabCreateError):
+            create_journaled_commits(commits_data, gitlab_project, journal, "234")
+        gitlab_project.commits.create.reset_mock(side_effect=True)
+        create_journaled_commits(commits_data, gitlab_project, journal, "234")
+
+        gitlab_project.commits.create.assert_called_once_with(commits_data[1])
+        self.assertTrue(journal.is_done("234", "commit_2_of_2"))
+
+    def test_hash_tree_depends_on_paths_and_contents(self) -> None:
+        self.fs.create_file(self.input_dir / "README.md", contents="readme")
+        self.fs.create_file("copy/README.md", contents="readme")
+        self.fs.create_file("renamed/README.txt", contents="readme")
+        self.fs.create_file("changed/README.md", contents="changed")
+
+        tree_hash = hash_tree(self.input_dir)
+
+        self.assertEqual(tree_hash, hash_tree(Path("copy")))
+        self.assertNotEqual(tree_hash, hash_tree(Path("renamed")))
+        self.assertNotEqual(tree_hash, hash_tree(Path("changed")))
+
+    def test_commit_actions_cache_follows_changed_content(self) -> None:
+        readme = self.fs.create_file(self.input_dir / "README.md", contents="old")
+        cache = CommitActionsCache(1)
+        self.assertEqual("old", cache.get_actions(self.input_dir)[0]["content"])
+
+        readme.set_contents("new")
+
+        self.assertEqual("new", cache.get_actions(self.input_dir)[0]["content"])
+
+    @patch("sel_tools.gitlab_api.create_commit.create_journaled_commits")
     def test_create_upload_files(self, mock_create_commit: MagicMock) -> None:
         student_repos = [{"id": 234, "name": ""}, {"id": 567, "name": ""}]
         source_folder = Path("source")
@@ -86,3 +176,30 @@ class CreateCommitTest(TestCase):
         upload_files(source_folder, student_repos, MagicMock())
 
         self.assertEqual(2, mock_create_commit.call_count)
+
+    @patch("sel_tools.gitlab_api.create_commit.create_journaled_commits")
+    def test_upload_files_hashes_source_folder_once_for_all_repos(self, mock_create_commit: MagicMock) -> None:
+        student_repos = [{"id": 234, "name": ""}, {"id": 567, "name": "", "branch": "develop"}]
+        self.fs.create_file("source/test.txt", contents="test")
+
+        with patch("sel_tools.gitlab_api.create_commit.hash_tree", wraps=hash_tree) as mock_hash_tree:
+            upload_files(Path("source"), student_repos, MagicMock(), BulkActionSettings(2))
+
+        mock_hash_tree.assert_called_once()
+        self.assertCountEqual(
+            [GIT_MAIN_BRANCH, "develop"], [call.args[0][0]["branch"] for call in mock_create_commit.call_args_list]
+        )
+
+    @patch("sel_tools.gitlab_api.create_commit.create_journaled_commits")
+    def test_upload_files_skips_journaled_repos(self, mock_create_commit: MagicMock) -> None:
+        student_repos = [{"id": 234, "name": ""}, {"id": 567, "name": ""}]
+        journal = Journal()
+        journal.record("234", "commit")
+        gitlab_instance = MagicMock()
+        self.fs.create_file("source/test.txt")
+
+        upload_files(Path("source"), student_repos, gitlab_instance, BulkActionSettings(2, journal=journal))
+
+        mock_create_commit.assert_called_once()
+        gitlab_instance.projects.get.assert_called_once_with(567)
+        self.assertTrue(journal.is_done("567", "commit"))
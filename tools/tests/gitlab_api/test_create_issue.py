@@ -6,11 +6,13 @@ from typing import Any
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
+from sel_tools.gitlab_api.bulk_action import BulkActionSettings
 from sel_tools.gitlab_api.create_issue import (
     create_issue,
     create_issues,
     get_issue_dict,
 )
+from sel_tools.utils.journal import Journal
 from sel_tools.utils.task import Task
 
 TASKS = [
@@ -47,10 +49,26 @@ class IssueCreatorTest(TestCase):
 
         self.assertEqual(4, mock_create_issue.call_count, msg="2 calls for projects times 2 for the tasks")
 
+    @patch("sel_tools.gitlab_api.create_issue.create_issue")
+    def test_create_issues_skips_journaled_issues(self, mock_create_issue: MagicMock) -> None:
+        student_repos = [{"id": 234, "name": ""}, {"id": 567, "name": ""}]
+        journal = Journal()
+        for step in ["issue_0", "issue_1"]:
+            journal.record("234", step)
+        journal.record("567", "issue_0")
+        gitlab_instance = MagicMock()
+
+        create_issues(TASKS, student_repos, gitlab_instance, BulkActionSettings(journal=journal))
+
+        mock_create_issue.assert_called_once()
+        self.assertEqual("2", mock_create_issue.call_args.args[0].title)
+        gitlab_instance.projects.get.assert_called_once_with(567)
+        self.assertTrue(journal.is_done("567", "issue_1"))
+
     def test_create_issues_does_not_modify_tasks(self) -> None:
         student_repos = [{"id": 234, "name": ""}, {"id": 567, "name": ""}]
 
-        def modify_task_description(task: Task, _: Any) -> None:
+        def modify_task_description(task: Task, *_: Any) -> None:
             task.description += "additional text"
 
         original_tasks = deepcopy(TASKS)
@@ -3,12 +3,16 @@
 from pathlib import Path
 from unittest.mock import MagicMock
 
+import gitlab
 from pyfakefs.fake_filesystem_unittest import TestCase
 from sel_tools.gitlab_api.create_repo import (
     AVATAR_PATH,
+    CreateReposSettings,
     create_repos,
     get_repo_settings,
 )
+from sel_tools.utils.journal import Journal
+from sel_tools.utils.task import Task
 
 from tests.helper import GitlabGroupFake
 
@@ -20,7 +24,7 @@ class CreateRepoTest(TestCase):
         self.setUpPyfakefs()
         self.fs.create_file(AVATAR_PATH)
         self.input_dir = Path("input")
-        self.fs.create_dir(self.input_dir)
+        self.fs.create_file(self.input_dir / "README.md", contents="# Homework")
 
     def test_create_repos(self) -> None:
         mock_protected_branch = MagicMock()
@@ -31,7 +35,9 @@ class CreateRepoTest(TestCase):
         mock_instance.projects.create.return_value = mock_project
         mock_instance.groups.get.return_value = GitlabGroupFake("group")
 
-        student_repos, group_name = create_repos(self.input_dir, "base_name", 3425, 3, mock_instance)
+        student_repos, group_name = create_repos(
+            self.input_dir, "base_name", 3425, mock_instance, CreateReposSettings(3)
+        )
 
         self.assertEqual(len(student_repos), 3)
         self.assertEqual("group", group_name)
@@ -41,6 +47,67 @@ class CreateRepoTest(TestCase):
             self.assertIn("branch", student_repo)
             self.assertEqual(student_repo["branch"], "master")
 
+    def test_create_repos_skips_journaled_steps(self) -> None:
+        journal = Journal()
+        for step, data in [("project_requested", None), ("project", 7), ("runner", None), ("branch", "master")]:
+            journal.record("3425/base_name_1", step, data)
+        mock_instance = MagicMock()
+        mock_instance.groups.get.return_value = GitlabGroupFake("group", 3425, "group")
+        mock_project = mock_instance.projects.get.return_value
+        mock_project.id = 7
+        task = Task("Dashboard", "Description", "Documentation", None, "")
+
+        student_repos, _ = create_repos(
+            self.input_dir,
+            "base_name",
+            3425,
+            mock_instance,
+            CreateReposSettings(journal=journal, initial_issues=(task,)),
+        )
+
+        self.assertListEqual([{"name": "base_name_1", "id": 7, "branch": "master"}], student_repos)
+        mock_instance.projects.create.assert_not_called()
+        mock_instance.projects.get.assert_called_once_with(7, lazy=True)
+        mock_project.runners.create.assert_not_called()
+        mock_project.protectedbranches.create.assert_not_called()
+        mock_project.save.assert_called_once()
+        mock_project.commits.create.assert_called_once()
+        mock_project.issues.create.assert_called_once()
+        self.assertTrue(journal.is_done("3425/base_name_1", "issue_0"))
+
+    def test_create_repos_looks_up_project_of_interrupted_creation(self) -> None:
+        journal = Journal()
+        journal.record("3425/base_name_1", "project_requested")
+        mock_instance = MagicMock()
+        mock_instance.groups.get.return_value = GitlabGroupFake("group", 3425, "parent/group")
+        mock_instance.projects.get.return_value.id = 8
+
+        student_repos, _ = create_repos(
+            self.input_dir, "base_name", 3425, mock_instance, CreateReposSettings(1, journal=journal)
+        )
+
+        self.assertEqual(8, student_repos[0]["id"])
+        mock_instance.projects.get.assert_called_once_with("parent/group/base_name_1")
+        mock_instance.projects.create.assert_not_called()
+
+    def test_create_repos_leaves_out_failed_repos(self) -> None:
+        mock_instance = MagicMock()
+        mock_instance.groups.get.return_value = GitlabGroupFake("group", 3425, "group")
+        mock_instance.projects.create.side_effect = [
+            MagicMock(),
+            gitlab.GitlabCreateError("400 Bad Request"),
+            MagicMock(),
+        ]
+        journal = Journal()
+
+        student_repos, _ = create_repos(
+            self.input_dir, "base_name", 3425, mock_instance, CreateReposSettings(3, journal=journal)
+        )
+
+        self.assertListEqual(["base_name_1", "base_name_3"], [repo["name"] for repo in student_repos])
+        self.assertTrue(journal.is_done("3425/base_name_2", "project_requested"))
+        self.assertFalse(journal.is_done("3425/base_name_2", "project"))
+
     def test_get_repo_settings(self) -> None:
         self.assertDictEqual(
             get_repo_settings(3234, "my_repo", 4),
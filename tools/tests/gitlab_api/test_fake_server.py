@@ -0,0 +1,157 @@
+"""Tests for the fake gitlab server."""
+
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+import gitlab
+import requests
+from sel_tools.config import GIT_MAIN_BRANCH, REPO_DIR
+from sel_tools.gitlab_api.add_user import AddUsersSettings, UserIdCache, add_users
+from sel_tools.gitlab_api.comment_issue import comment_issues
+from sel_tools.gitlab_api.create_issue import EVALUATION_DASHBOARD_TASK, create_issues
+from sel_tools.gitlab_api.create_repo import CreateReposSettings, create_repos, get_repo_settings
+from sel_tools.gitlab_api.fake_server import FakeGitlabServer, RequestThrottle
+from sel_tools.gitlab_api.fetch_repo import fetch_repos
+from sel_tools.utils.comment import Comment
+from sel_tools.utils.journal import Journal
+
+from tests.helper import STUDENT1
+
+
+class FakeGitlabServerTest(unittest.TestCase):
+    """End to end tests of the tools against the fake gitlab server."""
+
+    def setUp(self) -> None:
+        self.workspace = Path(__file__).parent / "fake_server_workspace"
+        self.source_folder = self.workspace / "source"
+        self.source_folder.mkdir(parents=True)
+        (self.source_folder / "README.md").write_text("# Homework")
+        self.server = FakeGitlabServer(self.workspace / "remotes")
+        self.server.start()
+        self.gitlab_instance = gitlab.Gitlab(self.server.url, private_token="token")
+
+    def tearDown(self) -> None:
+        self.server.stop()
+        shutil.rmtree(self.workspace)
+
+    def test_create_repos_and_fetch_them(self) -> None:
+        student_repos, group_path = create_repos(
+            self.source_folder, "student", 42, self.gitlab_instance, CreateReposSettings(2)
+        )
+
+        self.assertEqual("group_42", group_path)
+        self.assertListEqual(["student_1", "student_2"], [repo["name"] for repo in student_repos])
+        gitlab_projects = fetch_repos(self.workspace / "clones", student_repos, self.gitlab_instance)
+        self.assertEqual(2, len(gitlab_projects))
+        for project in gitlab_projects:
+            self.assertEqual("# Homework", (project.local_path / "README.md").read_text())
+
+    def test_create_repos_resumes_interrupted_project_creation(self) -> None:
+        journal = Journal(self.workspace / "journal.jsonl")
+        journal.record("42/student_1", "project_requested")
+        project = self.gitlab_instance.projects.create(get_repo_settings(42, "student", 1))
+        settings = CreateReposSettings(2, 2, journal, (EVALUATION_DASHBOARD_TASK,))
+
+        student_repos, _ = create_repos(self.source_folder, "student", 42, self.gitlab_instance, settings)
+        resumed_repos, _ = create_repos(self.source_folder, "student", 42, self.gitlab_instance, settings)
+
+        self.assertEqual(project.id, student_repos[0]["id"])
+        self.assertListEqual(student_repos, resumed_repos)
+        for student_repo in student_repos:
+            self.assertEqual(1, len(self.server.issues(student_repo["id"])))
+
+    def test_create_issues_and_comment_with_attachment(self) -> None:
+        student_repos, _ = create_repos(self.source_folder, "student", 42, self.gitlab_instance, CreateReposSettings(1))
+        create_issues([EVALUATION_DASHBOARD_TASK], student_repos, self.gitlab_instance)
+        attachment = REPO_DIR / "assets" / "repo-avatar.png"
+        comment = Comment(1, f"See [avatar](/{attachment.relative_to(REPO_DIR)})", "close", [attachment])
+
+        comment_issues(comment, student_repos, self.gitlab_instance)
+
+        project_id = student_repos[0]["id"]
+        self.assertEqual("closed", self.server.issues(project_id)[0]["state"])
+        self.assertIn(self.server.uploads(project_id)[0]["url"], self.server.notes(project_id, 1)[0]["body"])
+
+    def test_add_member_twice_conflicts(self) -> None:
+        user = self.server.add_user("student", "student@tum.de")
+        student_repos, _ = create_repos(self.source_folder, "student", 42, self.gitlab_instance, CreateReposSettings(1))
+        project = self.gitlab_instance.projects.get(student_repos[0]["id"])
+
+        self.assertEqual(user["id"], self.gitlab_instance.users.list(search="student@tum.de")[0].id)
+        project.members.create({"user_id": user["id"], "access_level": gitlab.const.DEVELOPER_ACCESS})
+        with self.assertRaises(gitlab.GitlabCreateError):
+            project.members.create({"user_id": user["id"], "access_level": gitlab.const.DEVELOPER_ACCESS})
+        self.assertEqual(1, len(self.server.members(project.id)))
+
+    def test_add_users_twice_skips_existing_members(self) -> None:
+        user = self.server.add_user("student", STUDENT1["Email address"])
+        student_group_file = self.workspace / "student_group.csv"
+        student_group_file.write_text(",".join(STUDENT1) + "\n" + ",".join(STUDENT1.values()) + "\n")
+        student_repos, _ = create_repos(self.source_folder, "student", 42, self.gitlab_instance, CreateReposSettings(1))
+        settings = AddUsersSettings(user_id_cache=UserIdCache(self.workspace / "user_ids.json"))
+
+        add_users(student_repos, student_group_file, self.gitlab_instance, settings)
+        add_users(student_repos, student_group_file, self.gitlab_instance, settings)
+
+        self.assertListEqual([user["id"]], [member["id"] for member in self.server.members(student_repos[0]["id"])])
+
+    def test_pipelines_filtered_by_ref(self) -> None:
+        student_repos, _ = create_repos(self.source_folder, "student", 42, self.gitlab_instance, CreateReposSettings(1))
+        project_id = student_repos[0]["id"]
+        self.server.add_pipeline(project_id, "feature", "failed")
+        self.server.add_pipeline(project_id, GIT_MAIN_BRANCH, "success")
+
+        pipelines = self.gitlab_instance.projects.get(project_id).pipelines.list(ref=GIT_MAIN_BRANCH)
+
+        self.assertListEqual(["success"], [pipeline.status for pipeline in pipelines])
+
+    def test_server_answers_other_requests_while_committing(self) -> None:
+        project = self.gitlab_instance.projects.create(get_repo_settings(42, "student", 1))
+        commit_started = threading.Event()
+        commit_released = threading.Event()
+
+        def blocking_commit_actions(*_: object) -> str:
+            commit_started.set()
+            commit_released.wait(5)
+            return "0" * 40
+
+        commit_data = {"branch": GIT_MAIN_BRANCH, "commit_message": "Initial commit", "actions": []}
+        with (
+            patch("sel_tools.gitlab_api.fake_server.commit_actions", blocking_commit_actions),
+            ThreadPoolExecutor(max_workers=1) as executor,
+        ):
+            commit = executor.submit(project.commits.create, commit_data)
+            self.assertTrue(commit_started.wait(5))
+            response = requests.get(f"{self.server.url}/api/v4/projects/{project.id}", timeout=1)
+            commit_released.set()
+            commit.result(5)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(GIT_MAIN_BRANCH, self.server.project(project.id)["default_branch"])
+
+
+class FakeGitlabServerRateLimitTest(unittest.TestCase):
+    """Tests for the rate limit of the fake gitlab server."""
+
+    def test_requests_above_rate_limit_are_rejected(self) -> None:
+        with (
+            tempfile.TemporaryDirectory() as repos_dir,
+            FakeGitlabServer(Path(repos_dir), RequestThrottle(rate_limit=2)) as server,
+        ):
+            responses = [requests.get(f"{server.url}/api/v4/groups/1", timeout=5) for _ in range(3)]
+
+        self.assertListEqual([200, 200, 429], [response.status_code for response in responses])
+        self.assertEqual("1", responses[0].headers["RateLimit-Remaining"])
+        self.assertEqual("0", responses[2].headers["RateLimit-Remaining"])
+        self.assertIn("Retry-After", responses[2].headers)
+
+    def test_unknown_resource_not_found(self) -> None:
+        with tempfile.TemporaryDirectory() as repos_dir, FakeGitlabServer(Path(repos_dir)) as server:
+            response = requests.get(f"{server.url}/api/v4/projects/404", timeout=5)
+
+        self.assertEqual(404, response.status_code)
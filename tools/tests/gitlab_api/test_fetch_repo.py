@@ -5,9 +5,13 @@ from pathlib import Path
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
+import git
+from git import GitCommandError
 from sel_tools.config import GIT_MAIN_BRANCH
-from sel_tools.gitlab_api.fetch_repo import fetch_repo, fetch_repos
-from sel_tools.utils.repo import GitlabProject
+from sel_tools.gitlab_api.fetch_repo import REFERENCE_REFS_PREFIX, fetch_repo, fetch_repos, populate_reference_repo
+from sel_tools.utils.repo import DEFAULT_CLONE_OPTIONS, CloneOptions, GitlabProject
+
+from tests.helper import GitTestCase
 
 
 class FetchRepoTest(TestCase):
@@ -57,7 +61,7 @@ class FetchRepoTest(TestCase):
 
         result = fetch_repo(git_repo_mock, gitlab_project_mock)
 
-        git_repo_mock.fetch_from.assert_called_once_with("this should be an url")
+        git_repo_mock.fetch_from.assert_called_once_with("this should be an url", DEFAULT_CLONE_OPTIONS)
         self.assertEqual(GitlabProject(Path("test"), gitlab_project_mock), result)
 
     @patch("sel_tools.gitlab_api.fetch_repo.fetch_repo")
@@ -83,3 +87,73 @@ class FetchRepoTest(TestCase):
         self.assertEqual(git_repo_arg.branch, "develop")
         self.assertEqual(git_repo_arg.path, self.workspace / str(self.student_config[0]["name"]))
         self.assertEqual(2, len(repo_paths))
+
+    @patch("sel_tools.gitlab_api.fetch_repo.fetch_repo")
+    def test_fetch_repos_concurrently_should_keep_config_order(self, mock_fetch_repo: MagicMock) -> None:
+        mock_fetch_repo.side_effect = lambda repo, *_: GitlabProject(repo.path, MagicMock())
+        student_config = [{"id": index, "name": f"repo_{index}"} for index in range(10)]
+
+        gitlab_projects = fetch_repos(self.workspace, student_config, MagicMock(), max_workers=4)
+
+        self.assertEqual(
+            [self.workspace / f"repo_{index}" for index in range(10)],
+            [project.local_path for project in gitlab_projects],
+        )
+
+    @patch("sel_tools.gitlab_api.fetch_repo.populate_reference_repo")
+    @patch("sel_tools.gitlab_api.fetch_repo.fetch_repo")
+    def test_fetch_repos_with_reference_should_populate_it_from_first_repo(
+        self, mock_fetch_repo: MagicMock, mock_populate_reference_repo: MagicMock
+    ) -> None:
+        mock_fetch_repo.side_effect = lambda repo, *_: GitlabProject(repo.path, MagicMock())
+        gitlab_instance = MagicMock()
+        gitlab_instance.projects.get.return_value.ssh_url_to_repo = "git@gitlab:foo.git"
+        clone_options = CloneOptions(self.workspace / "reference.git")
+
+        fetch_repos(self.workspace, self.student_config, gitlab_instance, clone_options=clone_options)
+
+        mock_populate_reference_repo.assert_called_once_with(self.workspace / "reference.git", "git@gitlab:foo.git")
+        gitlab_instance.projects.get.assert_any_call(234)
+        self.assertEqual(clone_options, mock_fetch_repo.call_args.args[2])
+
+    @patch("sel_tools.gitlab_api.fetch_repo.fetch_repo")
+    def test_fetch_repos_failing_repo_should_not_abort_batch(self, mock_fetch_repo: MagicMock) -> None:
+        mock_fetch_repo.side_effect = [GitCommandError("pull"), GitlabProject(Path("bar"), MagicMock())]
+
+        gitlab_projects = fetch_repos(self.workspace, self.student_config, MagicMock())
+
+        self.assertEqual(2, mock_fetch_repo.call_count)
+        self.assertEqual([Path("bar")], [project.local_path for project in gitlab_projects])
+
+
+class ReferenceRepoTest(GitTestCase):
+    """Reference repo test."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.repo_path.joinpath("template.txt").write_text("template")
+        self.repo.index.add(["template.txt"])
+        self.repo.index.commit("template")
+        self.reference = self.workspace / "reference.git"
+
+    def test_populate_reference_repo_should_fetch_the_template_once(self) -> None:
+        populate_reference_repo(self.reference, str(self.repo_path))
+        self.repo.index.commit("student commit")
+
+        populate_reference_repo(self.reference, str(self.repo_path))
+
+        reference_refs = git.Repo(self.reference).git.for_each_ref(REFERENCE_REFS_PREFIX, format="%(objectname)")
+        self.assertEqual(self.repo.head.commit.parents[0].hexsha, reference_refs)
+
+    @patch.dict(os.environ, {"CI": ""}, clear=True)
+    def test_fetch_repos_should_borrow_objects_from_reference(self) -> None:
+        gitlab_instance = MagicMock()
+        gitlab_instance.projects.get.return_value.ssh_url_to_repo = self.repo_path.as_uri()
+        student_repos = [{"id": 1, "name": "student_1", "branch": GIT_MAIN_BRANCH}]
+
+        fetch_repos(
+            self.workspace / "clones", student_repos, gitlab_instance, clone_options=CloneOptions(self.reference)
+        )
+
+        alternates = self.workspace / "clones" / "student_1" / ".git" / "objects" / "info" / "alternates"
+        self.assertEqual(str((self.reference / "objects").resolve()), alternates.read_text().strip())
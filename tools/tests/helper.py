@@ -4,10 +4,15 @@ import shutil
 import unittest
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING, cast
 
 import git
 from sel_tools.code_evaluation.jobs.common import EvaluationJob
 from sel_tools.config import GIT_MAIN_BRANCH
+from sel_tools.utils.repo import GitlabProject
+
+if TYPE_CHECKING:
+    from gitlab.v4.objects import Project
 
 STUDENT1 = {
     "Last name": "xyz",
@@ -97,18 +102,25 @@ class GitlabProjectFake:
     web_url: str = ""
 
 
+def create_gitlab_project_fake(local_path: Path, project_id: str = "") -> GitlabProject:
+    """Create a local gitlab project with a fake gitlab project."""
+    return GitlabProject(local_path, cast("Project", GitlabProjectFake(id=project_id)))
+
+
 @dataclass
 class GitlabGroupFake:
     """Fake for the Gitlab Group Object."""
 
     path: str = ""
+    id: int = 0
+    full_path: str = ""
 
 
 @dataclass
 class GitlabUserFake:
     """Fake for the Gitlab User Object."""
 
-    id: str = ""  # pylint: disable=invalid-name
+    id: int = 0  # pylint: disable=invalid-name
     email: str = ""
     name: str = ""
 
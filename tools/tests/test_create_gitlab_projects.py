@@ -27,6 +27,7 @@ class ArgumentParserTest(TestCase):
         expected_repo_info_dir = REPO_DIR / "config"
         self.assertEqual(args.repo_info_dir, expected_repo_info_dir)
         self.assertFalse(args.publish_solutions)
+        self.assertEqual(args.api_jobs, 8)
 
     def test_maximum_parameter_set(self) -> None:
         self.fs.create_dir("config_folder")
@@ -46,6 +47,8 @@ class ArgumentParserTest(TestCase):
                 "-s",
                 "output/homework",
                 "--publish-solutions",
+                "--api-jobs",
+                "16",
             ]
         )
 
@@ -56,3 +59,4 @@ class ArgumentParserTest(TestCase):
         self.assertEqual(args.source_path, Path("output/homework"))
         self.assertEqual(args.repo_info_dir, Path("config_folder"))
         self.assertTrue(args.publish_solutions)
+        self.assertEqual(args.api_jobs, 16)
@@ -0,0 +1,33 @@
+"""Tests for fake gitlab server CLI argument parser."""
+
+from pathlib import Path
+
+from fake_gitlab_server import parse_arguments
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+
+class ArgumentParserTest(TestCase):
+    """Tests for fake gitlab server CLI argument parser."""
+
+    def setUp(self) -> None:
+        self.setUpPyfakefs()
+
+    def test_minimum_parameter_set(self) -> None:
+        args = parse_arguments(["foo.py", "remotes"])
+
+        self.assertEqual(args.repos_dir, Path("remotes"))
+        self.assertEqual(args.port, 8080)
+        self.assertEqual(args.latency, 0.0)
+        self.assertIsNone(args.rate_limit)
+        self.assertIsNone(args.users)
+
+    def test_maximum_parameter_set(self) -> None:
+        self.fs.create_file("users.json")
+        args = parse_arguments(
+            ["foo.py", "remotes", "--port", "9000", "--latency", "0.1", "--rate-limit", "10", "--users", "users.json"]
+        )
+
+        self.assertEqual(args.port, 9000)
+        self.assertEqual(args.latency, 0.1)
+        self.assertEqual(args.rate_limit, 10)
+        self.assertEqual(args.users, Path("users.json"))
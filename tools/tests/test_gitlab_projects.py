@@ -9,6 +9,7 @@ from typing import ClassVar
 from gitlab_projects import parse_arguments
 from pyfakefs.fake_filesystem_unittest import TestCase
 from sel_tools.config import REPO_DIR
+from sel_tools.utils.args import DEFAULT_PATCH_THRESHOLD
 
 
 class ArgumentParserTest(TestCase):
@@ -74,6 +75,8 @@ class CreateIssuesArgumentParserTest(TestCase):
         self.assertEqual(args.issue_md_slides, Path("issue_slide.md"))
         self.assertEqual(args.homework_number, 1)
         self.assertEqual(args.due_date, None)
+        self.assertEqual(args.upload_jobs, 1)
+        self.assertFalse(args.ignore_journal)
 
     def test_create_issues_with_due_date(self) -> None:
         args = parse_arguments(
@@ -122,6 +125,7 @@ class CommentIssuesArgumentParserTest(TestCase):
         self.assertEqual(args.issue_number, 42)
         self.assertEqual(args.message, "message")
         self.assertIsNone(args.state_event)
+        self.assertEqual(args.upload_jobs, 1)
 
     def test_comment_issue_close(self) -> None:
         args = parse_arguments(
@@ -160,13 +164,17 @@ class FetchCodeArgumentParserTest(TestCase):
         self.assertEqual(args.student_repo_info_file, Path("config_file.json"))
         self.assertEqual(args.gitlab_token, "123")
         self.assertEqual(args.workspace, REPO_DIR / "workspace")
+        self.assertEqual(1, args.fetch_jobs)
 
     def test_fetch_code_max_valid_parameters(self) -> None:
-        args = parse_arguments(["foo.py", "fetch_code", "-t", "123", "config_file.json", "-w", "workspace"])
+        args = parse_arguments(
+            ["foo.py", "fetch_code", "-t", "123", "config_file.json", "-w", "workspace", "--fetch-jobs", "16"]
+        )
 
         self.assertEqual(args.student_repo_info_file, Path("config_file.json"))
         self.assertEqual(args.gitlab_token, "123")
         self.assertEqual(args.workspace, Path("workspace"))
+        self.assertEqual(16, args.fetch_jobs)
 
 
 class EvaluateCodeArgumentParserTest(TestCase):
@@ -186,6 +194,18 @@ class EvaluateCodeArgumentParserTest(TestCase):
         self.assertEqual(1, args.homework_number)
         self.assertIsNone(args.date_last_homework)
         self.assertIsNone(args.evaluation_date)
+        self.assertEqual(1, args.jobs)
+        self.assertFalse(args.diffstat_only)
+        self.assertFalse(args.shallow)
+        self.assertFalse(args.worktrees)
+        self.assertFalse(args.ninja)
+        self.assertIsNone(args.build_jobs)
+        self.assertIsNone(args.ccache_dir)
+        self.assertIsNone(args.dependency_mirror)
+        self.assertFalse(args.reference)
+        self.assertIsNone(args.blob_filter)
+        self.assertEqual(DEFAULT_PATCH_THRESHOLD, args.patch_threshold)
+        self.assertListEqual([], args.patch_commits)
 
     def test_evaluate_code_max_valid_parameters(self) -> None:
         args = parse_arguments(
@@ -207,6 +227,22 @@ class EvaluateCodeArgumentParserTest(TestCase):
                 "2021",
                 "11",
                 "24",
+                "--jobs",
+                "8",
+                "--diffstat-only",
+                "--worktrees",
+                "--ninja",
+                "--build-jobs",
+                "4",
+                "--ccache-dir",
+                "ccache",
+                "--dependency-mirror",
+                "mirror",
+                "--patch-threshold",
+                "200",
+                "--patch-commits",
+                "abc123",
+                "def456",
             ]
         )
 
@@ -216,6 +252,15 @@ class EvaluateCodeArgumentParserTest(TestCase):
         self.assertEqual(args.homework_number, 2)
         self.assertEqual(args.date_last_homework, datetime.date.fromisoformat("2021-11-15"))
         self.assertEqual(args.evaluation_date, datetime.date.fromisoformat("2021-11-24"))
+        self.assertEqual(8, args.jobs)
+        self.assertTrue(args.diffstat_only)
+        self.assertTrue(args.worktrees)
+        self.assertTrue(args.ninja)
+        self.assertEqual(4, args.build_jobs)
+        self.assertEqual(Path("ccache"), args.ccache_dir)
+        self.assertEqual(Path("mirror"), args.dependency_mirror)
+        self.assertEqual(200, args.patch_threshold)
+        self.assertListEqual(["abc123", "def456"], args.patch_commits)
 
 
 class UploadFilesArgumentParserTest(TestCase):
@@ -231,6 +276,14 @@ class UploadFilesArgumentParserTest(TestCase):
         self.assertEqual(args.student_repo_info_file, Path("config_file.json"))
         self.assertEqual(args.gitlab_token, "123")
         self.assertEqual(args.source_path, Path("source"))
+        self.assertEqual(args.upload_jobs, 1)
+        self.assertFalse(args.ignore_journal)
+
+    def test_upload_files_ignore_journal(self) -> None:
+        args = parse_arguments(
+            ["foo.py", "upload_files", "-t", "123", "-s", "source", "config_file.json", "--ignore-journal"]
+        )
+        self.assertTrue(args.ignore_journal)
 
 
 class CommitChangesArgumentParserTest(TestCase):
@@ -294,3 +347,5 @@ class AddUsersArgumentParserTest(TestCase):
         self.assertEqual(args.student_repo_info_file, Path("config_file.json"))
         self.assertEqual(args.student_group_info_file, Path("student_group.csv"))
         self.assertEqual(args.gitlab_token, "123")
+        self.assertEqual(args.api_jobs, 8)
+        self.assertFalse(args.dry_run)
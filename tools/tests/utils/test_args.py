@@ -4,7 +4,7 @@ import unittest
 from pathlib import Path
 
 from pyfakefs.fake_filesystem_unittest import TestCase
-from sel_tools.utils.args import ArgumentParserFactory, dir_path, file_path
+from sel_tools.utils.args import ArgumentParserFactory, dir_path, file_path, positive_int
 
 
 class ArgsTest(TestCase):
@@ -39,6 +39,14 @@ class ArgsTest(TestCase):
         with self.assertRaises(FileNotFoundError):
             file_path("test")
 
+    def test_positive_int__is_positive__return_int(self) -> None:
+        self.assertEqual(4, positive_int("4"))
+
+    def test_positive_int__is_zero_or_negative__raise_value_error(self) -> None:
+        for value in ["0", "-2"]:
+            with self.subTest(value), self.assertRaises(ValueError):
+                positive_int(value)
+
 
 class ArgumentParserFactoryTest(unittest.TestCase):
     """Argument parser factory test."""
@@ -0,0 +1,46 @@
+"""Tests for the commit index."""
+
+from datetime import date, datetime
+from unittest.mock import patch
+
+from sel_tools.utils.commit_index import CommitIndex
+
+from tests.helper import GitTestCase
+
+
+class CommitIndexTest(GitTestCase):
+    """Tests for the commit index."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.first_commit = self.__commit("first", datetime(2021, 11, 11))
+        self.second_commit = self.__commit("second", datetime(2021, 11, 14))
+        self.unit = CommitIndex()
+
+    def __commit(self, content: str, commit_date: datetime) -> str:
+        (self.repo_path / "test.txt").write_text(content)
+        self.repo.index.add(["test.txt"])
+        return self.repo.index.commit(content, commit_date=commit_date.isoformat()).hexsha
+
+    def test_last_commit_before_date(self) -> None:
+        self.assertEqual(self.first_commit, self.unit.last_commit_before(self.repo, date(2021, 11, 13)))
+        self.assertEqual(self.second_commit, self.unit.last_commit_before(self.repo, date(2021, 11, 15)))
+
+    def test_last_commit_before_date_without_commits_is_none(self) -> None:
+        self.assertIsNone(self.unit.last_commit_before(self.repo, date(2021, 11, 10)))
+
+    def test_last_commit_without_date_is_head(self) -> None:
+        self.assertEqual(self.second_commit, self.unit.last_commit_before(self.repo, None))
+
+    def test_last_commit_before_date_is_cached(self) -> None:
+        self.unit.last_commit_before(self.repo, date(2021, 11, 13))
+
+        with patch("git.cmd.Git.execute") as execute_mock:
+            self.assertEqual(self.first_commit, self.unit.last_commit_before(self.repo, date(2021, 11, 13)))
+        execute_mock.assert_not_called()
+
+    def test_new_head_is_resolved_again(self) -> None:
+        self.unit.last_commit_before(self.repo, date(2021, 11, 20))
+        third_commit = self.__commit("third", datetime(2021, 11, 16))
+
+        self.assertEqual(third_commit, self.unit.last_commit_before(self.repo, date(2021, 11, 20)))
@@ -5,7 +5,7 @@ from pathlib import Path
 from unittest.mock import MagicMock, call
 
 from pyfakefs.fake_filesystem_unittest import TestCase as FsTestCase
-from sel_tools.utils.files import FileTree, FileVisitor, is_cmake, is_cpp
+from sel_tools.utils.files import FileTree, FileVisitor, FileWalker, is_cmake, is_cpp
 
 
 class FileVisitorTest(unittest.TestCase):
@@ -65,19 +65,74 @@ class FileTreeTest(FsTestCase):
             self.visitor_mock.visit_file.call_args_list,
         )
 
+    def test_call_recursive_solution_remover_on_folder_ignore_nested_git(self) -> None:
+        self.fs.create_file(self.nested_folder / ".git" / "ignore_file")
+
+        FileTree(self.folder).accept(self.visitor_mock)
+
+        self.assertNotIn(
+            call(self.nested_folder / ".git" / "ignore_file"),
+            self.visitor_mock.visit_file.call_args_list,
+        )
+
+    def test_accept_ignore_folders(self) -> None:
+        self.fs.create_file(self.folder / "hw_build" / "CMakeCache.txt")
+
+        FileTree(self.folder, FileWalker(ignore_folders=frozenset({".git", "hw_build"}))).accept(self.visitor_mock)
+
+        self.assertListEqual(
+            [call(self.file1), call(self.file2)],
+            self.visitor_mock.visit_file.call_args_list,
+        )
+
+    def test_accept_all_visits_each_file_with_all_visitors(self) -> None:
+        other_visitor_mock = MagicMock()
+
+        FileTree(self.folder).accept_all([self.visitor_mock, other_visitor_mock])
+
+        for visitor in [self.visitor_mock, other_visitor_mock]:
+            self.assertListEqual([call(self.file1), call(self.file2)], visitor.visit_file.call_args_list)
+
     def test_call_recursive_solution_remover_on_not_existing_item_raise(self) -> None:
         unit = FileTree(Path("should_not_exist"))
         with self.assertRaises(FileNotFoundError):
             unit.accept(self.visitor_mock)
         self.visitor_mock.visit_file.assert_not_called()
 
-    def test_rglob_but(self) -> None:
-        self.fs.create_file(self.folder / ".gitignore")
-        paths = list(FileTree(self.folder).rglob_but(".git"))
-        self.assertListEqual(
-            paths,
-            sorted([self.file1, self.file2, self.folder / ".gitignore", self.nested_folder]),
-        )
+
+class FileWalkerTest(FsTestCase):
+    """Tests for the file walker."""
+
+    def setUp(self) -> None:
+        self.setUpPyfakefs()
+        self.folder = Path("folder")
+        for file in ["b.cpp", "a/z.cpp", "a.txt", ".git/HEAD", "a/.git/HEAD"]:
+            self.fs.create_file(self.folder / file)
+
+    def test_walk_sorted_without_git(self) -> None:
+        paths = list(FileWalker().walk(self.folder))
+        self.assertListEqual(paths, [self.folder / "a" / "z.cpp", self.folder / "a.txt", self.folder / "b.cpp"])
+
+    def test_walk_without_git_file_of_worktree(self) -> None:
+        self.fs.create_file(self.folder / "worktree" / ".git", contents="gitdir: ../.git/worktrees/worktree")
+        self.fs.create_file(self.folder / "worktree" / "main.cpp")
+
+        self.assertListEqual(list(FileWalker().walk(self.folder / "worktree")), [self.folder / "worktree" / "main.cpp"])
+
+    def test_walk_symlinked_files(self) -> None:
+        self.fs.create_file("install.sh")
+        self.fs.create_symlink(self.folder / "install.sh", "../install.sh")
+
+        self.assertIn(self.folder / "install.sh", list(FileWalker().walk(self.folder)))
+
+    def test_walk_symlinked_folders(self) -> None:
+        self.fs.create_symlink(self.folder / "link", (self.folder / "a").absolute())
+        self.fs.create_symlink(self.folder / "a" / "loop", self.folder.absolute())
+
+        self.assertNotIn(self.folder / "link" / "z.cpp", list(FileWalker().walk(self.folder)))
+        paths = list(FileWalker(follow_directory_symlinks=True).walk(self.folder))
+        self.assertIn(self.folder / "link" / "z.cpp", paths)
+        self.assertEqual(len(paths), len(set(paths)))
 
 
 class FileTypeTest(unittest.TestCase):
@@ -0,0 +1,41 @@
+"""Tests for the journal of completed steps."""
+
+from pathlib import Path
+
+from pyfakefs.fake_filesystem_unittest import TestCase
+from sel_tools.utils.journal import Journal
+
+
+class JournalTest(TestCase):
+    """Tests for the journal of completed steps."""
+
+    def setUp(self) -> None:
+        self.setUpPyfakefs()
+        self.journal_file = Path("journals/run.jsonl")
+
+    def test_record_without_file_keeps_steps_in_memory(self) -> None:
+        journal = Journal()
+        journal.record("repo_1", "project", 12)
+
+        self.assertTrue(journal.is_done("repo_1", "project"))
+        self.assertFalse(journal.is_done("repo_1", "runner"))
+        self.assertDictEqual({"project": 12}, journal.steps("repo_1"))
+        self.assertDictEqual({}, journal.steps("repo_2"))
+
+    def test_recorded_steps_are_loaded_from_file(self) -> None:
+        journal = Journal(self.journal_file)
+        journal.record("repo_1", "project", 12)
+        journal.record("repo_1", "branch", "master")
+        journal.record("repo_2", "project", 13)
+
+        reloaded_journal = Journal(self.journal_file)
+
+        self.assertDictEqual({"project": 12, "branch": "master"}, reloaded_journal.steps("repo_1"))
+        self.assertDictEqual({"project": 13}, reloaded_journal.steps("repo_2"))
+
+    def test_truncated_last_line_is_ignored(self) -> None:
+        Journal(self.journal_file).record("repo_1", "project", 12)
+        with self.journal_file.open("a") as journal_file:
+            journal_file.write('{"key": "repo_1", "st')
+
+        self.assertDictEqual({"project": 12}, Journal(self.journal_file).steps("repo_1"))